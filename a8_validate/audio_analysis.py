@@ -0,0 +1,168 @@
+"""Streaming audio content analysis for Assimil8or sample files."""
+
+import array
+import math
+import sys
+import wave
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the pure-Python decoder is used without it
+    np = None
+
+# Frames decoded per block. A block of 8-channel 32-bit audio is 2MB raw, so memory per
+# analysis stays bounded however long the sample is.
+ANALYSIS_BLOCK_FRAMES = 65536
+
+# Per sample width: (full scale, highest code, lowest code) of the decoded integers.
+# 8-bit PCM is unsigned and re-centred on zero; 24-bit samples are decoded into the top
+# three bytes of a 32-bit integer, so they share the 32-bit scale.
+_SCALES = {
+    1: (128.0, 127, -128),
+    2: (32768.0, 32767, -32768),
+    3: (2147483648.0, 0x7FFFFF00, -2147483648),
+    4: (2147483648.0, 2147483647, -2147483648),
+}
+
+
+class AudioStats:
+    """Level statistics of one sample file, over all channels, relative to full scale."""
+
+    __slots__ = ("frames", "channels", "peak", "rms", "dc", "clipped")
+
+    def __init__(self, frames, channels, peak, rms, dc, clipped):
+        self.frames = frames
+        self.channels = channels
+        # Largest absolute sample value, 0.0-1.0
+        self.peak = peak
+        # Root mean square level, 0.0-1.0
+        self.rms = rms
+        # Mean sample value (DC offset), -1.0-1.0
+        self.dc = dc
+        # Number of samples at the highest or lowest code
+        self.clipped = clipped
+
+    def to_dict(self):
+        """Return the statistics as a JSON-serializable dict."""
+        return {
+            "frames": self.frames,
+            "peak": round(self.peak, 6),
+            "rms": round(self.rms, 6),
+            "dc": round(self.dc, 6),
+            "clipped": self.clipped,
+        }
+
+
+def _widen_24(raw):
+    """Place each 3-byte little-endian sample in the top bytes of a 4-byte one (value << 8)."""
+    count = len(raw) // 3
+    wide = bytearray(count * 4)
+    wide[1::4] = raw[0 : count * 3 : 3]
+    wide[2::4] = raw[1 : count * 3 : 3]
+    wide[3::4] = raw[2 : count * 3 : 3]
+    return wide
+
+
+class _NumpyAccumulator:
+    def __init__(self, sample_width):
+        self.sample_width = sample_width
+        _, self.high, self.low = _SCALES[sample_width]
+        self.total = 0.0
+        self.squares = 0.0
+        self.peak = 0
+        self.clipped = 0
+
+    def add(self, raw):
+        if self.sample_width == 1:
+            values = np.frombuffer(raw, dtype=np.uint8).astype(np.int16) - 128
+        elif self.sample_width == 2:
+            values = np.frombuffer(raw, dtype="<i2")
+        elif self.sample_width == 3:
+            values = np.frombuffer(_widen_24(raw), dtype="<i4")
+        else:
+            values = np.frombuffer(raw, dtype="<i4")
+        if not values.size:
+            return
+        floats = values.astype(np.float64)
+        self.total += float(floats.sum())
+        self.squares += float(np.dot(floats, floats))
+        self.peak = max(self.peak, abs(int(values.max())), abs(int(values.min())))
+        self.clipped += int(np.count_nonzero((values >= self.high) | (values <= self.low)))
+
+
+class _PythonAccumulator:
+    def __init__(self, sample_width):
+        self.sample_width = sample_width
+        _, self.high, self.low = _SCALES[sample_width]
+        self.total = 0
+        self.squares = 0
+        self.peak = 0
+        self.clipped = 0
+
+    def add(self, raw):
+        if self.sample_width == 1:
+            values = array.array("h", (b - 128 for b in raw))
+        elif self.sample_width == 2:
+            values = array.array("h", bytes(raw[: len(raw) // 2 * 2]))
+        elif self.sample_width == 3:
+            values = array.array("i", bytes(_widen_24(raw)))
+        else:
+            values = array.array("i", bytes(raw[: len(raw) // 4 * 4]))
+        if not values:
+            return
+        if self.sample_width > 1 and sys.byteorder == "big":
+            values.byteswap()
+        self.total += sum(values)
+        self.squares += sum(v * v for v in values)
+        self.peak = max(self.peak, abs(max(values)), abs(min(values)))
+        self.clipped += values.count(self.high) + values.count(self.low)
+
+
+def analyze_wav(file_path, block_frames=ANALYSIS_BLOCK_FRAMES, use_numpy=None):
+    """
+    Compute peak, RMS, DC offset and clipped-sample count of a PCM WAV file.
+
+    The data chunk is streamed in blocks of block_frames frames, so the file is never
+    loaded whole. 8-, 16-, 24- and 32-bit integer PCM are supported.
+
+    Args:
+        file_path: Path to the WAV file
+        block_frames: Frames decoded per block
+        use_numpy: Force the NumPy (True) or pure-Python (False) decoder; by default
+            NumPy is used when it is installed
+
+    Returns:
+        AudioStats: Level statistics over all channels
+
+    Raises:
+        wave.Error: If the file is not a readable PCM WAV file
+        ValueError: If the sample width is not 1-4 bytes
+    """
+    if use_numpy is None:
+        use_numpy = np is not None
+    with wave.open(file_path, "rb") as wav_file:
+        channels = wav_file.getnchannels()
+        sample_width = wav_file.getsampwidth()
+        if sample_width not in _SCALES:
+            raise ValueError(f"Unsupported sample width: {sample_width}")
+        accumulator = (_NumpyAccumulator if use_numpy else _PythonAccumulator)(sample_width)
+        frames = 0
+        while True:
+            raw = wav_file.readframes(block_frames)
+            if not raw:
+                break
+            frames += len(raw) // (channels * sample_width)
+            accumulator.add(raw)
+
+    scale = _SCALES[sample_width][0]
+    count = frames * channels
+    if not count:
+        return AudioStats(0, channels, 0.0, 0.0, 0.0, 0)
+    return AudioStats(
+        frames,
+        channels,
+        peak=accumulator.peak / scale,
+        rms=math.sqrt(accumulator.squares / count) / scale,
+        dc=accumulator.total / count / scale,
+        clipped=accumulator.clipped,
+    )
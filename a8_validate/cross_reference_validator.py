@@ -1,5 +1,6 @@
 """Cross-reference validator module for Assimil8or preset files."""
 
+import hashlib
 import re
 from typing import Optional, Tuple
 
@@ -43,27 +44,31 @@ class CVInputReferenceError(CrossReferenceError):
 CV_INPUT_PATTERN = r"^(Off|[0-8][A-C])$"
 
 
-def validate_relationships(preset_data):
+def validate_relationships(preset_data, subtree_cache=None):
     """
     Validate parameter relationships in a preset.
 
     Args:
         preset_data: Dictionary containing the preset data
+        subtree_cache: Optional dict kept between calls; a channel identical to one already
+            checked at the same path is not checked again (relationships between channels
+            always are). May be shared with validate_preset's subtree_cache.
 
     Raises:
         CrossReferenceError: If validation fails
     """
     for preset_key, preset_value in preset_data.items():
-        _validate_preset_relationships(preset_value, path=(preset_key,))
+        _validate_preset_relationships(preset_value, path=(preset_key,), subtree_cache=subtree_cache)
 
 
-def _validate_preset_relationships(preset, path: ValidationPath = ()):
+def _validate_preset_relationships(preset, path: ValidationPath = (), subtree_cache=None):
     """
     Validate relationships within a preset.
 
     Args:
         preset: Dictionary containing the preset data
         path: Tuple of YAML keys (e.g. (preset_key,)) for error reporting
+        subtree_cache: Optional dict of already checked channels (see validate_relationships)
 
     Raises:
         CrossReferenceError: If validation fails
@@ -86,8 +91,26 @@ def _validate_preset_relationships(preset, path: ValidationPath = ()):
 
     # Validate each channel's internal relationships
     for channel_number, channel_data in channels.items():
-        channel_key = f"Channel {channel_number}"
-        _validate_channel_relationships(channel_data, channel_number, path=path + (channel_key,))
+        channel_path = path + (f"Channel {channel_number}",)
+        if subtree_cache is None:
+            _validate_channel_relationships(channel_data, channel_number, path=channel_path)
+            continue
+        # A digest of the channel's content, and the error's class, arguments and path rather than
+        # the instance, which would collect a traceback each time it is raised again
+        key = (
+            "relationships",
+            channel_path,
+            hashlib.blake2b(repr(channel_data).encode("utf-8"), digest_size=16).digest(),
+        )
+        if key not in subtree_cache:
+            try:
+                _validate_channel_relationships(channel_data, channel_number, path=channel_path)
+                subtree_cache[key] = None
+            except CrossReferenceError as e:
+                subtree_cache[key] = (type(e), e.args, e.path)
+        if subtree_cache[key] is not None:
+            error_class, args, error_path = subtree_cache[key]
+            raise error_class(*args, path=error_path)
 
 
 def _validate_crossfade_groups(preset, channels, path: ValidationPath = ()):
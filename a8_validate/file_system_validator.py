@@ -1,10 +1,22 @@
 """File system validator module for Assimil8or preset files."""
 
+import contextlib
+import contextvars
+import functools
 import os
 import re
+import unicodedata
+import warnings
 import wave
 from typing import Optional, Tuple
 
+from a8_validate.audio_analysis import analyze_wav
+from a8_validate.loop_analysis import score_boundaries
+from a8_validate.sample_converter import SampleConversionError
+from a8_validate.sample_hashing import find_duplicate_groups, hash_samples
+from a8_validate.wav_integrity import WavStructureError, inspect_wav
+from a8_validate.waveform_overview import get_overview, overview_path
+
 # Path shape: (preset_key, channel_key?, zone_key?) — tuple of YAML keys for line_map lookup
 ValidationPath = Tuple[str, ...]
 
@@ -49,14 +61,653 @@ class InvalidPresetFilenameError(FileSystemValidationError):
 # Maximum memory limit for the Assimil8or (422MB)
 MAX_MEMORY_BYTES = 422 * 1024 * 1024
 
+# Smallest possible PCM WAV header (RIFF, 'fmt ' and 'data' chunk headers). A sample's data
+# can never be larger than its file minus this, so file sizes bound memory from above.
+WAV_HEADER_ALLOWANCE = 44
+
+# Audio content analysis thresholds, relative to full scale
+# A peak below one 16-bit step is treated as silence
+SILENT_PEAK_THRESHOLD = 1.0 / 32768
+# A mean above 5% of full scale (about -26dBFS) is a heavy DC offset
+DC_OFFSET_THRESHOLD = 0.05
+# This many samples at the highest or lowest code indicates hard clipping
+CLIPPED_SAMPLES_THRESHOLD = 16
+
+
+class SampleCaseMismatchWarning(UserWarning):
+    """Warning issued when a sample reference only matches a file after case-folding."""
+
+    pass
+
+
+class SampleNameCollisionWarning(UserWarning):
+    """Warning issued when several files in a sample folder differ only by case."""
+
+    pass
+
+
+class WavStructureWarning(UserWarning):
+    """Warning issued for non-fatal findings of the deep WAV structure check."""
+
+    pass
+
+
+class SampleContentWarning(UserWarning):
+    """Warning issued when audio analysis finds a silent, DC-offset or clipped sample."""
+
+    pass
+
+
+class LoopClickWarning(UserWarning):
+    """Warning issued when a loop point or sample boundary is likely to click."""
+
+    pass
+
+
+class DuplicateSampleWarning(UserWarning):
+    """Warning issued when a preset loads identical audio from several files."""
+
+    pass
+
+
+class EmbeddedLoopMismatchWarning(UserWarning):
+    """Warning issued when a zone's loop does not match any loop embedded in its sample's smpl chunk."""
+
+    pass
+
+
+class AmbiguousSampleNameError(SampleFileNotFoundError):
+    """Exception raised when a sample reference case-folds to several files and none matches exactly."""
+
+    pass
+
+
+def fold_sample_name(name):
+    """Return the case-insensitive, Unicode-normalized lookup key for a sample filename."""
+    return unicodedata.normalize("NFC", unicodedata.normalize("NFD", name).casefold())
+
+
+class SampleDirectoryIndex:
+    """
+    In-memory index of one sample folder, built with a single os.scandir pass.
+
+    Answers existence, size and inode lookups for sample filenames without a syscall per
+    reference. Each entry is stat'ed at most once (and only when its size is needed).
+
+    Names are also indexed by their case-folded, NFC-normalized form, so a reference to
+    'Kick.WAV' resolves to 'kick.wav' the same way on every host (the Assimil8or card is
+    FAT-formatted and ignores case). Names that are not in the listing at all (e.g.
+    sub-paths) fall back to one os.stat whose result, positive or negative, is cached.
+    """
+
+    def __init__(self, folder_path):
+        self.folder_path = folder_path
+        self._entries = {}
+        # folded name -> list of listing names that fold to it
+        self._folded = {}
+        # name -> os.stat_result, or None for names that do not exist
+        self._fallback = {}
+        try:
+            with os.scandir(folder_path) as it:
+                for entry in it:
+                    self._entries[entry.name] = entry
+                    self._folded.setdefault(fold_sample_name(entry.name), []).append(entry.name)
+        except OSError:
+            pass
+
+    def path(self, sample_filename):
+        """Return the full path of a sample in this folder."""
+        return os.path.join(self.folder_path, sample_filename)
+
+    def _fallback_stat(self, sample_filename):
+        if sample_filename not in self._fallback:
+            try:
+                self._fallback[sample_filename] = os.stat(self.path(sample_filename))
+            except (OSError, ValueError):
+                self._fallback[sample_filename] = None
+        return self._fallback[sample_filename]
+
+    def _entry_exists(self, name):
+        entry = self._entries[name]
+        if entry.is_symlink():
+            # Broken symlinks are listed but do not exist
+            try:
+                entry.stat()
+            except OSError:
+                return False
+        return True
+
+    def candidates(self, sample_filename):
+        """Return the existing names in this folder that match sample_filename ignoring case."""
+        return [name for name in self._folded.get(fold_sample_name(sample_filename), ()) if self._entry_exists(name)]
+
+    def resolve(self, sample_filename):
+        """
+        Return the name of the file a sample reference resolves to, or None.
+
+        An exact match wins; otherwise a single case-insensitive match is returned.
+        None is returned when nothing matches or the reference is ambiguous (several
+        case-insensitive matches and no exact one); see candidates(). Listed names that
+        cannot be stat'ed (broken symlinks) do not match.
+        """
+        if sample_filename in self._entries and self._entry_exists(sample_filename):
+            return sample_filename
+        matches = self.candidates(sample_filename)
+        if len(matches) == 1:
+            return matches[0]
+        if matches:
+            return None
+        return sample_filename if self._fallback_stat(sample_filename) is not None else None
+
+    def locate(self, sample_filename):
+        """Return (folder_path, resolved_name) for a sample reference, or None if it does not resolve."""
+        name = self.resolve(sample_filename)
+        return (self.folder_path, name) if name is not None else None
+
+    def resolved_path(self, sample_filename):
+        """Return the full path of the file a reference resolves to (or of the reference itself)."""
+        return self.path(self.resolve(sample_filename) or sample_filename)
+
+    def exists(self, sample_filename):
+        """Return True if the sample reference resolves to an existing file."""
+        return self.resolve(sample_filename) is not None
+
+    def names(self):
+        """Return the names present in the listing."""
+        return self._entries.keys()
+
+    def folded_names(self):
+        """Return the case-folded names present in the listing."""
+        return self._folded.keys()
+
+    def stat(self, sample_filename):
+        """Return the os.stat_result for a sample (following symlinks), or None if it does not exist."""
+        name = self.resolve(sample_filename)
+        if name is None:
+            return None
+        entry = self._entries.get(name)
+        if entry is None:
+            return self._fallback_stat(name)
+        try:
+            return entry.stat()
+        except OSError:
+            return None
+
+    def size(self, sample_filename):
+        """Return the size in bytes of a sample, or None if it does not exist."""
+        st = self.stat(sample_filename)
+        return st.st_size if st is not None else None
+
+    def inode(self, sample_filename):
+        """Return the inode number of a sample, or None if it does not exist."""
+        st = self.stat(sample_filename)
+        return st.st_ino if st is not None else None
+
+    def identity(self, sample_filename):
+        """
+        Return the file identity of a sample as (st_dev, st_ino), or None if it does not exist.
+
+        Symlinks are followed and hardlinks share an inode, so every name for the same file
+        has the same identity.
+        """
+        st = self.stat(sample_filename)
+        if st is None:
+            return None
+        if not st.st_ino:
+            # DirEntry.stat() leaves st_dev/st_ino zero on Windows; ask the file itself
+            try:
+                st = os.stat(self.path(self.resolve(sample_filename)))
+            except OSError:
+                return None
+        if not st.st_ino:
+            # File systems without inode numbers: the canonical path is the best identity available
+            return (None, os.path.normcase(os.path.realpath(self.path(self.resolve(sample_filename)))))
+        return (st.st_dev, st.st_ino)
+
+
+class SampleSearchPath:
+    """
+    Ordered list of sample folders searched as one, first match wins.
+
+    An exact name in any folder beats a case-insensitive match in an earlier one: the
+    folders are searched for the exact name first, then for a case-folded match. Merged
+    tables from name and from case-folded name to the folders that list it, in search
+    order, are built once from the folders' existing listings, so resolving a reference
+    costs a dictionary lookup however many folders are on the path. Listed names that
+    cannot be stat'ed (broken symlinks) are passed over. Offers the same lookup methods
+    as SampleDirectoryIndex.
+    """
+
+    def __init__(self, indexes):
+        self.indexes = list(indexes)
+        self.folder_path = self.indexes[0].folder_path
+        # name -> indexes listing it, and folded name -> indexes listing a name that folds to it
+        self._exact = {}
+        self._folded = {}
+        for index in self.indexes:
+            for name in index.names():
+                self._exact.setdefault(name, []).append(index)
+            for folded in index.folded_names():
+                self._folded.setdefault(folded, []).append(index)
+
+    def _index_for(self, sample_filename):
+        for index in self._exact.get(sample_filename, ()):
+            if index.resolve(sample_filename) == sample_filename:
+                return index
+        for index in self._folded.get(fold_sample_name(sample_filename), ()):
+            if index.candidates(sample_filename):
+                return index
+        # Not listed anywhere (e.g. a sub-path): the first folder where it exists wins
+        for index in self.indexes:
+            if index.exists(sample_filename):
+                return index
+        return self.indexes[0]
+
+    def path(self, sample_filename):
+        """Return the full path of a sample in the folder it resolves to (the first folder if none)."""
+        return self._index_for(sample_filename).path(sample_filename)
+
+    def candidates(self, sample_filename):
+        """Return the case-insensitive matches in the first folder that has any."""
+        return self._index_for(sample_filename).candidates(sample_filename)
+
+    def resolve(self, sample_filename):
+        """Return the name of the file a sample reference resolves to, or None."""
+        return self._index_for(sample_filename).resolve(sample_filename)
+
+    def locate(self, sample_filename):
+        """Return (folder_path, resolved_name) for a sample reference, or None if it does not resolve."""
+        return self._index_for(sample_filename).locate(sample_filename)
+
+    def resolved_path(self, sample_filename):
+        """Return the full path of the file a reference resolves to (or of the reference itself)."""
+        return self._index_for(sample_filename).resolved_path(sample_filename)
+
+    def exists(self, sample_filename):
+        """Return True if the sample reference resolves to an existing file."""
+        return self._index_for(sample_filename).exists(sample_filename)
+
+    def stat(self, sample_filename):
+        """Return the os.stat_result for a sample, or None if it does not exist."""
+        return self._index_for(sample_filename).stat(sample_filename)
+
+    def size(self, sample_filename):
+        """Return the size in bytes of a sample, or None if it does not exist."""
+        return self._index_for(sample_filename).size(sample_filename)
+
+    def inode(self, sample_filename):
+        """Return the inode number of a sample, or None if it does not exist."""
+        return self._index_for(sample_filename).inode(sample_filename)
+
+    def identity(self, sample_filename):
+        """Return the (st_dev, st_ino) identity of a sample, or None if it does not exist."""
+        return self._index_for(sample_filename).identity(sample_filename)
+
+
+class SampleCaches:
+    """
+    Sample folder indexes and per-file results shared by the checks of one run.
+
+    indexes maps an absolute folder path (or a tuple of paths for a search path) to its
+    index; analysis, layouts and overviews hold audio statistics, chunk tables and
+    overview sidecar paths keyed by sample identity. Nothing here notices changes on
+    disk: a run sees each folder as it was first listed, and long-running callers that
+    keep one instance across runs drop what changed with clear().
+    """
+
+    __slots__ = ("indexes", "analysis", "layouts", "overviews")
+
+    def __init__(self):
+        self.indexes = {}
+        self.analysis = {}
+        self.layouts = {}
+        self.overviews = {}
+
+    def clear(self, folder_path=None):
+        """Drop the index of one folder (and search paths using it), or every index when folder_path is None."""
+        # Analysis results are keyed by file identity, which may have moved with the folder
+        self.analysis.clear()
+        self.layouts.clear()
+        self.overviews.clear()
+        if folder_path is None:
+            self.indexes.clear()
+            return
+        folder_key = os.path.abspath(folder_path)
+        for key in list(self.indexes):
+            if key == folder_key or (isinstance(key, tuple) and folder_key in key):
+                del self.indexes[key]
+
+
+# Caches of the run in progress in this thread (or asyncio task), or None outside a run; see sample_run
+_run_caches = contextvars.ContextVar("a8_sample_run", default=None)
+
+
+@contextlib.contextmanager
+def sample_run(caches=None):
+    """
+    Share sample folder listings and per-file results between the checks inside the block.
+
+    A run belongs to the thread (or asyncio task) that opens it: other threads do not
+    see it, so callers in different threads never share or clear each other's caches
+    unless they pass the same SampleCaches. Blocks nest: an inner block without caches,
+    including the one each public check opens for itself, joins the enclosing run; an
+    inner block given caches uses those until it ends. A run's own caches are dropped
+    when it ends, so outside any block every call lists the folders afresh and nothing
+    accumulates. A long-running process that tracks changes on disk itself can pass its
+    own SampleCaches to keep them warm across runs.
+
+    Yields:
+        The SampleCaches of the run
+    """
+    active = _run_caches.get()
+    if caches is None and active is not None:
+        yield active
+        return
+    token = _run_caches.set(caches if caches is not None else SampleCaches())
+    try:
+        yield _run_caches.get()
+    finally:
+        _run_caches.reset(token)
+
+
+def _in_sample_run(function):
+    """Run a public check inside a sample run, joining the caller's run if there is one."""
+
+    @functools.wraps(function)
+    def run(*args, **kwargs):
+        if _run_caches.get() is not None:
+            return function(*args, **kwargs)
+        with sample_run():
+            return function(*args, **kwargs)
+
+    return run
+
+
+def get_sample_index(folder_path):
+    """
+    Return the index for a sample folder, cached for the current run (see sample_run).
+
+    folder_path may be a single folder or an ordered sequence of folders; a sequence
+    returns a SampleSearchPath over the folders' individual indexes. Within a run every
+    preset that shares a sample folder reuses one directory listing; outside a run a new
+    index is built on every call.
+    """
+    caches = _run_caches.get()
+    if isinstance(folder_path, (list, tuple)):
+        if len(folder_path) == 1:
+            return get_sample_index(folder_path[0])
+        if caches is None:
+            return SampleSearchPath(get_sample_index(p) for p in folder_path)
+        key = tuple(os.path.abspath(p) for p in folder_path)
+        index = caches.indexes.get(key)
+        if index is None:
+            index = SampleSearchPath(get_sample_index(p) for p in folder_path)
+            caches.indexes[key] = index
+        return index
+
+    if caches is None:
+        return SampleDirectoryIndex(folder_path)
+    key = os.path.abspath(folder_path)
+    index = caches.indexes.get(key)
+    if index is None:
+        index = SampleDirectoryIndex(folder_path)
+        caches.indexes[key] = index
+    return index
+
+
+def sample_identity(sample_path):
+    """
+    Return the identity of a sample file: (st_dev, st_ino), following symlinks.
+
+    The stat comes from the index of the file's folder, so it is taken at most once
+    per run. Paths that do not exist are identified by their absolute path instead, so they
+    still key caches consistently.
+    """
+    folder_path, name = os.path.split(sample_path)
+    identity = get_sample_index(folder_path or os.curdir).identity(name)
+    if identity is None:
+        return ("missing", os.path.abspath(sample_path))
+    return identity
+
+
+def clear_sample_index_cache(folder_path=None):
+    """Drop the current run's index for one folder (and search paths using it), or all of its caches."""
+    caches = _run_caches.get()
+    if caches is not None:
+        caches.clear(folder_path)
+
+
+def _run_cache(name):
+    """Return one of the current run's per-file tables, or a throwaway dict outside a run."""
+    caches = _run_caches.get()
+    return getattr(caches, name) if caches is not None else {}
+
+
+@_in_sample_run
+def analyze_sample(sample_path):
+    """
+    Return the AudioStats of a sample, analyzing each file at most once per run.
+
+    Results are keyed by sample identity, so links to one file share one analysis, and
+    dropped when the run ends (see sample_run).
+
+    Raises:
+        wave.Error, ValueError, OSError: If the file cannot be decoded
+    """
+    identity = sample_identity(sample_path)
+    cache = _run_cache("analysis")
+    stats = cache.get(identity)
+    if stats is None:
+        stats = cache[identity] = analyze_wav(sample_path)
+    return stats
+
+
+@_in_sample_run
+def inspect_sample(sample_path):
+    """
+    Return the WavLayout of a sample (chunk table, smpl loops, cue points), scanning each file once per run.
+
+    Results, including failures, are keyed by sample identity and dropped when the run
+    ends (see sample_run).
+
+    Raises:
+        WavStructureError: If the chunk structure is damaged (raised again on every call)
+        OSError: If the file cannot be read
+    """
+    identity = sample_identity(sample_path)
+    cache = _run_cache("layouts")
+    layout = cache.get(identity)
+    if layout is None:
+        try:
+            layout = inspect_wav(sample_path)
+        except (WavStructureError, OSError) as e:
+            layout = e
+        cache[identity] = layout
+    if isinstance(layout, Exception):
+        raise layout
+    return layout
+
+
+@_in_sample_run
+def overview_sample(sample_path, cache_dir):
+    """
+    Make sure a sample's waveform overview is in cache_dir, and return the sidecar path.
+
+    Fresh sidecars are reused; otherwise the overview is computed (see
+    a8_validate.waveform_overview.get_overview). Each file is handled once per run; the
+    result (None if the sample cannot be decoded or the cache written) is keyed by
+    sample identity and dropped when the run ends (see sample_run).
+    """
+    key = (sample_identity(sample_path), cache_dir)
+    cache = _run_cache("overviews")
+    if key not in cache:
+        try:
+            get_overview(sample_path, cache_dir)
+            cache[key] = overview_path(sample_path, cache_dir)
+        except (SampleConversionError, OSError):
+            cache[key] = None
+    return cache[key]
+
+
+def _content_findings(stats):
+    """Return human-readable findings for silent, DC-offset or clipped audio."""
+    findings = []
+    if stats.peak < SILENT_PEAK_THRESHOLD:
+        findings.append("is silent")
+    if abs(stats.dc) > DC_OFFSET_THRESHOLD:
+        findings.append(f"has a DC offset of {stats.dc * 100:+.1f}% of full scale")
+    if stats.clipped >= CLIPPED_SAMPLES_THRESHOLD:
+        findings.append(f"has {stats.clipped} clipped samples")
+    return findings
+
+
+class SampleProbe:
+    """WAV header fields of one sample file, read once and shared by every check that needs them."""
+
+    __slots__ = ("path", "channels", "sample_width", "frame_rate", "n_frames", "error")
+
+    def __init__(self, path, channels=None, sample_width=None, frame_rate=None, n_frames=None, error=None):
+        self.path = path
+        self.channels = channels
+        self.sample_width = sample_width
+        self.frame_rate = frame_rate
+        self.n_frames = n_frames
+        # Exception raised while reading the header (wave.Error for malformed files), or None
+        self.error = error
+
+    @property
+    def memory_bytes(self):
+        """Memory the sample occupies on the module: channels * width * frames."""
+        return self.channels * self.sample_width * self.n_frames
+
+
+def probe_sample(sample_path):
+    """
+    Read the WAV header of a sample file.
+
+    Args:
+        sample_path: Full path to the sample file
+
+    Returns:
+        SampleProbe: Header fields, or the error raised while reading them
+    """
+    try:
+        with wave.open(sample_path, "rb") as wav_file:
+            return SampleProbe(
+                sample_path,
+                channels=wav_file.getnchannels(),
+                sample_width=wav_file.getsampwidth(),
+                frame_rate=wav_file.getframerate(),
+                n_frames=wav_file.getnframes(),
+            )
+    except Exception as e:
+        return SampleProbe(sample_path, error=e)
+
 
-def validate_sample_files(preset_data, folder_path):
+@_in_sample_run
+def probe_samples(sample_paths, probes=None):
+    """
+    Probe many sample files, each exactly once, in directory order.
+
+    The table is keyed by file identity (see sample_identity), so symlinks and hardlinks
+    to one file are probed once. Files are read sorted by (directory, name) so files in
+    the same folder are read together; the first name of each file in that order is the
+    one probed.
+
+    Args:
+        sample_paths: Iterable of full sample paths (duplicates and aliases allowed)
+        probes: Optional existing probe table to extend; files already in it are skipped
+
+    Returns:
+        dict: Probe table mapping each file identity to its SampleProbe
+    """
+    if probes is None:
+        probes = {}
+    for sample_path in sorted(set(sample_paths), key=lambda p: (os.path.dirname(p), os.path.basename(p))):
+        identity = sample_identity(sample_path)
+        if identity not in probes:
+            probes[identity] = probe_sample(sample_path)
+    return probes
+
+
+def _get_probe(sample_path, probes):
+    """Return the probe for a path from the table, probing (and recording) its file if missing."""
+    if probes is None:
+        return probe_sample(sample_path)
+    identity = sample_identity(sample_path)
+    probe = probes.get(identity)
+    if probe is None:
+        probe = probes[identity] = probe_sample(sample_path)
+    return probe
+
+
+@_in_sample_run
+def collect_sample_paths(preset_data, folder_path):
+    """
+    Resolve the sample files a preset references, without reading them.
+
+    Args:
+        preset_data: Dictionary containing the preset data
+        folder_path: Sample folder, or an ordered sequence of folders
+
+    Returns:
+        List of full paths, one per reference that resolves (unresolved references are skipped)
+    """
+    index = get_sample_index(folder_path)
+    paths = []
+    for _, sample_filename in _collect_sample_references(preset_data):
+        location = index.locate(sample_filename)
+        if location is not None:
+            paths.append(os.path.join(*location))
+    return paths
+
+
+@_in_sample_run
+def validate_sample_files(
+    preset_data,
+    folder_path,
+    probes=None,
+    deep_wav=False,
+    analyze_audio=False,
+    analyze_loops=False,
+    find_duplicates=False,
+    overview_dir=None,
+):
     """
     Validate sample files referenced in a preset.
 
     Args:
         preset_data: Dictionary containing the preset data
-        folder_path: Path to the folder containing the sample files
+        folder_path: Path to the folder containing the sample files, or an ordered
+            sequence of folders searched in turn (first match wins)
+        probes: Optional probe table (see probe_samples). Headers, sample lengths and
+            memory are read from it instead of opening each file; missing entries are
+            probed and added.
+        deep_wav: If True, also walk each sample's RIFF chunk table (see
+            a8_validate.wav_integrity.check_wav_structure) to catch truncated or
+            malformed files that the WAV header alone does not reveal. The same pass
+            reads loops from the smpl chunk and markers from the cue chunk; zone loops
+            that match none of the embedded loops warn with EmbeddedLoopMismatchWarning.
+        analyze_audio: If True, stream each sample's audio (once per file) and warn
+            with SampleContentWarning about silent, DC-offset or clipped samples.
+        analyze_loops: If True, read the frames around each zone's effective loop
+            points and SampleStart/SampleEnd and warn with LoopClickWarning where
+            playback is likely to click.
+        find_duplicates: If True, hash each sample's audio (data chunk only, in a
+            thread pool) and warn with DuplicateSampleWarning when the preset loads
+            identical audio from several files, with the memory wasted.
+        overview_dir: If set, store each sample's waveform overview (per-block min/max,
+            see a8_validate.waveform_overview) in this cache directory, computing it
+            only when no fresh sidecar exists. Tools then read it with load_overview.
+
+    Returns:
+        List of dicts, one per sample reference, with the zone ("location"), the
+        referenced name ("sample"), the folder it resolved in ("root") and the full
+        path of the resolved file ("file"); with deep_wav, also the embedded loops and
+        cue points ("embedded": {"loops": [...], "cues": [...]}); with analyze_audio,
+        also the level statistics ("audio", see AudioStats.to_dict); with
+        find_duplicates, also the audio digest ("hash"); with overview_dir, also the
+        sidecar path ("overview", None if the sample could not be decoded)
 
     Raises:
         FileSystemValidationError: If validation fails
@@ -65,16 +716,64 @@ def validate_sample_files(preset_data, folder_path):
     sample_references = _collect_sample_references(preset_data)
 
     # Validate each sample file
+    resolved = []
     for path, sample_filename in sample_references:
-        _validate_sample_file(preset_data, folder_path, sample_filename, path)
+        root, resolved_name = _validate_sample_file(
+            preset_data,
+            folder_path,
+            sample_filename,
+            path,
+            probes,
+            deep_wav=deep_wav,
+            analyze_audio=analyze_audio,
+            analyze_loops=analyze_loops,
+        )
+        sample_info = {
+            "location": _path_to_context(path),
+            "sample": sample_filename,
+            "root": root,
+            "file": os.path.join(root, resolved_name),
+        }
+        if deep_wav:
+            layout = inspect_sample(sample_info["file"])
+            sample_info["embedded"] = {"loops": layout.loops, "cues": layout.cues}
+        if analyze_audio:
+            sample_info["audio"] = analyze_sample(sample_info["file"]).to_dict()
+        if overview_dir is not None:
+            sample_info["overview"] = overview_sample(sample_info["file"], overview_dir)
+        resolved.append(sample_info)
+
+    if find_duplicates:
+        _check_duplicate_samples(resolved)
 
     # Check total memory usage
-    total_memory = calculate_total_memory(preset_data, folder_path)
+    if probes is None:
+        total_memory = calculate_total_memory(preset_data, folder_path)
+    else:
+        total_memory = calculate_total_memory(preset_data, folder_path, probes=probes)
     if total_memory > MAX_MEMORY_BYTES:
         raise MemoryLimitExceededError(
             f"Total memory usage ({total_memory / (1024 * 1024):.2f}MB) " f"exceeds the limit of 422MB"
         )
 
+    return resolved
+
+
+def _check_duplicate_samples(resolved):
+    """Add audio digests to resolved sample dicts and warn about files holding identical audio."""
+    hashes = hash_samples(sample_info["file"] for sample_info in resolved)
+    for sample_info in resolved:
+        if sample_info["file"] in hashes:
+            sample_info["hash"] = hashes[sample_info["file"]][0]
+    for group in find_duplicate_groups(hashes, identity=sample_identity):
+        names = ", ".join(f"'{os.path.basename(f)}'" for f in group["files"])
+        warnings.warn(
+            DuplicateSampleWarning(
+                f"Samples {names} hold identical audio; "
+                f"{group['wasted_bytes'] / (1024 * 1024):.2f}MB of sample memory is loaded more than once"
+            )
+        )
+
 
 def _collect_sample_references(preset_data):
     """
@@ -105,29 +804,106 @@ def _collect_sample_references(preset_data):
     return sample_references
 
 
-def _validate_sample_file(preset_data, folder_path, sample_filename, path: ValidationPath):
+def sample_reference_key(sample_filename):
+    """Return the key a sample file or reference is matched on in reverse lookups: its folded base name."""
+    return fold_sample_name(os.path.basename(sample_filename))
+
+
+def sample_reference_keys(preset_data):
+    """Return the reverse-lookup keys of every sample a preset references, found or not (see sample_reference_key)."""
+    return {sample_reference_key(sample_filename) for _, sample_filename in _collect_sample_references(preset_data)}
+
+
+def referenced_sample_names(preset_data):
+    """Return the distinct sample filenames a preset references, sorted."""
+    return sorted({sample_filename for _, sample_filename in _collect_sample_references(preset_data)})
+
+
+@_in_sample_run
+def sample_dependencies(sample_filenames, folder_path, restat=False):
     """
-    Validate a sample file.
+    Describe the files sample references resolve to, for detecting changes between runs.
+
+    Everything the sample checks depend on is captured from the cached folder listing:
+    which file a reference resolves to, its size and mtime, and how many names match it
+    ignoring case (an added case variant makes a reference ambiguous).
 
     Args:
-        preset_data: Dictionary containing the preset data
-        folder_path: Path to the folder containing the sample files
-        sample_filename: Filename of the sample
-        path: Tuple (preset_key, channel_key, zone_key) for error reporting and line_map
+        sample_filenames: Sample references, as in the preset
+        folder_path: Sample folder, or an ordered sequence of folders
+        restat: If True, stat each resolved file again rather than trusting the listing's
+            stat, which a long-running process may have cached before the file was rewritten
+
+    Returns:
+        List of [reference, full path or None, size, mtime_ns, case-insensitive matches], one per reference
+    """
+    index = get_sample_index(folder_path)
+    dependencies = []
+    for sample_filename in sample_filenames:
+        location = index.locate(sample_filename)
+        if location is not None and restat:
+            try:
+                st = os.stat(os.path.join(*location))
+            except OSError:
+                st = None
+        else:
+            st = index.stat(sample_filename) if location is not None else None
+        dependencies.append(
+            [
+                sample_filename,
+                os.path.join(*location) if location is not None else None,
+                st.st_size if st is not None else None,
+                st.st_mtime_ns if st is not None else None,
+                len(index.candidates(sample_filename)),
+            ]
+        )
+    return dependencies
+
+
+def _locate_sample(index, sample_filename, path: ValidationPath):
+    """
+    Resolve a sample reference against the folder listing, without opening the file.
+
+    Returns:
+        Tuple (root, resolved_name): the folder the sample was found in and its name on disk
 
     Raises:
         SampleFileNotFoundError: If the sample file is not found
-        InvalidSampleFormatError: If the sample file has an invalid format
+        AmbiguousSampleNameError: If the reference matches several files when case is ignored
+        InvalidSampleFormatError: If the sample is not a .wav file
     """
-    sample_path = os.path.join(folder_path, sample_filename)
     context = _path_to_context(path)
 
-    # Check if file exists
-    if not os.path.exists(sample_path):
+    # Check if file exists (ignoring case, as the FAT-formatted card does)
+    location = index.locate(sample_filename)
+    if location is None:
+        candidates = index.candidates(sample_filename)
+        if len(candidates) > 1:
+            raise AmbiguousSampleNameError(
+                f"Sample file '{sample_filename}' referenced in {context} is ambiguous: "
+                f"matches {', '.join(sorted(candidates))} when case is ignored",
+                path=path,
+            )
         raise SampleFileNotFoundError(
             f"Sample file '{sample_filename}' referenced in {context} not found",
             path=path,
         )
+    root, resolved_name = location
+    if resolved_name != sample_filename:
+        warnings.warn(
+            SampleCaseMismatchWarning(
+                f"Sample file '{sample_filename}' referenced in {context} resolved by case-fold to '{resolved_name}'"
+            )
+        )
+    else:
+        candidates = index.candidates(sample_filename)
+        if len(candidates) > 1:
+            warnings.warn(
+                SampleNameCollisionWarning(
+                    f"Sample file '{sample_filename}' referenced in {context} collides with "
+                    f"{', '.join(sorted(c for c in candidates if c != sample_filename))} when case is ignored"
+                )
+            )
 
     # Check if file is a valid WAV file
     if not sample_filename.lower().endswith(".wav"):
@@ -136,54 +912,121 @@ def _validate_sample_file(preset_data, folder_path, sample_filename, path: Valid
             path=path,
         )
 
-    # Try to open as WAV
-    try:
-        with wave.open(sample_path, "rb") as wav_file:
-            # Get sample properties
-            channels = wav_file.getnchannels()
-            sample_width = wav_file.getsampwidth()
-            frame_rate = wav_file.getframerate()
-
-            # Validate sample properties
-            if channels not in [1, 2]:
-                raise InvalidSampleFormatError(
-                    f"Sample file '{sample_filename}' referenced in {context} "
-                    f"has an invalid number of channels: {channels}",
-                    path=path,
-                )
+    return root, resolved_name
 
-            if sample_width not in [1, 2, 3, 4]:
-                raise InvalidSampleFormatError(
-                    f"Sample file '{sample_filename}' referenced in {context} "
-                    f"has an invalid sample width: {sample_width}",
-                    path=path,
-                )
 
-            # Validate sample rate
-            valid_rates = [44100, 48000, 96000, 192000]
-            if frame_rate not in valid_rates:
-                raise InvalidSampleFormatError(
-                    f"Sample file '{sample_filename}' referenced in {context} "
-                    f"has an invalid sample rate: {frame_rate}Hz",
-                    path=path,
-                )
+def _validate_sample_file(
+    preset_data,
+    folder_path,
+    sample_filename,
+    path: ValidationPath,
+    probes=None,
+    deep_wav=False,
+    analyze_audio=False,
+    analyze_loops=False,
+):
+    """
+    Validate a sample file.
+
+    Args:
+        preset_data: Dictionary containing the preset data
+        folder_path: Path to the folder containing the sample files (or a sequence of folders)
+        sample_filename: Filename of the sample
+        path: Tuple (preset_key, channel_key, zone_key) for error reporting and line_map
+        probes: Optional probe table to read the WAV header from
+        deep_wav: If True, check the RIFF chunk structure as well as the header
+        analyze_audio: If True, analyze the audio content and warn about unusable samples
+        analyze_loops: If True, warn about loop points and sample boundaries likely to click
+
+    Returns:
+        Tuple (root, resolved_name): the folder the sample was found in and its name on disk
+
+    Raises:
+        SampleFileNotFoundError: If the sample file is not found
+        InvalidSampleFormatError: If the sample file has an invalid format
+    """
+    context = _path_to_context(path)
+    root, resolved_name = _locate_sample(get_sample_index(folder_path), sample_filename, path)
+    sample_path = os.path.join(root, resolved_name)
 
-    except wave.Error:
+    # Read the WAV header (once per file when a probe table is shared)
+    probe = _get_probe(sample_path, probes)
+    if isinstance(probe.error, wave.Error):
         raise InvalidSampleFormatError(
             f"Sample file '{sample_filename}' referenced in {context} " f"is not a valid WAV file format",
             path=path,
         )
-    except Exception as e:
+    if probe.error is not None:
         raise FileSystemValidationError(
-            f"Error validating sample file '{sample_filename}' referenced in {context}: {str(e)}",
+            f"Error validating sample file '{sample_filename}' referenced in {context}: {str(probe.error)}",
+            path=path,
+        )
+
+    # Validate sample properties
+    if probe.channels not in [1, 2]:
+        raise InvalidSampleFormatError(
+            f"Sample file '{sample_filename}' referenced in {context} "
+            f"has an invalid number of channels: {probe.channels}",
+            path=path,
+        )
+
+    if probe.sample_width not in [1, 2, 3, 4]:
+        raise InvalidSampleFormatError(
+            f"Sample file '{sample_filename}' referenced in {context} "
+            f"has an invalid sample width: {probe.sample_width}",
+            path=path,
+        )
+
+    # Validate sample rate
+    valid_rates = [44100, 48000, 96000, 192000]
+    if probe.frame_rate not in valid_rates:
+        raise InvalidSampleFormatError(
+            f"Sample file '{sample_filename}' referenced in {context} "
+            f"has an invalid sample rate: {probe.frame_rate}Hz",
             path=path,
         )
 
+    # Optionally walk the chunk table: catches truncated data chunks that wave.open accepts
+    if deep_wav:
+        try:
+            layout = inspect_sample(sample_path)
+        except WavStructureError as e:
+            raise InvalidSampleFormatError(
+                f"Sample file '{sample_filename}' referenced in {context} has a damaged WAV structure: {e}",
+                path=path,
+            )
+        except OSError as e:
+            raise FileSystemValidationError(
+                f"Error validating sample file '{sample_filename}' referenced in {context}: {str(e)}",
+                path=path,
+            )
+        for finding in layout.findings:
+            warnings.warn(WavStructureWarning(f"Sample file '{sample_filename}' referenced in {context}: {finding}"))
+        _check_embedded_loops(preset_data, layout, sample_filename, path, probe.n_frames)
+
+    # Optionally stream the audio for silence, DC offset and clipping
+    if analyze_audio:
+        try:
+            stats = analyze_sample(sample_path)
+        except (wave.Error, ValueError, OSError) as e:
+            raise FileSystemValidationError(
+                f"Error analyzing sample file '{sample_filename}' referenced in {context}: {str(e)}",
+                path=path,
+            )
+        for finding in _content_findings(stats):
+            warnings.warn(SampleContentWarning(f"Sample file '{sample_filename}' referenced in {context} {finding}"))
+
     # Validate sample positions if referenced in the preset
-    _validate_sample_positions(preset_data, folder_path, sample_filename, path)
+    _validate_sample_positions(preset_data, folder_path, sample_filename, path, probe if probes is not None else None)
+
+    # Optionally score the waveform around loop points and playback boundaries
+    if analyze_loops:
+        _check_loop_clicks(preset_data, sample_path, sample_filename, path, probe.n_frames)
 
+    return root, resolved_name
 
-def _validate_sample_positions(preset_data, folder_path, sample_filename, path: ValidationPath):
+
+def _validate_sample_positions(preset_data, folder_path, sample_filename, path: ValidationPath, probe=None):
     """
     Validate sample positions referenced in a preset.
 
@@ -192,6 +1035,7 @@ def _validate_sample_positions(preset_data, folder_path, sample_filename, path:
         folder_path: Path to the folder containing the sample files
         sample_filename: Filename of the sample
         path: Tuple (preset_key, channel_key, zone_key) for lookup and error reporting
+        probe: Optional SampleProbe to take the sample length from instead of reading the file
 
     Raises:
         FileSystemValidationError: If validation fails
@@ -215,8 +1059,11 @@ def _validate_sample_positions(preset_data, folder_path, sample_filename, path:
         return
 
     # Get sample length
-    sample_path = os.path.join(folder_path, sample_filename)
-    sample_length = get_sample_length(sample_path)
+    if probe is not None:
+        sample_length = probe.n_frames
+    else:
+        sample_path = get_sample_index(folder_path).resolved_path(sample_filename)
+        sample_length = get_sample_length(sample_path)
     context = _path_to_context(path)
 
     # Validate LoopStart
@@ -252,6 +1099,123 @@ def _validate_sample_positions(preset_data, folder_path, sample_filename, path:
     # We could add a warning here if desired, but it's not a validation failure
 
 
+def _first_defined(key, *scopes):
+    """Return the value of key from the first scope (zone, then channel) that defines it, or None."""
+    for scope in scopes:
+        if key in scope:
+            return scope[key]
+    return None
+
+
+def _effective_loop(channel_value, zone_value, n_frames):
+    """
+    Return the (start, end) frames a zone loops over (end exclusive), or None if it does not loop.
+
+    Zone settings override channel settings; without LoopLength the whole sample loops.
+    """
+    if not _first_defined("LoopMode", zone_value, channel_value):
+        return None
+    loop_start = int(_first_defined("LoopStart", zone_value, channel_value) or 0)
+    loop_length = _first_defined("LoopLength", zone_value, channel_value)
+    if loop_length is None:
+        loop_end = n_frames
+    elif _first_defined("LoopLengthIsEnd", zone_value, channel_value) == 1:
+        loop_end = int(loop_length)
+    else:
+        loop_end = loop_start + int(round(loop_length))
+    loop_end = min(loop_end, n_frames)
+    if loop_end <= loop_start:
+        return None
+    return loop_start, loop_end
+
+
+def _check_embedded_loops(preset_data, layout, sample_filename, path: ValidationPath, n_frames):
+    """Warn when a looping zone's loop matches none of the loops embedded in its sample's smpl chunk."""
+    if not layout.loops or len(path) < 3:
+        return
+    channel_value = preset_data.get(path[0], {}).get(path[1], {})
+    zone_value = channel_value.get(path[2], {})
+    loop = _effective_loop(channel_value, zone_value, n_frames)
+    if loop is None:
+        return
+    # smpl loop ends are inclusive
+    embedded = [(e["start"], e["end"] + 1) for e in layout.loops]
+    if loop in embedded:
+        return
+    context = _path_to_context(path)
+    listed = ", ".join(f"{start}-{end}" for start, end in embedded)
+    warnings.warn(
+        EmbeddedLoopMismatchWarning(
+            f"Sample file '{sample_filename}' referenced in {context}: loop {loop[0]}-{loop[1]} does not match "
+            f"the loop(s) embedded in the file ({listed}); expected LoopStart : {embedded[0][0]} and "
+            f"LoopLength : {embedded[0][1] - embedded[0][0]}"
+        )
+    )
+
+
+def _playback_boundaries(channel_value, zone_value, n_frames):
+    """
+    Return the (name, before, after) frame jumps a zone plays through, for score_boundaries.
+
+    Zone settings override channel settings. A looping zone jumps from its loop end back to
+    its loop start (the whole sample when LoopLength is not set); an explicit SampleStart is
+    entered from silence and an explicit SampleEnd leaves into silence.
+    """
+    boundaries = []
+    loop = _effective_loop(channel_value, zone_value, n_frames)
+    if loop is not None:
+        boundaries.append(("loop", loop[1] - 1, loop[0]))
+
+    sample_start = _first_defined("SampleStart", zone_value, channel_value)
+    if sample_start:
+        boundaries.append(("SampleStart", None, int(sample_start)))
+    sample_end = _first_defined("SampleEnd", zone_value, channel_value)
+    if sample_end is not None:
+        # Assimil8or clamps SampleEnd to the file length
+        boundaries.append(("SampleEnd", min(int(sample_end), n_frames) - 1, None))
+    return boundaries
+
+
+def _check_loop_clicks(preset_data, sample_path, sample_filename, path: ValidationPath, n_frames):
+    """
+    Warn about loop points and sample boundaries of a zone that are likely to click.
+
+    Only the few frames around each boundary are read (see score_boundaries).
+
+    Raises:
+        InvalidSampleFormatError: If the sample's chunk structure cannot be read
+    """
+    if len(path) < 3:
+        return
+    channel_value = preset_data.get(path[0], {}).get(path[1], {})
+    zone_value = channel_value.get(path[2], {})
+    boundaries = _playback_boundaries(channel_value, zone_value, n_frames)
+    if not boundaries:
+        return
+
+    context = _path_to_context(path)
+    try:
+        scores = score_boundaries(sample_path, boundaries)
+    except (WavStructureError, OSError) as e:
+        raise InvalidSampleFormatError(
+            f"Sample file '{sample_filename}' referenced in {context} cannot be analyzed: {e}",
+            path=path,
+        )
+    for score in scores:
+        if not score.clicks:
+            continue
+        if score.name == "loop":
+            where = f"loop back to frame {score.frame}"
+        else:
+            where = f"{score.name} at frame {score.frame}"
+        warnings.warn(
+            LoopClickWarning(
+                f"Sample file '{sample_filename}' referenced in {context}: {where} is likely to click "
+                f"(jump {score.jump * 100:.1f}%, slope change {score.slope * 100:.1f}% of full scale)"
+            )
+        )
+
+
 def get_sample_length(file_path):
     """
     Get the length (in samples) of a WAV file.
@@ -274,60 +1238,136 @@ def get_sample_length(file_path):
         raise FileSystemValidationError(f"Error reading file '{file_path}': {str(e)}")
 
 
-def calculate_total_memory(preset_data, folder_path):
+@_in_sample_run
+def calculate_total_memory(preset_data, folder_path, probes=None):
     """
     Calculate the total memory usage for all samples in a preset.
 
     Args:
         preset_data: Dictionary containing the preset data
-        folder_path: Path to the folder containing the sample files
+        folder_path: Path to the folder containing the sample files (or a sequence of folders)
+        probes: Optional probe table to read WAV headers from (see probe_samples)
 
     Returns:
         int: Total memory usage in bytes
     """
-    # Get unique sample references
-    samples = set()
+    # Get unique sample files: references differing only by case, and symlinks or hardlinks
+    # to one file, share a single (st_dev, st_ino) identity and are loaded once
+    index = get_sample_index(folder_path)
+    samples = {}
     sample_references = _collect_sample_references(preset_data)
     for _, sample_filename in sample_references:
-        samples.add(sample_filename)
+        location = index.locate(sample_filename)
+        if location is not None:
+            sample_path = os.path.join(*location)
+            samples.setdefault(sample_identity(sample_path), (sample_path, sample_filename))
 
     # Calculate total memory
     total_bytes = 0
-    for sample_filename in samples:
-        sample_path = os.path.join(folder_path, sample_filename)
-        if os.path.exists(sample_path):
-            try:
-                with wave.open(sample_path, "rb") as wav_file:
-                    # Calculate memory for this sample
-                    channels = wav_file.getnchannels()
-                    sample_width = wav_file.getsampwidth()
-                    n_frames = wav_file.getnframes()
-
-                    # Memory = channels * width * frames
-                    sample_bytes = channels * sample_width * n_frames
-                    total_bytes += sample_bytes
-            except wave.Error as e:
-                # If WAV file is corrupted or invalid, skip it and log a warning
-                # Using file size would be inaccurate (includes headers, compression, etc.)
-                # Better to skip than give false memory calculations
-                import warnings
-
-                warnings.warn(
-                    f"Cannot calculate memory for '{sample_filename}': {str(e)}. " f"Skipping from memory calculation.",
-                    UserWarning,
-                )
-            except Exception as e:
-                # For other errors (permissions, etc.), also skip
-                import warnings
-
-                warnings.warn(
-                    f"Cannot read '{sample_filename}': {str(e)}. " f"Skipping from memory calculation.",
-                    UserWarning,
-                )
+    for sample_path, sample_filename in samples.values():
+        probe = _get_probe(sample_path, probes)
+        if isinstance(probe.error, wave.Error):
+            # If WAV file is corrupted or invalid, skip it and log a warning
+            # Using file size would be inaccurate (includes headers, compression, etc.)
+            # Better to skip than give false memory calculations
+            warnings.warn(
+                f"Cannot calculate memory for '{sample_filename}': {str(probe.error)}. "
+                f"Skipping from memory calculation.",
+                UserWarning,
+            )
+        elif probe.error is not None:
+            # For other errors (permissions, etc.), also skip
+            warnings.warn(
+                f"Cannot read '{sample_filename}': {str(probe.error)}. " f"Skipping from memory calculation.",
+                UserWarning,
+            )
+        else:
+            total_bytes += probe.memory_bytes
 
     return total_bytes
 
 
+@_in_sample_run
+def resolve_sample_files(preset_data, folder_path):
+    """
+    Resolve every sample reference in a preset against the folder listing, without opening any file.
+
+    Existence, case-folding and the .wav extension are checked as in validate_sample_files;
+    the WAV headers are not read.
+
+    Returns:
+        List of dicts with "location", "sample", "root" and "file", as validate_sample_files
+
+    Raises:
+        FileSystemValidationError: If a reference does not resolve to a .wav file
+    """
+    index = get_sample_index(folder_path)
+    resolved = []
+    for path, sample_filename in _collect_sample_references(preset_data):
+        root, resolved_name = _locate_sample(index, sample_filename, path)
+        resolved.append(
+            {
+                "location": _path_to_context(path),
+                "sample": sample_filename,
+                "root": root,
+                "file": os.path.join(root, resolved_name),
+            }
+        )
+    return resolved
+
+
+@_in_sample_run
+def estimate_total_memory(preset_data, folder_path):
+    """
+    Return an upper bound on a preset's sample memory from file sizes alone.
+
+    Each distinct file counts its size minus WAV_HEADER_ALLOWANCE. The sizes come from the
+    cached folder listing (one stat per file), so no sample is opened. Missing files are
+    skipped, as in calculate_total_memory.
+    """
+    index = get_sample_index(folder_path)
+    sizes = {}
+    for _, sample_filename in _collect_sample_references(preset_data):
+        location = index.locate(sample_filename)
+        if location is not None:
+            sample_path = os.path.join(*location)
+            identity = sample_identity(sample_path)
+            if identity not in sizes:
+                st = index.stat(sample_filename)
+                sizes[identity] = max(0, st.st_size - WAV_HEADER_ALLOWANCE) if st is not None else 0
+    return sum(sizes.values())
+
+
+@_in_sample_run
+def check_memory_budget(preset_data, folder_path, probes=None):
+    """
+    Check a preset against MAX_MEMORY_BYTES, reading WAV headers only when file sizes cannot decide.
+
+    The size-based upper bound (estimate_total_memory) is computed first; only presets
+    whose bound exceeds the limit, i.e. are near or over it, are measured exactly with
+    calculate_total_memory.
+
+    Returns:
+        dict with "estimate_bytes" (the upper bound) and "exact_bytes" (None when the
+        estimate alone decided)
+
+    Raises:
+        MemoryLimitExceededError: If the exact total exceeds the limit
+    """
+    estimate = estimate_total_memory(preset_data, folder_path)
+    if estimate <= MAX_MEMORY_BYTES:
+        return {"estimate_bytes": estimate, "exact_bytes": None}
+    if probes is None:
+        total_memory = calculate_total_memory(preset_data, folder_path)
+    else:
+        total_memory = calculate_total_memory(preset_data, folder_path, probes=probes)
+    if total_memory > MAX_MEMORY_BYTES:
+        raise MemoryLimitExceededError(
+            f"Total memory usage ({total_memory / (1024 * 1024):.2f}MB) " f"exceeds the limit of 422MB"
+        )
+    return {"estimate_bytes": estimate, "exact_bytes": total_memory}
+
+
 def validate_preset_filename(filename):
     """
     Validate that a preset filename follows the required format.
@@ -0,0 +1,139 @@
+"""`.a8ignore` exclusion files: gitignore-style patterns that prune the preset directory walk."""
+
+import os
+import re
+
+IGNORE_FILENAME = ".a8ignore"
+
+
+def _translate_glob(pattern):
+    """Translate one gitignore glob (without negation or trailing slash) into a regular expression."""
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern.startswith("**", i):
+                if pattern.startswith("**/", i):
+                    # Zero or more leading directories
+                    out.append("(?:.*/)?")
+                    i += 3
+                else:
+                    out.append(".*")
+                    i += 2
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = pattern.find("]", i + 2 if pattern.startswith(("[!", "[^"), i) else i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1 : end]
+                if body[:1] in ("!", "^"):
+                    body = "^" + body[1:]
+                out.append("[" + body.replace("\\", "\\\\") + "]")
+                i = end
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+def parse_ignore_lines(lines):
+    """
+    Parse gitignore-syntax lines into (regex, negated, directory_only) rules, in file order.
+
+    Supported: comments (#), blank lines, negation (!), directory-only patterns (trailing /),
+    anchoring (a / at the start or middle ties the pattern to the file's directory), *, ?,
+    [...] classes, ** for any number of directories, and backslash escapes.
+    """
+    rules = []
+    for line in lines:
+        line = line.rstrip("\n").rstrip("\r")
+        # Trailing spaces are ignored unless escaped
+        stripped = line.rstrip(" ")
+        if stripped.endswith("\\") and len(stripped) < len(line):
+            stripped += " "
+        line = stripped
+        if not line or line.startswith("#"):
+            continue
+        negated = line.startswith("!")
+        if negated:
+            line = line[1:]
+        directory_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        if "/" in line:
+            regex = _translate_glob(line.lstrip("/"))
+        else:
+            regex = "(?:.*/)?" + _translate_glob(line)
+        rules.append((regex, negated, directory_only))
+    return rules
+
+
+def _combine(rules):
+    """Compile rules into one alternation, last rule first, so the first alternative that matches decides."""
+    if not rules:
+        return None, ()
+    ordered = list(reversed(rules))
+    pattern = "|".join("({})".format(regex) for regex, _, _ in ordered)
+    return re.compile(pattern, re.DOTALL), tuple(negated for _, negated, _ in ordered)
+
+
+class IgnoreRules:
+    """
+    The combined `.a8ignore` rules in force in one directory.
+
+    Each `.a8ignore` file is compiled into two regular expressions (one for files, one for
+    directories, which also see directory-only patterns); its patterns match paths
+    relative to the directory holding it. Rules of deeper files take precedence over their
+    ancestors', and within a file the last matching pattern wins, as in gitignore.
+    """
+
+    __slots__ = ("base", "parent", "_files", "_file_negations", "_dirs", "_dir_negations")
+
+    def __init__(self, base, rules, parent=None):
+        # Directory of the .a8ignore file, with a trailing separator for prefix slicing
+        self.base = os.path.join(str(base), "")
+        self.parent = parent
+        self._files, self._file_negations = _combine([rule for rule in rules if not rule[2]])
+        self._dirs, self._dir_negations = _combine(rules)
+
+    @classmethod
+    def load(cls, directory, parent=None):
+        """
+        Return the rules in force in a directory: parent extended by the directory's .a8ignore.
+
+        Returns parent unchanged if the file is missing or has no patterns.
+        """
+        try:
+            with open(os.path.join(str(directory), IGNORE_FILENAME), encoding="utf-8", errors="replace") as f:
+                rules = parse_ignore_lines(f)
+        except OSError:
+            return parent
+        if not rules:
+            return parent
+        return cls(directory, rules, parent)
+
+    def is_ignored(self, path, is_dir=False):
+        """Return True if the file or directory at path (under self.base) is excluded."""
+        path = str(path)
+        node = self
+        while node is not None:
+            if path.startswith(node.base):
+                regex, negations = (node._dirs, node._dir_negations) if is_dir else (node._files, node._file_negations)
+                if regex is not None:
+                    relative = path[len(node.base) :]
+                    if os.sep != "/":
+                        relative = relative.replace(os.sep, "/")
+                    match = regex.fullmatch(relative)
+                    if match is not None:
+                        return not negations[match.lastindex - 1]
+            node = node.parent
+        return False
@@ -0,0 +1,113 @@
+"""Loop-point and sample-boundary click analysis for Assimil8or sample files."""
+
+import mmap
+import os
+import struct
+
+from a8_validate.wav_integrity import WavStructureError, scan_wav
+
+# Deviation from the waveform's own continuation, as a fraction of full scale, above which
+# a boundary is likely to click (about -26dBFS)
+CLICK_THRESHOLD = 0.05
+
+_FMT = struct.Struct("<HHIIHH")
+_FULL_SCALE = {1: 128.0, 2: 32768.0, 3: 8388608.0, 4: 2147483648.0}
+
+
+class BoundaryScore:
+    """Discontinuity at one playback boundary, relative to full scale (worst channel)."""
+
+    __slots__ = ("name", "frame", "jump", "slope", "score")
+
+    def __init__(self, name, frame, jump, slope, score):
+        self.name = name
+        # Frame playback continues from (loop start, SampleStart), or the end frame (SampleEnd)
+        self.frame = frame
+        # Amplitude step across the boundary
+        self.jump = jump
+        # Change of slope across the boundary
+        self.slope = slope
+        # Distance of the first frame after the boundary from the linear continuation of
+        # the frames before it; this is what is compared against CLICK_THRESHOLD
+        self.score = score
+
+    @property
+    def clicks(self):
+        """True if the boundary is likely to produce an audible click."""
+        return self.score > CLICK_THRESHOLD
+
+
+def _decode_frame(view, offset, channels, sample_width):
+    """Decode one frame at a byte offset into per-channel values in -1.0-1.0."""
+    scale = _FULL_SCALE[sample_width]
+    values = []
+    for channel in range(channels):
+        start = offset + channel * sample_width
+        raw = view[start : start + sample_width]
+        if sample_width == 1:
+            value = raw[0] - 128
+        else:
+            value = int.from_bytes(raw, "little", signed=True)
+        values.append(value / scale)
+    return values
+
+
+def score_boundaries(file_path, boundaries):
+    """
+    Score the discontinuity at playback boundaries of a PCM WAV file.
+
+    The file is memory-mapped and only the two frames on each side of each boundary are
+    read, so each boundary touches at most a couple of pages however long the sample is.
+
+    Args:
+        file_path: Path to the WAV file
+        boundaries: Iterable of (name, before, after) where playback jumps from frame
+            `before` to frame `after`; either may be None for silence (the start or end
+            of playback). Frames outside the sample are skipped.
+
+    Returns:
+        List of BoundaryScore, one per boundary inside the sample
+
+    Raises:
+        WavStructureError: If the chunk structure is damaged or the format is not PCM
+        OSError: If the file cannot be opened
+    """
+    with open(file_path, "rb") as f:
+        file_size = os.fstat(f.fileno()).st_size
+        if file_size == 0:
+            raise WavStructureError("File is empty")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            layout = scan_wav(view, file_size)
+            fmt_offset, fmt_size = layout.chunk(b"fmt ")
+            if fmt_size < _FMT.size:
+                raise WavStructureError(f"'fmt ' chunk is too short ({fmt_size} bytes)")
+            _, channels, _, _, block_align, bits = _FMT.unpack_from(view, fmt_offset)
+            sample_width = (bits + 7) // 8
+            if sample_width not in _FULL_SCALE or not channels or block_align != channels * sample_width:
+                raise WavStructureError(f"Unsupported PCM layout: {channels} channels, {bits} bits")
+            data_offset, data_size = layout.chunk(b"data")
+            n_frames = data_size // block_align
+
+            def frame(index):
+                # Frames outside the sample read as silence
+                if index is None or index < 0 or index >= n_frames:
+                    return [0.0] * channels
+                return _decode_frame(view, data_offset + index * block_align, channels, sample_width)
+
+            scores = []
+            for name, before, after in boundaries:
+                if (before is not None and not 0 <= before < n_frames) or (
+                    after is not None and not 0 <= after < n_frames
+                ):
+                    continue
+                prev_frame = frame(None if before is None else before - 1)
+                before_frame = frame(before)
+                after_frame = frame(after)
+                next_frame = frame(None if after is None else after + 1)
+                jump = slope = score = 0.0
+                for p, b, a, n in zip(prev_frame, before_frame, after_frame, next_frame):
+                    jump = max(jump, abs(a - b))
+                    slope = max(slope, abs((n - a) - (b - p)))
+                    score = max(score, abs(a - (2 * b - p)))
+                scores.append(BoundaryScore(name, after if after is not None else before + 1, jump, slope, score))
+    return scores
@@ -0,0 +1,372 @@
+"""Language Server Protocol over stdio: live diagnostics for open preset documents."""
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+import warnings
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+from urllib.request import url2pathname
+
+from a8_validate.cross_reference_validator import CrossReferenceError, validate_relationships
+from a8_validate.file_system_validator import (
+    FileSystemValidationError,
+    InvalidPresetFilenameError,
+    referenced_sample_names,
+    sample_run,
+    validate_preset_filename,
+)
+from a8_validate.preset_checks import DEFAULT_CACHE_SIZE, WarmSamples, check_samples, line_for_path, malformed_key_path
+from a8_validate.preset_files import should_ignore_preset_file
+from a8_validate.schema_validator import SchemaValidationError, validate_preset
+from a8_validate.yaml_parser import IncrementalPresetParser, PresetParseError
+
+# Seconds an edit must follow the previous one by to be checked at once; edits closer
+# together are checked once, this long after the last of them
+DEFAULT_DEBOUNCE_SECONDS = 0.1
+
+# LSP DiagnosticSeverity
+SEVERITY_ERROR = 1
+SEVERITY_WARNING = 2
+# JSON-RPC error codes
+_PARSE_ERROR = -32700
+_METHOD_NOT_FOUND = -32601
+_INVALID_REQUEST = -32600
+
+
+def uri_to_path(uri):
+    """Return the local path of a file:// URI, or None for other schemes (e.g. unsaved documents)."""
+    parsed = urlparse(uri)
+    if parsed.scheme != "file":
+        return None
+    path = url2pathname(unquote(parsed.path))
+    if parsed.netloc and parsed.netloc != "localhost":
+        path = "//" + parsed.netloc + path
+    return path
+
+
+def read_message(stream):
+    """
+    Read one JSON-RPC message with Content-Length framing from a binary stream.
+
+    Returns:
+        The decoded message, or None at end of input
+
+    Raises:
+        ValueError: If the header or body is malformed
+    """
+    length = None
+    while True:
+        line = stream.readline()
+        if not line:
+            return None
+        line = line.strip()
+        if not line:
+            if length is None:
+                continue
+            break
+        name, _, value = line.decode("ascii").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    body = stream.read(length)
+    if len(body) < length:
+        return None
+    return json.loads(body)
+
+
+def write_message(stream, message):
+    """Write one JSON-RPC message with Content-Length framing to a binary stream."""
+    body = json.dumps(message, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    stream.write(b"Content-Length: %d\r\n\r\n" % len(body) + body)
+    stream.flush()
+
+
+def _utf16_length(text):
+    return len(text.encode("utf-16-le")) // 2
+
+
+def diagnostic_range(lines, line):
+    """
+    Return the LSP range of a 1-based line: from its first non-blank character to its end.
+
+    Positions are in UTF-16 code units, as LSP requires. A line of None or past the end
+    of the document gives the start of the document.
+    """
+    if line is None or not 1 <= line <= len(lines):
+        return {"start": {"line": 0, "character": 0}, "end": {"line": 0, "character": 0}}
+    text = lines[line - 1]
+    indent = len(text) - len(text.lstrip())
+    return {
+        "start": {"line": line - 1, "character": _utf16_length(text[:indent])},
+        "end": {"line": line - 1, "character": _utf16_length(text)},
+    }
+
+
+class LanguageServer:
+    """
+    Minimal language server publishing diagnostics for open documents.
+
+    check(file_path, text) is called with the document's local path (None for unsaved
+    documents) and full text, and returns dicts with "line" (1-based, or None),
+    "severity" ("error" or "warning") and "message". Documents are synchronized in full.
+
+    Checks run on a worker thread. An edit that follows the previous one by at least
+    debounce seconds is checked at once; a burst of edits is checked once, debounce
+    seconds after its last edit, always against the latest text. Saves and
+    workspace/didChangeWatchedFiles (e.g. a sample rewritten on disk) re-check open
+    documents at once.
+    """
+
+    def __init__(self, check, debounce=DEFAULT_DEBOUNCE_SECONDS, stdin=None, stdout=None):
+        self._check = check
+        self.debounce = debounce
+        self._stdin = stdin if stdin is not None else sys.stdin.buffer
+        self._stdout = stdout if stdout is not None else sys.stdout.buffer
+        # uri -> {"text", "version", "changed"}
+        self._documents = {}
+        # uri -> monotonic time its check is due
+        self._pending = {}
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._shutdown = False
+        self._closed = False
+
+    def send(self, message):
+        with self._write_lock:
+            write_message(self._stdout, message)
+
+    def _schedule(self, uri, immediate=False):
+        """Queue a check of a document (the caller holds the condition)."""
+        now = time.monotonic()
+        document = self._documents[uri]
+        if immediate or now - document["changed"] >= self.debounce:
+            due = now
+        else:
+            due = now + self.debounce
+        document["changed"] = now
+        self._pending[uri] = due
+        self._condition.notify()
+
+    def _worker(self):
+        while True:
+            with self._condition:
+                while True:
+                    if self._closed:
+                        return
+                    now = time.monotonic()
+                    due = min(self._pending.items(), key=lambda item: item[1], default=None)
+                    if due is not None and due[1] <= now:
+                        uri = due[0]
+                        del self._pending[uri]
+                        document = self._documents.get(uri)
+                        if document is not None:
+                            text, version = document["text"], document["version"]
+                            break
+                        continue
+                    self._condition.wait(None if due is None else due[1] - now)
+            self.publish(uri, version, text)
+
+    def publish(self, uri, version, text):
+        """Check one document and publish its diagnostics, unless it was closed or edited during the check."""
+        try:
+            findings = self._check(uri_to_path(uri), text)
+        except Exception as e:
+            findings = [{"line": None, "severity": "error", "message": "Internal error: {}".format(e)}]
+        lines = text.splitlines()
+        diagnostics = [
+            {
+                "range": diagnostic_range(lines, finding["line"]),
+                "severity": SEVERITY_ERROR if finding["severity"] == "error" else SEVERITY_WARNING,
+                "source": "a8-validate",
+                "message": finding["message"],
+            }
+            for finding in findings
+        ]
+        params = {"uri": uri, "diagnostics": diagnostics}
+        if version is not None:
+            params["version"] = version
+        with self._condition:
+            # didClose publishes empty diagnostics under the same lock; an edit has a newer check queued
+            document = self._documents.get(uri)
+            if document is None or document["version"] != version or document["text"] != text:
+                return
+            self.send({"jsonrpc": "2.0", "method": "textDocument/publishDiagnostics", "params": params})
+
+    def _handle(self, message):
+        """Handle one message; returns False once the client sent exit."""
+        method = message.get("method")
+        params = message.get("params") or {}
+        is_request = "id" in message
+        result = None
+        if method == "initialize":
+            result = {
+                "capabilities": {"textDocumentSync": {"openClose": True, "change": 1, "save": {"includeText": False}}},
+                "serverInfo": {"name": "a8-validate"},
+            }
+        elif method == "shutdown":
+            self._shutdown = True
+        elif method == "exit":
+            return False
+        elif method in ("textDocument/didOpen", "textDocument/didChange"):
+            document = params["textDocument"]
+            text = document["text"] if method == "textDocument/didOpen" else params["contentChanges"][-1]["text"]
+            with self._condition:
+                entry = self._documents.setdefault(document["uri"], {"changed": float("-inf")})
+                entry.update(text=text, version=document.get("version"))
+                self._schedule(document["uri"])
+        elif method == "textDocument/didSave":
+            with self._condition:
+                if params["textDocument"]["uri"] in self._documents:
+                    self._schedule(params["textDocument"]["uri"], immediate=True)
+        elif method == "textDocument/didClose":
+            uri = params["textDocument"]["uri"]
+            with self._condition:
+                self._documents.pop(uri, None)
+                self._pending.pop(uri, None)
+                self.send(
+                    {
+                        "jsonrpc": "2.0",
+                        "method": "textDocument/publishDiagnostics",
+                        "params": {"uri": uri, "diagnostics": []},
+                    }
+                )
+        elif method == "workspace/didChangeWatchedFiles":
+            with self._condition:
+                for uri in self._documents:
+                    self._schedule(uri, immediate=True)
+        elif is_request:
+            self.send(
+                {
+                    "jsonrpc": "2.0",
+                    "id": message["id"],
+                    "error": {"code": _METHOD_NOT_FOUND, "message": "Method not found: {}".format(method)},
+                }
+            )
+            return True
+        if is_request:
+            self.send({"jsonrpc": "2.0", "id": message["id"], "result": result})
+        return True
+
+    def run(self):
+        """Serve until the client sends exit or closes stdin; returns the process exit code."""
+        worker = threading.Thread(target=self._worker, name="a8-lsp-check", daemon=True)
+        worker.start()
+        try:
+            while True:
+                try:
+                    message = read_message(self._stdin)
+                except ValueError as e:
+                    self.send({"jsonrpc": "2.0", "id": None, "error": {"code": _PARSE_ERROR, "message": str(e)}})
+                    continue
+                if message is None:
+                    break
+                if not isinstance(message, dict):
+                    self.send(
+                        {
+                            "jsonrpc": "2.0",
+                            "id": None,
+                            "error": {"code": _INVALID_REQUEST, "message": "Invalid request"},
+                        }
+                    )
+                    continue
+                try:
+                    if not self._handle(message):
+                        break
+                except (KeyError, TypeError, IndexError) as e:
+                    if "id" in message:
+                        self.send(
+                            {
+                                "jsonrpc": "2.0",
+                                "id": message["id"],
+                                "error": {"code": _INVALID_REQUEST, "message": str(e)},
+                            }
+                        )
+        finally:
+            with self._condition:
+                self._closed = True
+                self._condition.notify()
+            worker.join()
+        # Per the protocol, exit without a preceding shutdown is an error
+        return 0 if self._shutdown else 1
+
+
+class PresetDiagnostics:
+    """
+    Checks of in-memory preset text for the language server, with findings tied to lines.
+
+    check() parses the text, validates it and runs the sample checks against the
+    document's folder (or samples_dirs), and returns every error and warning with the
+    line it concerns, taken from the parser's line map and the error's path. Work is
+    redone only for what an edit touched: channels whose text is unchanged are not
+    parsed again (IncrementalPresetParser), channels and zones identical to ones already
+    checked are not validated again (the subtree cache of validate_preset and
+    validate_relationships), and sample headers stay cached between checks, refreshed
+    when the files change on disk.
+    """
+
+    __slots__ = ("samples_dirs", "run_samples", "_parser", "_subtrees", "_samples")
+
+    def __init__(self, samples_dirs=None, run_samples=True):
+        self.samples_dirs = [os.path.abspath(folder) for folder in samples_dirs] if samples_dirs else None
+        self.run_samples = run_samples
+        self._parser = IncrementalPresetParser()
+        self._subtrees = {}
+        self._samples = WarmSamples()
+
+    def check(self, file_path, text):
+        """
+        Validate a document's text.
+
+        Args:
+            file_path: The document's path (its name is checked and its folder holds the
+                samples), or None for an unsaved document, which skips both
+            text: The document's current text
+
+        Returns:
+            Dicts with "line" (1-based, or None for the whole document), "severity"
+            ("error" or "warning") and "message", errors first
+        """
+        name = os.path.basename(file_path) if file_path else None
+        if name is not None and should_ignore_preset_file(name):
+            return []
+        if len(self._subtrees) > DEFAULT_CACHE_SIZE:
+            self._subtrees.clear()
+        findings = []
+        line_map = {}
+        with warnings.catch_warnings(record=True) as caught, sample_run(self._samples.caches):
+            warnings.simplefilter("always")
+            try:
+                if name is not None:
+                    validate_preset_filename(name)
+            except InvalidPresetFilenameError as e:
+                findings.append({"line": None, "severity": "error", "message": f"Filename error: {e}"})
+            try:
+                preset_data, line_map = self._parser.parse(file_path or "untitled", text)
+                preset_data = validate_preset(preset_data, mutate=False, subtree_cache=self._subtrees)
+                validate_relationships(preset_data, subtree_cache=self._subtrees)
+                if self.samples_dirs is not None:
+                    folders = self.samples_dirs
+                else:
+                    folders = [os.path.dirname(os.path.abspath(file_path))] if file_path else []
+                if self.run_samples and folders:
+                    self._samples.dependencies(referenced_sample_names(preset_data), folders)
+                    check_samples(preset_data, [Path(f) for f in folders], None, probes=self._samples.probes)
+            except PresetParseError as e:
+                match = re.search(r"on line (\d+)", str(e))
+                line = int(match.group(1)) if match else None
+                findings.append({"line": line, "severity": "error", "message": str(e)})
+            except (SchemaValidationError, CrossReferenceError, FileSystemValidationError, ValueError) as e:
+                # A malformed numbered key ("Zone x") fails int() in the validators and carries no path
+                path = getattr(e, "path", None) or malformed_key_path(line_map)
+                line = line_for_path(path, line_map)
+                findings.append({"line": line, "severity": "error", "message": str(e)})
+        for w in caught:
+            message = str(w.message)
+            # Sample warnings name the zone as "referenced in Preset 1, Channel 2, Zone 3"
+            match = re.search(r"referenced in (Preset [^,:]+(?:, Channel \d+)?(?:, Zone \d+)?)", message)
+            path = tuple(match.group(1).split(", ")) + ("Sample",) if match else None
+            findings.append({"line": line_for_path(path, line_map), "severity": "warning", "message": message})
+        return findings
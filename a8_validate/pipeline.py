@@ -0,0 +1,118 @@
+"""Building blocks for staged pipelines: bounded hand-off queues and per-stage utilization counters."""
+
+import queue
+import threading
+import time
+
+# Seconds between checks of the stop flag while blocked on a queue
+_POLL_SECONDS = 0.05
+
+
+class PipelineStopped(Exception):
+    """Raised inside a stage when the pipeline is shutting down."""
+
+    pass
+
+
+class StageStats:
+    """
+    Counters of one pipeline stage.
+
+    busy is time spent doing the stage's work, starved time waiting for input from the
+    stage before, and blocked time waiting for room in the queue to the next stage
+    (backpressure). Utilization is busy time over the run's wall time per worker.
+    """
+
+    __slots__ = ("name", "workers", "items", "busy", "starved", "blocked", "_lock")
+
+    def __init__(self, name, workers=1):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.busy = 0.0
+        self.starved = 0.0
+        self.blocked = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, busy=0.0, starved=0.0, blocked=0.0, items=0):
+        """Add to the counters (safe to call from several worker threads)."""
+        with self._lock:
+            self.busy += busy
+            self.starved += starved
+            self.blocked += blocked
+            self.items += items
+
+    def to_dict(self, elapsed):
+        """Return the counters as a JSON-serializable dict, with utilization over elapsed seconds."""
+        capacity = elapsed * self.workers
+        return {
+            "workers": self.workers,
+            "items": self.items,
+            "busy_seconds": round(self.busy, 4),
+            "starved_seconds": round(self.starved, 4),
+            "blocked_seconds": round(self.blocked, 4),
+            "utilization": round(min(1.0, self.busy / capacity), 4) if capacity > 0 else 0.0,
+        }
+
+
+class BoundedQueue:
+    """
+    A FIFO hand-off between two stages holding at most maxsize items.
+
+    put blocks while the queue is full, which slows the producing stage to the pace of
+    the consuming one; both put and get give up with PipelineStopped once stop is set.
+    Time spent waiting is charged to the given StageStats as blocked or starved.
+    """
+
+    def __init__(self, maxsize, stop):
+        self._queue = queue.Queue(maxsize)
+        self._stop = stop
+
+    def put(self, item, stats=None):
+        start = time.perf_counter()
+        while True:
+            if self._stop.is_set():
+                raise PipelineStopped()
+            try:
+                self._queue.put(item, timeout=_POLL_SECONDS)
+                break
+            except queue.Full:
+                continue
+        if stats is not None:
+            stats.add(blocked=time.perf_counter() - start)
+
+    def get(self, stats=None):
+        start = time.perf_counter()
+        while True:
+            if self._stop.is_set():
+                raise PipelineStopped()
+            try:
+                item = self._queue.get(timeout=_POLL_SECONDS)
+                break
+            except queue.Empty:
+                continue
+        if stats is not None:
+            stats.add(starved=time.perf_counter() - start)
+        return item
+
+
+def start_stage(target, name, stop, errors):
+    """
+    Run target in a daemon thread.
+
+    PipelineStopped ends the thread quietly; any other exception is appended to errors
+    and sets stop, so every other stage winds down and the consumer can re-raise it.
+    """
+
+    def run():
+        try:
+            target()
+        except PipelineStopped:
+            pass
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+
+    thread = threading.Thread(target=run, name=name, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,225 @@
+"""Per-preset checks shared by directory validation, watch mode, the daemon and the language server."""
+
+import os
+from pathlib import Path
+
+from a8_validate.cross_reference_validator import CrossReferenceError, validate_relationships
+from a8_validate.file_system_validator import (
+    FileSystemValidationError,
+    InvalidPresetFilenameError,
+    SampleCaches,
+    check_memory_budget,
+    resolve_sample_files,
+    sample_dependencies,
+    sample_run,
+    validate_preset_filename,
+    validate_sample_files,
+)
+from a8_validate.schema_validator import SchemaValidationError, validate_preset
+from a8_validate.yaml_parser import InvalidPresetError, PresetParseError, YAMLSyntaxError, parse_yaml_file
+
+# check_samples options, which the callers take under the same names
+CHECK_OPTIONS = ("deep_wav", "analyze_audio", "analyze_loops", "find_duplicates", "overview_dir", "fast_memory")
+# Message of a preset that passed --fast-memory, which does not read sample formats
+FAST_MEMORY_VALID = "Valid (memory bound only; sample formats and positions not checked)"
+# Entries a long-running process (the daemon, the language server) keeps in each cache table by default
+DEFAULT_CACHE_SIZE = 4096
+
+
+def line_for_path(path, line_map):
+    """Resolve a validation path to a line number using the YAML line_map. Returns None if not found."""
+    if not path or not line_map:
+        return None
+    if path in line_map:
+        return line_map[path]
+    # Fallback: prefix match (path may be longer than stored keys)
+    for key_path in line_map.keys():
+        if len(key_path) <= len(path) and path[: len(key_path)] == key_path:
+            return line_map[key_path]
+    return None
+
+
+def malformed_key_path(line_map):
+    """Return the path of the first "Preset/Channel/Zone N" key whose N is not a number, or None."""
+    for key_path in sorted(line_map, key=line_map.__getitem__):
+        prefix, _, number = key_path[-1].partition(" ")
+        if prefix not in ("Preset", "Channel", "Zone") or not number:
+            continue
+        try:
+            int(number.split(" ")[0])
+        except ValueError:
+            return key_path
+    return None
+
+
+def folder_arg(sample_dir):
+    """Convert a sample directory (or ordered sequence of directories) to the form the validators take."""
+    if isinstance(sample_dir, (list, tuple)):
+        return [str(d) for d in sample_dir]
+    return str(sample_dir)
+
+
+def error_message(e, line_map):
+    """Format a validation exception as a result message, adding the line number where known."""
+    if isinstance(e, InvalidPresetFilenameError):
+        return f"Filename error: {e}"
+    if isinstance(e, (YAMLSyntaxError, InvalidPresetError, PresetParseError)):
+        return f"YAML parsing error: {e}"
+    if isinstance(e, SchemaValidationError):
+        return f"Schema validation error: {e}"
+    if isinstance(e, (CrossReferenceError, FileSystemValidationError)):
+        line_number = line_for_path(getattr(e, "path", None), line_map)
+        msg = str(e)
+        if line_number is not None:
+            msg = f"{msg} (line {line_number})"
+        prefix = "Cross-reference error" if isinstance(e, CrossReferenceError) else "Sample file error"
+        return f"{prefix}: {msg}"
+    return f"Unexpected error: {e}"
+
+
+def load_preset(file_path, line_map, run_crossref, content=None):
+    """
+    Check the filename, parse and schema-validate a preset, and optionally cross-reference it.
+
+    line_map is filled in place so the caller can still resolve line numbers when this raises.
+    content is the file's bytes if they were already read (see parse_yaml_file).
+    """
+    validate_preset_filename(file_path.name)
+
+    # Parse the YAML file with line number preservation
+    preset_data, parsed_line_map = parse_yaml_file(str(file_path), return_line_map=True, content=content)
+    line_map.update(parsed_line_map)
+
+    # Validate schema (mutate=False so we do not modify the parsed data)
+    try:
+        preset_data = validate_preset(preset_data, mutate=False)
+    except SchemaValidationError as e:
+        line_number = line_for_path(getattr(e, "path", None), line_map)
+        if line_number is not None:
+            raise SchemaValidationError(f"{e} (line {line_number})", path=getattr(e, "path", None)) from e
+        raise
+
+    if run_crossref:
+        validate_relationships(preset_data)
+    return preset_data
+
+
+def check_samples(
+    preset_data,
+    sample_dir,
+    report,
+    deep_wav=False,
+    analyze_audio=False,
+    analyze_loops=False,
+    find_duplicates=False,
+    overview_dir=None,
+    fast_memory=False,
+    probes=None,
+):
+    """
+    Run the sample checks on a loaded preset, reading headers from probes when given.
+
+    Args:
+        preset_data: The preset, as load_preset returns it
+        sample_dir: Directory used to resolve sample paths, or an ordered sequence of directories
+        report: Optional dict receiving "samples" (see validate_sample_files) and, with
+            fast_memory, "memory" (see check_memory_budget)
+        deep_wav, analyze_audio, analyze_loops, find_duplicates, overview_dir: As for validate_sample_files
+        fast_memory: If True, only resolve the samples and check the memory limit from file sizes
+        probes: Optional probe table (see probe_samples)
+
+    Returns:
+        The message of a preset that passed: "Valid", or FAST_MEMORY_VALID for the fast_memory check
+    """
+    if fast_memory:
+        with sample_run():
+            resolved_samples = resolve_sample_files(preset_data, folder_arg(sample_dir))
+            if probes is None:
+                memory = check_memory_budget(preset_data, folder_arg(sample_dir))
+            else:
+                memory = check_memory_budget(preset_data, folder_arg(sample_dir), probes=probes)
+        if report is not None:
+            report["samples"] = resolved_samples
+            report["memory"] = memory
+        return FAST_MEMORY_VALID
+    resolved_samples = validate_sample_files(
+        preset_data,
+        folder_arg(sample_dir),
+        probes=probes,
+        deep_wav=deep_wav,
+        analyze_audio=analyze_audio,
+        analyze_loops=analyze_loops,
+        find_duplicates=find_duplicates,
+        overview_dir=overview_dir,
+    )
+    if report is not None:
+        report["samples"] = resolved_samples
+    return "Valid"
+
+
+def preset_result(file_path, success, message, preset_warnings, report):
+    """Build the per-preset result record of iter_validate, --json and --ndjson, watch mode and the daemon."""
+    result = {"file": str(file_path), "valid": success, "message": message, "warnings": preset_warnings}
+    if report.get("samples") is not None:
+        result["samples"] = report["samples"]
+    if report.get("memory") is not None:
+        result["memory"] = report["memory"]
+    return result
+
+
+class WarmSamples:
+    """
+    Sample listings and headers kept by a long-running process, checked for changes on disk before each use.
+
+    Sample checks that should use them run inside sample_run(caches). Both tables are
+    emptied once they hold more than DEFAULT_CACHE_SIZE folders or files.
+    """
+
+    __slots__ = ("probes", "caches", "_folders", "_samples")
+
+    def __init__(self):
+        # sample identity -> SampleProbe
+        self.probes = {}
+        self.caches = SampleCaches()
+        # sample folder -> mtime_ns when its listing was cached
+        self._folders = {}
+        # sample path -> (size, mtime_ns) when its header was last read
+        self._samples = {}
+
+    def dependencies(self, sample_filenames, folders):
+        """
+        Bring the cached listings and headers of folders up to date and describe what the references resolve to.
+
+        A folder whose mtime changed has its listing dropped; a referenced file rewritten
+        in place (same inode, folder mtime unchanged) has its folder's headers dropped.
+
+        Returns:
+            sample_dependencies of the references, with each file stat'ed afresh
+        """
+        if len(self.caches.indexes) > DEFAULT_CACHE_SIZE or len(self.probes) > DEFAULT_CACHE_SIZE:
+            self.caches.clear()
+            self.probes.clear()
+            self._folders.clear()
+            self._samples.clear()
+        for folder in folders:
+            try:
+                mtime_ns = os.stat(folder).st_mtime_ns
+            except OSError:
+                mtime_ns = -1
+            if self._folders.get(folder) != mtime_ns:
+                self.caches.clear(folder)
+                self._folders[folder] = mtime_ns
+        with sample_run(self.caches):
+            dependencies = sample_dependencies(sample_filenames, folder_arg([Path(f) for f in folders]), restat=True)
+        for _, path, size, mtime_ns, _ in dependencies:
+            if path is None:
+                continue
+            seen = self._samples.get(path)
+            if seen is not None and seen != (size, mtime_ns):
+                folder = os.path.dirname(path)
+                self.caches.clear(folder)
+                for identity, probe in list(self.probes.items()):
+                    if os.path.dirname(os.path.abspath(probe.path)) == folder:
+                        del self.probes[identity]
+            self._samples[path] = (size, mtime_ns)
+        return dependencies
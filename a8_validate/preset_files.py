@@ -0,0 +1,315 @@
+"""Preset discovery: the directory walk, .a8ignore scoping and the presets a list of changed files affects."""
+
+import os
+import queue
+import threading
+from pathlib import Path
+
+from a8_validate.file_system_validator import fold_sample_name, sample_reference_key, sample_reference_keys
+from a8_validate.ignore_rules import IGNORE_FILENAME, IgnoreRules
+from a8_validate.yaml_parser import DEFAULT_MAX_FILE_BYTES, parse_yaml_file
+
+
+def should_ignore_preset_file(name):
+    """Return True if this preset filename should be ignored (system files)."""
+    ignore_names = {
+        "folderprefs.yml",
+        "lastfolder.yml",
+        "lastpreset.yml",
+        "folderprefs.yaml",
+        "lastfolder.yaml",
+        "lastpreset.yaml",
+    }
+    if name in ignore_names:
+        return True
+    if name.startswith("midi") and (name.endswith(".yml") or name.endswith(".yaml")):
+        return True
+    if name.startswith("._"):
+        return True
+    return False
+
+
+PRESET_SUFFIXES = (".yml", ".yaml")
+
+
+# Default thread count of the parallel directory walk; listing is I/O-bound, so this may exceed the CPU count
+DEFAULT_WALK_WORKERS = 8
+
+
+def iter_preset_files(directory, recursive=False, sort=True, workers=1, use_ignore_files=True):
+    """
+    Yield preset files (.yml and .yaml) under a directory in one os.scandir pass, excluding system files.
+
+    Each directory is listed once and its entries are filtered by name while listing:
+    system files are skipped with should_ignore_preset_file and symlinked directories
+    are not followed. Hidden presets and directories are included, as with Path.rglob. Sample files are passed
+    over by name alone (no stat or Path object), so folders holding thousands of WAVs
+    cost only their listing.
+
+    Args:
+        directory: Directory to search.
+        recursive: If True, search subdirectories as well.
+        sort: If True, sort each directory's presets and subdirectories by name. With one
+            worker the order is then fully deterministic (a directory's presets, then its
+            subdirectories depth first); sorting is per directory, so results start
+            streaming before the whole tree is walked.
+        workers: Number of threads listing directories concurrently (recursive only).
+            Worth raising on network storage, where each listing waits on a round trip.
+            Directories are then yielded as their listings complete, so only the order
+            within a directory is deterministic.
+        use_ignore_files: If True, honour .a8ignore files (gitignore syntax, see
+            a8_validate.ignore_rules) found while walking: excluded presets are skipped
+            and excluded directories are not entered at all.
+
+    Returns:
+        Iterator of paths to preset files.
+
+    Raises:
+        ValueError: If the directory does not exist.
+    """
+    dir_path = Path(directory)
+    if not dir_path.is_dir():
+        raise ValueError(f"Directory not found: {directory}")
+    if recursive and workers > 1:
+        return _walk_preset_files_parallel(dir_path, sort, workers, use_ignore_files)
+    return _walk_preset_files(dir_path, recursive, sort, use_ignore_files)
+
+
+def _list_preset_directory(current, recursive, sort, rules, use_ignore_files):
+    """
+    List one directory.
+
+    Returns:
+        Tuple (preset files, subdirectories to descend into, ignore rules in force here)
+    """
+    with os.scandir(current) as listing:
+        entries = list(listing)
+    if use_ignore_files and any(entry.name == IGNORE_FILENAME for entry in entries):
+        rules = IgnoreRules.load(current, rules)
+    presets = []
+    subdirs = []
+    for entry in entries:
+        name = entry.name
+        if name.endswith(PRESET_SUFFIXES):
+            if not should_ignore_preset_file(name) and entry.is_file():
+                if rules is None or not rules.is_ignored(entry.path):
+                    presets.append(name)
+        elif recursive and entry.is_dir(follow_symlinks=False):
+            # Excluded directories are pruned here, before anything below them is listed
+            if rules is None or not rules.is_ignored(entry.path, is_dir=True):
+                subdirs.append(name)
+    if sort:
+        presets.sort()
+        subdirs.sort()
+    return [current / name for name in presets], [current / name for name in subdirs], rules
+
+
+def _walk_preset_files(dir_path, recursive, sort, use_ignore_files):
+    pending = [(dir_path, None)]
+    while pending:
+        current, rules = pending.pop()
+        try:
+            presets, subdirs, rules = _list_preset_directory(current, recursive, sort, rules, use_ignore_files)
+        except OSError:
+            # Unreadable subdirectories are skipped, as glob does
+            if current is dir_path:
+                raise
+            continue
+        yield from presets
+        # Reversed onto the stack so subdirectories are visited in listing order
+        pending.extend((subdir, rules) for subdir in reversed(subdirs))
+
+
+def _walk_preset_files_parallel(dir_path, sort, workers, use_ignore_files):
+    """
+    Walk subtrees concurrently: worker threads take directories from a shared queue.
+
+    A worker that lists a directory puts its subdirectories back on the queue, so idle
+    workers pick up (steal) subtrees found by busy ones. Presets are handed to the
+    consumer one directory at a time as soon as each listing completes.
+    """
+    # The root is listed here so an unreadable root raises to the caller, as in the serial walk
+    presets, subdirs, rules = _list_preset_directory(dir_path, True, sort, None, use_ignore_files)
+    yield from presets
+    if not subdirs:
+        return
+
+    directories = queue.Queue()
+    found = queue.Queue()
+    stop = threading.Event()
+    lock = threading.Lock()
+    # Directories queued or being listed; the walk is done when this drops to zero
+    outstanding = [len(subdirs)]
+    done = object()
+
+    def worker():
+        while True:
+            item = directories.get()
+            if item is None:
+                return
+            current, rules = item
+            batch = []
+            children = []
+            if not stop.is_set():
+                try:
+                    batch, children, rules = _list_preset_directory(current, True, sort, rules, use_ignore_files)
+                except OSError:
+                    pass
+                except BaseException as e:  # surfaced to the consumer, which re-raises it
+                    found.put(e)
+            with lock:
+                outstanding[0] += len(children) - 1
+                finished = outstanding[0] == 0
+            for child in children:
+                directories.put((child, rules))
+            if batch:
+                found.put(batch)
+            if finished:
+                found.put(done)
+
+    for subdir in subdirs:
+        directories.put((subdir, rules))
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    try:
+        while True:
+            item = found.get()
+            if item is done:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield from item
+    finally:
+        # Also reached when the consumer stops early: remaining listings are skipped
+        stop.set()
+        for _ in threads:
+            directories.put(None)
+
+
+def read_preset(file_path):
+    """
+    Stat and read a preset file, never reading more than parse_yaml_file would.
+
+    Returns:
+        Tuple (stat of the open file, content). content is None for a file over
+        DEFAULT_MAX_FILE_BYTES, which is not read at all; parse_yaml_file rejects it
+        from its size. A file that grew after the stat is read up to one byte past the
+        limit, so the parser still rejects it.
+
+    Raises:
+        OSError: If the file cannot be opened or read
+    """
+    with open(file_path, "rb") as f:
+        st = os.fstat(f.fileno())
+        if st.st_size > DEFAULT_MAX_FILE_BYTES:
+            return st, None
+        return st, f.read(DEFAULT_MAX_FILE_BYTES + 1)
+
+
+def _scope_rules(directory, folder, recursive, use_ignore_files):
+    """
+    Return whether the walk of directory would enter folder, and the .a8ignore rules in force there.
+    """
+    try:
+        relative = folder.relative_to(directory)
+    except ValueError:
+        return False, None
+    if relative.parts and not recursive:
+        return False, None
+    rules = IgnoreRules.load(directory) if use_ignore_files else None
+    current = directory
+    for part in relative.parts:
+        current = current / part
+        if current.is_symlink():
+            return False, None
+        if rules is not None and rules.is_ignored(str(current), is_dir=True):
+            return False, None
+        if use_ignore_files:
+            rules = IgnoreRules.load(current, rules)
+    return True, rules
+
+
+def _references_any(file_path, sample_keys):
+    """Return True if a preset references any of the given sample keys (or cannot be parsed)."""
+    try:
+        _, content = read_preset(file_path)
+    except OSError:
+        return False
+    if content is None:
+        # Over the size limit: not scanned, but selected so validation reports it
+        return True
+    # Cheap text check first: most presets in a folder do not mention the sample at all
+    folded = fold_sample_name(content.decode("utf-8", errors="replace"))
+    if not any(key in folded for key in sample_keys):
+        return False
+    try:
+        preset_data = parse_yaml_file(str(file_path), content=content)
+    except Exception:
+        # Validation reports the error
+        return True
+    return not sample_reference_keys(preset_data).isdisjoint(sample_keys)
+
+
+def presets_for_changed_files(paths, directory, recursive=False, samples_dirs=None, use_ignore_files=True):
+    """
+    Return the presets to validate for a list of changed preset and sample files.
+
+    Listed presets are kept if they exist and the walk of directory would find them (same
+    recursion, system-file and .a8ignore rules). Listed WAVs, including deleted ones,
+    are expanded to the presets that reference them: only the presets that resolve
+    samples from the WAV's folder are scanned (the folder itself in recursive runs,
+    directory otherwise, or every preset when samples_dirs holds the folder), and a
+    preset is parsed only if its text mentions the sample's name.
+
+    Returns:
+        Tuple of (preset paths in walk order, stats), where stats counts the "listed"
+        paths, the "presets" selected, those "expanded" from changed samples and the
+        listed paths "skipped" as neither in scope nor a sample
+    """
+    base = Path(os.path.abspath(directory))
+    sample_roots = {os.path.abspath(d) for d in samples_dirs} if samples_dirs else None
+    selected = set()
+    # sample folder -> reference keys of the changed WAVs in it
+    changed_samples = {}
+    stats = {"listed": 0, "presets": 0, "expanded": 0, "skipped": 0}
+    for path in paths:
+        stats["listed"] += 1
+        file_path = Path(os.path.abspath(path))
+        name = file_path.name
+        if name.lower().endswith(".wav"):
+            changed_samples.setdefault(str(file_path.parent), set()).add(sample_reference_key(name))
+            continue
+        if name.endswith(PRESET_SUFFIXES) and not should_ignore_preset_file(name):
+            in_scope, rules = _scope_rules(base, file_path.parent, recursive, use_ignore_files)
+            if in_scope and file_path.is_file() and (rules is None or not rules.is_ignored(str(file_path))):
+                selected.add(file_path)
+                continue
+        stats["skipped"] += 1
+
+    if changed_samples:
+        if sample_roots is not None:
+            # Every preset searches the same folders: only WAVs in them matter
+            keys = set().union(*(keys for folder, keys in changed_samples.items() if folder in sample_roots))
+            candidates = (
+                iter_preset_files(str(base), recursive=recursive, use_ignore_files=use_ignore_files) if keys else []
+            )
+            scans = [(candidates, keys)]
+        else:
+            scans = []
+            for folder, keys in changed_samples.items():
+                in_scope, rules = _scope_rules(base, Path(folder), recursive, use_ignore_files)
+                if in_scope:
+                    presets, _, _ = _list_preset_directory(Path(folder), False, True, rules, use_ignore_files)
+                    scans.append((presets, keys))
+        for candidates, keys in scans:
+            for file_path in candidates:
+                file_path = Path(os.path.abspath(file_path))
+                if file_path not in selected and _references_any(file_path, keys):
+                    selected.add(file_path)
+                    stats["expanded"] += 1
+
+    stats["presets"] = len(selected)
+    # Walk order (a directory's presets, then its subdirectories), with paths under directory as given
+    ordered = sorted(selected, key=lambda p: (p.parent.parts, p.name))
+    return [Path(directory) / p.relative_to(base) for p in ordered], stats
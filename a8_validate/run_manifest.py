@@ -0,0 +1,160 @@
+"""Run manifest for --incremental: the verdicts of the previous run and what each one depended on."""
+
+import hashlib
+import json
+import os
+import tempfile
+
+from a8_validate import __version__
+from a8_validate.file_system_validator import sample_dependencies
+from a8_validate.yaml_parser import DEFAULT_MAX_FILE_BYTES
+
+MANIFEST_FILENAME = ".a8-manifest.json"
+MANIFEST_VERSION = 1
+
+
+def content_hash(content):
+    """Return the digest a preset's bytes are compared by when its size or mtime changed."""
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+class RunManifest:
+    """
+    Stored verdicts of a validation run, reused by the next run for presets that did not change.
+
+    Each preset entry holds the preset's size, mtime and content hash, its result record,
+    and the state of every sample it references (see sample_dependencies). A verdict is
+    reused when the preset's size and mtime match (or, after a checkout that touched the
+    mtime, its content hash does) and every sample reference still resolves to the same
+    file with the same size and mtime. Paths are stored relative to the validated
+    directory, so a manifest survives the directory being moved.
+
+    The manifest also records the validation options it was made with; a run with other
+    options or another a8-validate version starts from an empty manifest.
+    """
+
+    __slots__ = ("path", "base", "fingerprint", "entries", "reused", "validated", "_next")
+
+    def __init__(self, path, base, fingerprint, entries=None):
+        self.path = str(path)
+        self.base = os.path.abspath(base)
+        self.fingerprint = fingerprint
+        # preset path relative to base -> entry, as loaded
+        self.entries = entries or {}
+        self.reused = 0
+        self.validated = 0
+        # Entries of this run: presets that no longer exist are dropped on save
+        self._next = {}
+
+    @classmethod
+    def load(cls, path, base, options):
+        """
+        Load a manifest, or start an empty one if the file is missing, unreadable or stale.
+
+        Args:
+            path: Manifest file
+            base: The validated directory
+            options: JSON-serializable validation options; entries made with other options are discarded
+        """
+        fingerprint = {"version": __version__, "options": options}
+        try:
+            with open(str(path), encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path, base, fingerprint)
+        if not isinstance(data, dict) or data.get("manifest_version") != MANIFEST_VERSION:
+            return cls(path, base, fingerprint)
+        # Round-trip through JSON so tuples and lists compare equal
+        if data.get("fingerprint") != json.loads(json.dumps(fingerprint)):
+            return cls(path, base, fingerprint)
+        return cls(path, base, fingerprint, data.get("presets") or {})
+
+    def _relative(self, path):
+        return os.path.relpath(os.path.abspath(str(path)), self.base)
+
+    def _dependencies(self, sample_filenames, sample_folder):
+        dependencies = sample_dependencies(sample_filenames, sample_folder)
+        for dependency in dependencies:
+            if dependency[1] is not None:
+                dependency[1] = self._relative(dependency[1])
+        return dependencies
+
+    def lookup(self, file_path, sample_folder):
+        """
+        Return the stored result of a preset if it is still valid for this run, else None.
+
+        Args:
+            file_path: Preset file
+            sample_folder: Sample folder or ordered sequence of folders the preset is checked against
+
+        Returns:
+            The stored result record (with "file" set to file_path), or None if the preset
+            must be validated again
+        """
+        key = self._relative(file_path)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        try:
+            st = os.stat(str(file_path))
+        except OSError:
+            return None
+        # Presets over the parser's size limit are never recorded, and not read to be hashed
+        if st.st_size != entry["size"] or st.st_size > DEFAULT_MAX_FILE_BYTES:
+            return None
+        if st.st_mtime_ns != entry["mtime_ns"]:
+            try:
+                with open(str(file_path), "rb") as f:
+                    # A file that grew since the stat is read one byte past the limit, which cannot match
+                    if content_hash(f.read(DEFAULT_MAX_FILE_BYTES + 1)) != entry["hash"]:
+                        return None
+            except OSError:
+                return None
+            entry = dict(entry, mtime_ns=st.st_mtime_ns)
+        if entry["samples"]:
+            if not sample_folder:
+                return None
+            if self._dependencies([d[0] for d in entry["samples"]], sample_folder) != entry["samples"]:
+                return None
+        self._next[key] = entry
+        self.reused += 1
+        return dict(entry["result"], file=str(file_path))
+
+    def record(self, file_path, st, content, result, sample_filenames=(), sample_folder=None):
+        """
+        Store the result of a preset that was validated in this run.
+
+        Args:
+            file_path: Preset file
+            st: os.stat_result of the preset taken before content was read
+            content: The bytes that were validated
+            result: The result record
+            sample_filenames: Sample references the verdict depends on (empty if it
+                depends on the preset file alone, e.g. a parse error)
+            sample_folder: Sample folder or folders the references were resolved in
+        """
+        self.validated += 1
+        stored = {key: value for key, value in result.items() if key != "file"}
+        self._next[self._relative(file_path)] = {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "hash": content_hash(content),
+            "result": stored,
+            "samples": self._dependencies(sample_filenames, sample_folder) if sample_filenames else [],
+        }
+
+    def save(self):
+        """Write the entries of this run, atomically via a temporary file."""
+        data = {"manifest_version": MANIFEST_VERSION, "fingerprint": self.fingerprint, "presets": self._next}
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(prefix=".a8-", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(temp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
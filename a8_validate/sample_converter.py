@@ -0,0 +1,406 @@
+"""Streaming conversion of WAV files the Assimil8or cannot play into a format it can."""
+
+import array
+import math
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import wave
+
+from a8_validate.wav_integrity import WavStructureError, scan_wav
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the pure-Python path is used without it
+    np = None
+
+VALID_SAMPLE_RATES = (44100, 48000, 96000, 192000)
+DEFAULT_TARGET_RATE = 48000
+
+# Frames read, converted and written per block; memory per conversion stays bounded
+CONVERT_BLOCK_FRAMES = 16384
+# Zero crossings of the windowed-sinc kernel on each side of an output sample
+RESAMPLE_HALF_TAPS = 16
+# Output frames computed per vectorized resampling step (bounds the kernel matrix size)
+_RESAMPLE_CHUNK = 2048
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+_FMT = struct.Struct("<HHIIHH")
+# Chunks a conversion rewrites or that hold no information; any other chunk is dropped
+_REWRITTEN_CHUNKS = (b"fmt ", b"data", b"fact", b"JUNK", b"junk", b"PAD ", b"FLLR")
+
+
+class SampleConversionError(Exception):
+    """Exception raised when a WAV file cannot be read or converted."""
+
+    pass
+
+
+class WavFormat:
+    """The fields of a WAV 'fmt ' chunk relevant to conversion, plus the data chunk location."""
+
+    __slots__ = (
+        "format_tag",
+        "encoding",
+        "channels",
+        "frame_rate",
+        "bits",
+        "block_align",
+        "data_offset",
+        "data_size",
+        "metadata_chunks",
+    )
+
+    def __init__(
+        self, format_tag, encoding, channels, frame_rate, bits, block_align, data_offset, data_size, metadata_chunks=()
+    ):
+        # Tag as stored in the file (may be WAVE_FORMAT_EXTENSIBLE)
+        self.format_tag = format_tag
+        # Actual sample encoding: WAVE_FORMAT_PCM or WAVE_FORMAT_IEEE_FLOAT
+        self.encoding = encoding
+        self.channels = channels
+        self.frame_rate = frame_rate
+        self.bits = bits
+        self.block_align = block_align
+        self.data_offset = data_offset
+        self.data_size = data_size
+        # Ids of the other chunks (smpl, cue, LIST, ...), which a conversion does not copy
+        self.metadata_chunks = list(metadata_chunks)
+
+    @property
+    def sample_width(self):
+        """Bytes per sample of one channel."""
+        return self.block_align // self.channels
+
+
+def read_wav_format(view, file_size):
+    """
+    Read the format and data location of a memory-mapped WAV file, including extensible headers.
+
+    Raises:
+        SampleConversionError: If the file is damaged or not integer/float PCM
+    """
+    try:
+        layout = scan_wav(view, file_size)
+    except WavStructureError as e:
+        raise SampleConversionError(str(e))
+    fmt_offset, fmt_size = layout.chunk(b"fmt ")
+    if fmt_size < _FMT.size:
+        raise SampleConversionError(f"'fmt ' chunk is too short ({fmt_size} bytes)")
+    format_tag, channels, frame_rate, _, block_align, bits = _FMT.unpack_from(view, fmt_offset)
+    encoding = format_tag
+    if format_tag == WAVE_FORMAT_EXTENSIBLE:
+        # cbSize, valid bits, channel mask, then the sub-format GUID whose first two bytes are the tag
+        if fmt_size < 40:
+            raise SampleConversionError("WAVE_FORMAT_EXTENSIBLE header is too short")
+        encoding = struct.unpack_from("<H", view, fmt_offset + 24)[0]
+    if encoding not in (WAVE_FORMAT_PCM, WAVE_FORMAT_IEEE_FLOAT):
+        raise SampleConversionError(f"Unsupported sample encoding 0x{encoding:04x}")
+    if not channels or block_align % channels or block_align // channels not in (1, 2, 3, 4, 8):
+        raise SampleConversionError(f"Unsupported layout: {channels} channels, {block_align} bytes per frame")
+    if encoding == WAVE_FORMAT_IEEE_FLOAT and block_align // channels not in (4, 8):
+        raise SampleConversionError(f"Unsupported float width: {bits} bits")
+    if encoding == WAVE_FORMAT_PCM and block_align // channels > 4:
+        raise SampleConversionError(f"Unsupported integer width: {bits} bits")
+    data_offset, data_size = layout.chunk(b"data")
+    metadata_chunks = [
+        chunk_id.decode("latin-1").strip() for chunk_id in layout.chunks if chunk_id not in _REWRITTEN_CHUNKS
+    ]
+    return WavFormat(
+        format_tag, encoding, channels, frame_rate, bits, block_align, data_offset, data_size, metadata_chunks
+    )
+
+
+def conversion_reasons(fmt):
+    """
+    Return why a WAV format needs converting for the Assimil8or (empty if it does not).
+
+    Mirrors the checks in file_system_validator._validate_sample_file, plus the header
+    types the wave module cannot read.
+    """
+    reasons = []
+    if fmt.format_tag == WAVE_FORMAT_EXTENSIBLE:
+        reasons.append("WAVE_FORMAT_EXTENSIBLE header")
+    if fmt.encoding == WAVE_FORMAT_IEEE_FLOAT:
+        reasons.append(f"{fmt.sample_width * 8}-bit float samples")
+    if fmt.channels not in (1, 2):
+        reasons.append(f"{fmt.channels} channels")
+    if fmt.frame_rate not in VALID_SAMPLE_RATES:
+        reasons.append(f"{fmt.frame_rate}Hz sample rate")
+    return reasons
+
+
+def decode_frames(raw, fmt):
+    """Decode interleaved frames into a list of per-channel float sequences in -1.0-1.0."""
+    width = fmt.sample_width
+    if np is not None:
+        if fmt.encoding == WAVE_FORMAT_IEEE_FLOAT:
+            values = np.frombuffer(raw, dtype="<f4" if width == 4 else "<f8").astype(np.float64)
+        elif width == 1:
+            values = (np.frombuffer(raw, dtype=np.uint8).astype(np.float64) - 128.0) / 128.0
+        elif width == 3:
+            wide = np.zeros((len(raw) // 3, 4), dtype=np.uint8)
+            wide[:, 1:] = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+            values = wide.view("<i4").reshape(-1).astype(np.float64) / 2147483648.0
+        else:
+            values = np.frombuffer(raw, dtype="<i2" if width == 2 else "<i4").astype(np.float64)
+            values /= 32768.0 if width == 2 else 2147483648.0
+        frames = values.reshape(-1, fmt.channels)
+        return [frames[:, c] for c in range(fmt.channels)]
+
+    if fmt.encoding == WAVE_FORMAT_IEEE_FLOAT:
+        values = array.array("f" if width == 4 else "d", raw)
+        if sys.byteorder == "big":
+            values.byteswap()
+        scaled = list(values)
+    elif width == 1:
+        scaled = [(b - 128) / 128.0 for b in raw]
+    elif width == 3:
+        scaled = [int.from_bytes(raw[i : i + 3], "little", signed=True) / 8388608.0 for i in range(0, len(raw), 3)]
+    else:
+        values = array.array("h" if width == 2 else "i", raw)
+        if sys.byteorder == "big":
+            values.byteswap()
+        scale = 32768.0 if width == 2 else 2147483648.0
+        scaled = [v / scale for v in values]
+    return [scaled[c :: fmt.channels] for c in range(fmt.channels)]
+
+
+def _encode(channels, sample_width):
+    """Encode per-channel float sequences as interleaved little-endian integer PCM."""
+    full_scale = float(1 << (8 * sample_width - 1))
+    high, low = full_scale - 1, -full_scale
+    if np is not None:
+        frames = np.stack([np.asarray(c, dtype=np.float64) for c in channels], axis=1).reshape(-1)
+        codes = np.clip(np.round(frames * full_scale), low, high)
+        if sample_width == 1:
+            return (codes + 128).astype(np.uint8).tobytes()
+        if sample_width == 3:
+            return codes.astype("<i4").view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+        return codes.astype("<i2" if sample_width == 2 else "<i4").tobytes()
+
+    out = bytearray()
+    for frame in zip(*channels):
+        for value in frame:
+            code = int(min(high, max(low, round(value * full_scale))))
+            if sample_width == 1:
+                out.append(code + 128)
+            else:
+                out += code.to_bytes(sample_width, "little", signed=True)
+    return bytes(out)
+
+
+def _lanczos(x, half_taps, cutoff):
+    """Lanczos-windowed sinc low-pass kernel at offsets x (in input samples)."""
+    if abs(x) >= half_taps / cutoff:
+        return 0.0
+    y = x * cutoff
+    if y == 0:
+        return cutoff
+    return (
+        cutoff * math.sin(math.pi * y) / (math.pi * y) * math.sin(math.pi * y / half_taps) / (math.pi * y / half_taps)
+    )
+
+
+class StreamingResampler:
+    """
+    Band-limited sample-rate converter fed block by block.
+
+    Each output sample is a Lanczos-windowed sinc interpolation of the input, with the
+    cut-off lowered to the output Nyquist frequency when downsampling, and weights
+    normalized to unity gain. Only the input history the kernel still needs is kept.
+    """
+
+    def __init__(self, in_rate, out_rate, channels, half_taps=RESAMPLE_HALF_TAPS):
+        self.ratio = in_rate / out_rate
+        self.cutoff = min(1.0, out_rate / in_rate)
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.half_taps = half_taps
+        # Input samples on each side of an output sample that carry weight
+        self.reach = int(math.ceil(half_taps / self.cutoff))
+        self.channels = channels
+        # Input history starts with `reach` samples of silence before the first frame
+        self._history = [[0.0] * self.reach for _ in range(channels)]
+        self._base = -self.reach
+        self._next_out = 0
+        self._consumed = 0
+
+    def process(self, block, final=False):
+        """Feed per-channel input samples; return per-channel output samples ready so far."""
+        for c in range(self.channels):
+            self._history[c].extend(block[c])
+        self._consumed += len(block[0]) if self.channels else 0
+        if final:
+            for c in range(self.channels):
+                self._history[c].extend([0.0] * (self.reach + 1))
+            last_out = int(math.ceil(self._consumed * self.out_rate / self.in_rate))
+        else:
+            available = self._base + len(self._history[0])
+            last_out = int(math.floor((available - 1 - self.reach) / self.ratio)) + 1
+        out = self._render(self._next_out, max(self._next_out, last_out))
+        self._next_out = max(self._next_out, last_out)
+        # Drop history no later output can reach
+        keep_from = int(math.floor(self._next_out * self.ratio)) - self.reach + 1
+        drop = max(0, keep_from - self._base)
+        if drop:
+            for c in range(self.channels):
+                del self._history[c][:drop]
+            self._base += drop
+        return out
+
+    def _render(self, first, stop):
+        if np is not None:
+            return self._render_numpy(first, stop)
+        out = [[] for _ in range(self.channels)]
+        for n in range(first, stop):
+            t = n * self.ratio
+            start = int(math.floor(t)) - self.reach + 1
+            weights = [_lanczos(t - k, self.half_taps, self.cutoff) for k in range(start, start + 2 * self.reach)]
+            total = sum(weights) or 1.0
+            offset = start - self._base
+            for c in range(self.channels):
+                history = self._history[c]
+                acc = 0.0
+                for i, w in enumerate(weights):
+                    if w:
+                        acc += w * history[offset + i]
+                out[c].append(acc / total)
+        return out
+
+    def _render_numpy(self, first, stop):
+        history = np.asarray(self._history, dtype=np.float64)
+        taps = np.arange(2 * self.reach)
+        pieces = []
+        for chunk_start in range(first, stop, _RESAMPLE_CHUNK):
+            n = np.arange(chunk_start, min(stop, chunk_start + _RESAMPLE_CHUNK))
+            t = n * self.ratio
+            start = np.floor(t).astype(np.int64) - self.reach + 1
+            k = start[:, None] + taps[None, :]
+            y = (t[:, None] - k) * self.cutoff
+            weights = np.sinc(y) * np.sinc(y / self.half_taps)
+            weights[np.abs(y) >= self.half_taps] = 0.0
+            weights /= weights.sum(axis=1, keepdims=True)
+            pieces.append(np.einsum("nk,cnk->cn", weights, history[:, k - self._base]))
+        if not pieces:
+            return [np.zeros(0) for _ in range(self.channels)]
+        rendered = np.concatenate(pieces, axis=1)
+        return [rendered[c] for c in range(self.channels)]
+
+
+def _target_rate(fmt, target_rate):
+    return fmt.frame_rate if fmt.frame_rate in VALID_SAMPLE_RATES else target_rate
+
+
+def _target_width(fmt, bits):
+    if bits is not None:
+        return bits // 8
+    if fmt.encoding == WAVE_FORMAT_IEEE_FLOAT or fmt.sample_width > 4:
+        return 3
+    return fmt.sample_width
+
+
+def convert_sample(
+    file_path, dest_path=None, target_rate=DEFAULT_TARGET_RATE, bits=None, force=False, dry_run=False, report=None
+):
+    """
+    Rewrite a WAV file as plain integer PCM the Assimil8or can play.
+
+    The data chunk is streamed through in CONVERT_BLOCK_FRAMES blocks: extensible and
+    float headers become plain PCM, more than two channels keep the first two (front
+    left/right), and unsupported sample rates are resampled to target_rate. Other chunks
+    (smpl, cue, LIST, ...) are not copied, so loops and markers stored in the file are
+    lost, and resampling changes the length in frames, so frame positions in presets
+    that use the file no longer match it; report says when either happens. The output
+    is written to a temporary file next to the destination and renamed over it, so a
+    failed conversion never leaves a partial file.
+
+    Args:
+        file_path: WAV file to convert
+        dest_path: Output path; defaults to overwriting file_path
+        target_rate: Sample rate used when the current one is not supported
+        bits: Output bit depth (8, 16, 24 or 32); by default integer PCM keeps its
+            depth and float becomes 24-bit
+        force: Convert even if the file needs no changes (e.g. to apply bits)
+        dry_run: Only work out the reasons; nothing is written
+        report: Optional dict filled when the file is (or would be) converted: "dropped_chunks"
+            lists the ids of the chunks that are not copied, and "rate", if the file is
+            resampled, holds (old rate, new rate); positions in frames scale by new / old
+
+    Returns:
+        List of the reasons the file was (or would be) converted; empty if it was left alone
+
+    Raises:
+        SampleConversionError: If the file cannot be read or converted
+        OSError: If the file cannot be read or written
+    """
+    if bits is not None and bits not in (8, 16, 24, 32):
+        raise SampleConversionError(f"Unsupported output bit depth: {bits}")
+    dest_path = dest_path or file_path
+    temp_path = None
+    try:
+        with open(file_path, "rb") as f:
+            st = os.fstat(f.fileno())
+            if st.st_size == 0:
+                raise SampleConversionError("File is empty")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                fmt = read_wav_format(view, st.st_size)
+                reasons = conversion_reasons(fmt)
+                out_width = _target_width(fmt, bits)
+                if out_width != fmt.sample_width and fmt.encoding == WAVE_FORMAT_PCM:
+                    reasons.append(f"{fmt.sample_width * 8}-bit to {out_width * 8}-bit")
+                if report is not None and (reasons or force):
+                    report["dropped_chunks"] = list(fmt.metadata_chunks)
+                    if _target_rate(fmt, target_rate) != fmt.frame_rate:
+                        report["rate"] = (fmt.frame_rate, _target_rate(fmt, target_rate))
+                if dry_run or (not reasons and not force):
+                    return reasons
+                fd, temp_path = tempfile.mkstemp(
+                    prefix=".a8-", suffix=".wav.tmp", dir=os.path.dirname(os.path.abspath(dest_path))
+                )
+                with os.fdopen(fd, "wb") as out_file:
+                    _stream_convert(view, fmt, out_file, out_width, target_rate)
+        # mkstemp creates the file owner-only; keep the source's permissions
+        os.chmod(temp_path, st.st_mode & 0o7777)
+        # Rename only once the source is closed (Windows cannot replace a mapped file)
+        os.replace(temp_path, dest_path)
+    except BaseException:
+        if temp_path is not None:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+        raise
+    return reasons
+
+
+def _stream_convert(view, fmt, out_file, out_width, target_rate):
+    """Decode, downmix, resample and encode the data chunk block by block into out_file."""
+    out_channels = min(fmt.channels, 2)
+    out_rate = _target_rate(fmt, target_rate)
+    resampler = None
+    if out_rate != fmt.frame_rate:
+        resampler = StreamingResampler(fmt.frame_rate, out_rate, out_channels)
+    with wave.open(out_file, "wb") as writer:
+        writer.setnchannels(out_channels)
+        writer.setsampwidth(out_width)
+        writer.setframerate(out_rate)
+        block_bytes = CONVERT_BLOCK_FRAMES * fmt.block_align
+        end = fmt.data_offset + fmt.data_size - fmt.data_size % fmt.block_align
+        offset = fmt.data_offset
+        while True:
+            raw = view[offset : min(offset + block_bytes, end)]
+            offset += len(raw)
+            final = offset >= end
+            block = decode_frames(raw, fmt)[:out_channels]
+            if resampler is not None:
+                block = resampler.process(block, final=final)
+            if len(block[0]):
+                writer.writeframes(_encode(block, out_width))
+            if final:
+                break
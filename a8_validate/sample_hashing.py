@@ -0,0 +1,128 @@
+"""Content hashing of sample audio for duplicate detection."""
+
+import hashlib
+import mmap
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from a8_validate.wav_integrity import WavStructureError, scan_wav
+
+# Bytes fed to the hash per update; hashlib releases the GIL for large buffers, so threads
+# hashing different files run in parallel
+HASH_BLOCK_BYTES = 1024 * 1024
+DEFAULT_HASH_WORKERS = min(8, os.cpu_count() or 1)
+
+# (st_dev, st_ino, st_size, st_mtime_ns) -> (digest, data size in bytes)
+_hash_cache = {}
+_hash_cache_lock = threading.Lock()
+
+
+def _stat_key(st):
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def hash_sample_data(file_path):
+    """
+    Hash the audio in a WAV file's data chunk, ignoring its name and other chunks.
+
+    Two files with the same digest hold identical audio even if their metadata chunks
+    differ. Results are cached by (device, inode, size, mtime), so an unchanged file is
+    hashed once per process however many names it has.
+
+    Args:
+        file_path: Path to the WAV file
+
+    Returns:
+        Tuple (digest, data_size): hex BLAKE2b digest of the data chunk and its size in bytes
+
+    Raises:
+        WavStructureError: If the chunk structure is damaged
+        OSError: If the file cannot be read
+    """
+    with open(file_path, "rb") as f:
+        st = os.fstat(f.fileno())
+        key = _stat_key(st)
+        with _hash_cache_lock:
+            cached = _hash_cache.get(key)
+        if cached is not None:
+            return cached
+        if st.st_size == 0:
+            raise WavStructureError("File is empty")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            data_offset, data_size = scan_wav(view, st.st_size).chunk(b"data")
+            digest = hashlib.blake2b(digest_size=16)
+            with memoryview(view) as buffer:
+                for start in range(data_offset, data_offset + data_size, HASH_BLOCK_BYTES):
+                    digest.update(buffer[start : min(start + HASH_BLOCK_BYTES, data_offset + data_size)])
+    result = (digest.hexdigest(), data_size)
+    with _hash_cache_lock:
+        _hash_cache[key] = result
+    return result
+
+
+def hash_samples(file_paths, max_workers=DEFAULT_HASH_WORKERS):
+    """
+    Hash many samples' data chunks in a thread pool.
+
+    Args:
+        file_paths: Iterable of WAV paths (duplicates are hashed once)
+        max_workers: Number of hashing threads
+
+    Returns:
+        dict: path -> (digest, data_size); files that cannot be hashed are left out
+    """
+    paths = list(dict.fromkeys(file_paths))
+
+    def hash_one(path):
+        try:
+            return path, hash_sample_data(path)
+        except (WavStructureError, OSError):
+            return path, None
+
+    if len(paths) < 2 or max_workers <= 1:
+        results = map(hash_one, paths)
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(hash_one, paths))
+    return {path: result for path, result in results if result is not None}
+
+
+def find_duplicate_groups(hashes, identity=None):
+    """
+    Group sample files whose audio is identical.
+
+    Args:
+        hashes: dict path -> (digest, data_size), as returned by hash_samples
+        identity: Optional function path -> file identity; paths sharing an identity
+            (links to one file) count as one file, so they are not reported as duplicates
+
+    Returns:
+        List of dicts with "hash", "files" (sorted paths, one per distinct file),
+        "size" (data bytes per copy) and "wasted_bytes" (size times extra copies),
+        largest waste first
+    """
+    groups = {}
+    for path, (digest, size) in hashes.items():
+        key = identity(path) if identity is not None else path
+        files = groups.setdefault(digest, (size, {}))[1]
+        files.setdefault(key, path)
+    duplicates = []
+    for digest, (size, files) in groups.items():
+        if len(files) > 1:
+            duplicates.append(
+                {
+                    "hash": digest,
+                    "files": sorted(files.values()),
+                    "size": size,
+                    "wasted_bytes": size * (len(files) - 1),
+                }
+            )
+    duplicates.sort(key=lambda group: (-group["wasted_bytes"], group["files"]))
+    return duplicates
+
+
+def clear_hash_cache():
+    """Drop all cached sample hashes."""
+    with _hash_cache_lock:
+        _hash_cache.clear()
@@ -1,6 +1,7 @@
 """Schema validator module for Assimil8or preset files."""
 
 import copy
+import hashlib
 import re
 
 
@@ -127,7 +128,34 @@ def _is_numeric_string(value):
     return bool(re.match(r"^[+-]?\d+(\.\d+)?$", value))
 
 
-def validate_preset(preset_data, path=(), mutate=True):
+def _validate_subtree(subtree_cache, path, data, validate):
+    """
+    Run validate(data) unless a subtree with the same path and content was validated already.
+
+    The cache maps the path and a digest of repr(data) to the normalized subtree or the
+    class, arguments and path of the SchemaValidationError it raised, which is raised
+    afresh on every hit (a stored instance would collect a traceback per raise). repr
+    keeps key order, so a reordered subtree (whose first error may differ) is validated
+    again. A subtree is validated as a copy, leaving data unchanged. Returns the
+    normalized subtree, which callers must not modify.
+    """
+    key = ("schema", path, hashlib.blake2b(repr(data).encode("utf-8"), digest_size=16).digest())
+    hit = subtree_cache.get(key)
+    if hit is None:
+        data = copy.deepcopy(data)
+        try:
+            validate(data)
+            hit = (data, None)
+        except SchemaValidationError as e:
+            hit = (None, (type(e), e.args, e.path))
+        subtree_cache[key] = hit
+    if hit[1] is not None:
+        error_class, args, error_path = hit[1]
+        raise error_class(*args, path=error_path)
+    return hit[0]
+
+
+def validate_preset(preset_data, path=(), mutate=True, subtree_cache=None):
     """
     Validate a preset against the schema.
 
@@ -141,6 +169,11 @@ def validate_preset(preset_data, path=(), mutate=True):
         path: Tuple representing the path to this preset in the overall structure
         mutate: If True, modify preset_data in place. If False, leave input unchanged
                 and return a normalized copy. Default True for backward compatibility.
+        subtree_cache: Optional dict kept between calls (e.g. by an editor re-checking a
+                document on every change). Channels and zones identical to ones already
+                validated at the same path are not checked again; their normalized values
+                are shared between results, so results must be treated as read-only.
+                Channels are then replaced by normalized copies rather than modified.
 
     Returns:
         When mutate=False, returns the validated, normalized copy. When mutate=True,
@@ -150,7 +183,11 @@ def validate_preset(preset_data, path=(), mutate=True):
         SchemaValidationError: If validation fails
     """
     if not mutate:
-        preset_data = copy.deepcopy(preset_data)
+        if subtree_cache is None:
+            preset_data = copy.deepcopy(preset_data)
+        else:
+            # Channels are replaced by normalized copies, so only the outer levels are copied
+            preset_data = {key: copy.copy(value) for key, value in preset_data.items()}
 
     for preset_key, preset_value in preset_data.items():
         if not preset_key.startswith("Preset "):
@@ -189,7 +226,16 @@ def validate_preset(preset_data, path=(), mutate=True):
             if param.startswith("Channel "):
                 # Validate channel
                 channel_number = int(param.split(" ")[1])
-                validate_channel(value, channel_number, path=path + (preset_key, param))
+                channel_path = path + (preset_key, param)
+                if subtree_cache is None:
+                    validate_channel(value, channel_number, path=channel_path)
+                else:
+                    preset_value[param] = _validate_subtree(
+                        subtree_cache,
+                        channel_path,
+                        value,
+                        lambda data: validate_channel(data, channel_number, channel_path, subtree_cache),
+                    )
             else:
                 # Validate preset parameter
                 if param not in PRESET_SCHEMA:
@@ -221,7 +267,7 @@ def validate_preset(preset_data, path=(), mutate=True):
     return preset_data
 
 
-def validate_channel(channel_data, channel_number, path=()):
+def validate_channel(channel_data, channel_number, path=(), subtree_cache=None):
     """
     Validate a channel against the schema.
 
@@ -233,6 +279,7 @@ def validate_channel(channel_data, channel_number, path=()):
         channel_data: Dictionary containing the channel data (will be modified in place)
         channel_number: Channel number
         path: Tuple representing the path to this channel in the overall structure
+        subtree_cache: Optional dict of already validated zones (see validate_preset)
 
     Raises:
         SchemaValidationError: If validation fails
@@ -242,7 +289,16 @@ def validate_channel(channel_data, channel_number, path=()):
         if param.startswith("Zone "):
             # Validate zone
             zone_number = int(param.split(" ")[1])
-            validate_zone(value, channel_number, zone_number, path=path + (param,))
+            zone_path = path + (param,)
+            if subtree_cache is None:
+                validate_zone(value, channel_number, zone_number, path=zone_path)
+            else:
+                channel_data[param] = _validate_subtree(
+                    subtree_cache,
+                    zone_path,
+                    value,
+                    lambda data: validate_zone(data, channel_number, zone_number, path=zone_path),
+                )
         else:
             # Validate channel parameter
             if param not in CHANNEL_SCHEMA:
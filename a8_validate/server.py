@@ -0,0 +1,383 @@
+"""Validation daemon: warm validation state, served over a Unix socket (JSON lines) or localhost HTTP."""
+
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from collections import OrderedDict
+from http.client import HTTPConnection
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from a8_validate.cross_reference_validator import validate_relationships
+from a8_validate.file_system_validator import referenced_sample_names, sample_run
+from a8_validate.preset_checks import (
+    CHECK_OPTIONS,
+    DEFAULT_CACHE_SIZE,
+    WarmSamples,
+    check_samples,
+    error_message,
+    load_preset,
+    preset_result,
+)
+from a8_validate.run_manifest import content_hash
+
+DEFAULT_HTTP_PORT = 8708
+# Largest request accepted, in bytes (a preset is limited to 1MB by the parser)
+MAX_REQUEST_BYTES = 4 * 1024 * 1024
+# Options a daemon request may set, with their defaults; the overview cache is fixed when the daemon starts,
+# since a request must not choose where the daemon writes
+_SERVICE_OPTIONS = {
+    "run_crossref": True,
+    "run_samples": True,
+    **{key: False for key in CHECK_OPTIONS if key != "overview_dir"},
+}
+
+
+def default_socket_path():
+    """Return the default daemon socket: a8-validate.sock in $XDG_RUNTIME_DIR, or a per-user temp path."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "a8-validate.sock")
+    uid = os.getuid() if hasattr(os, "getuid") else os.getpid()
+    return os.path.join(tempfile.gettempdir(), "a8-validate-{}.sock".format(uid))
+
+
+def _respond(handler, request):
+    """Run the request handler, turning bad requests and failures into error responses."""
+    try:
+        return handler(request)
+    except (ValueError, TypeError, KeyError) as e:
+        return {"error": "Bad request: {}".format(e)}
+    except Exception as e:
+        return {"error": "Internal error: {}".format(e)}
+
+
+def _decode(line):
+    request = json.loads(line)
+    if not isinstance(request, dict):
+        raise ValueError("request must be a JSON object")
+    return request
+
+
+class _ThreadingUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+
+
+def make_unix_server(path, handler):
+    """
+    Return a server answering JSON-lines requests on a Unix socket; call serve_forever() to run it.
+
+    Each connection may send any number of requests, one JSON object per line, and
+    receives one JSON line per request, in order. Connections are served on their own
+    threads. A stale socket file left by a previous daemon is replaced.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        raise OSError("Unix sockets are not available on this platform; use --http")
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            while True:
+                line = self.rfile.readline(MAX_REQUEST_BYTES + 1)
+                if not line:
+                    return
+                if not line.strip():
+                    continue
+                if len(line) > MAX_REQUEST_BYTES:
+                    response = {"error": "Bad request: larger than {} bytes".format(MAX_REQUEST_BYTES)}
+                else:
+                    try:
+                        response = _respond(handler, _decode(line))
+                    except ValueError as e:
+                        response = {"error": "Bad request: {}".format(e)}
+                self.wfile.write(json.dumps(response, separators=(",", ":")).encode("utf-8") + b"\n")
+                self.wfile.flush()
+
+    if os.path.exists(path):
+        # Refuse to replace a socket a live daemon is still answering on
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+        except OSError:
+            os.unlink(path)
+        else:
+            raise OSError("A daemon is already listening on {}".format(path))
+        finally:
+            probe.close()
+    server = _ThreadingUnixServer(path, Handler)
+    os.chmod(path, 0o600)
+    return server
+
+
+def make_http_server(port, handler, host="127.0.0.1"):
+    """
+    Return a server answering POST /validate with a JSON body on localhost; call serve_forever() to run it.
+
+    GET /stats is answered with handler({"stats": True}). Requests are served on their own threads.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status, response):
+            body = json.dumps(response, separators=(",", ":")).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if self.path != "/validate":
+                self._send(404, {"error": "Not found: {}".format(self.path)})
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            if length > MAX_REQUEST_BYTES:
+                self._send(413, {"error": "Bad request: larger than {} bytes".format(MAX_REQUEST_BYTES)})
+                return
+            try:
+                request = _decode(self.rfile.read(length))
+            except ValueError as e:
+                self._send(400, {"error": "Bad request: {}".format(e)})
+                return
+            response = _respond(handler, request)
+            self._send(400 if "error" in response else 200, response)
+
+        def do_GET(self):
+            if self.path != "/stats":
+                self._send(404, {"error": "Not found: {}".format(self.path)})
+                return
+            self._send(200, _respond(handler, {"stats": True}))
+
+        def log_message(self, format, *args):
+            # Quiet by default; the daemon is called thousands of times per hour
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+class UnixClient:
+    """Client for make_unix_server that sends requests over one persistent connection."""
+
+    def __init__(self, path, timeout=None):
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        self._socket.connect(path)
+        self._file = self._socket.makefile("rwb")
+
+    def request(self, request):
+        self._file.write(json.dumps(request, separators=(",", ":")).encode("utf-8") + b"\n")
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("The daemon closed the connection")
+        return json.loads(line)
+
+    def close(self):
+        self._file.close()
+        self._socket.close()
+
+
+class HTTPClient:
+    """Client for make_http_server over one keep-alive connection."""
+
+    def __init__(self, port, host="127.0.0.1", timeout=None):
+        self._connection = HTTPConnection(host, port, timeout=timeout)
+
+    def request(self, request):
+        body = json.dumps(request, separators=(",", ":")).encode("utf-8")
+        self._connection.request("POST", "/validate", body, {"Content-Type": "application/json"})
+        return json.loads(self._connection.getresponse().read())
+
+    def close(self):
+        self._connection.close()
+
+
+def serve(server, description):
+    """Run a server until interrupted or terminated, announcing it on stderr."""
+    # SIGTERM unwinds like Ctrl-C, so the socket file is removed either way
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print("a8-validate daemon listening on {}".format(description), file=sys.stderr, flush=True)
+    try:
+        server.serve_forever()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        server.server_close()
+
+
+class ValidationService:
+    """
+    Validation with warm caches for the serve daemon.
+
+    Requests are {"file": path} or {"text": preset text, "name": filename}, with optional
+    "samples_dir" (a folder or list of folders; a file's own folder by default, none for
+    text) and "options" (run_crossref, run_samples and the check_samples options except
+    overview_dir, which is the service's). Parsed presets are kept per
+    file stamp or text hash, sample headers per file identity, and each result with the
+    state of the samples it depends on (see sample_dependencies). A repeated request
+    therefore costs a stat of the preset, of its sample folders and of each referenced
+    sample, and is answered from cache unless one of them changed. Only what changed is
+    redone: a changed sample re-runs the sample checks on the cached parse. Both caches
+    are LRU tables of cache_size entries.
+
+    Requests are not validated concurrently: one lock serializes them, because warning
+    capture is process-wide, so clients connected at the same time are answered one
+    request at a time.
+
+    overview_dir, if set, is the waveform overview cache every request's sample checks
+    write to (see check_samples).
+    """
+
+    __slots__ = ("cache_size", "overview_dir", "requests", "hits", "_presets", "_results", "_samples", "_lock")
+
+    def __init__(self, cache_size=DEFAULT_CACHE_SIZE, overview_dir=None):
+        self.cache_size = cache_size
+        self.overview_dir = overview_dir
+        self.requests = 0
+        self.hits = 0
+        # preset key -> {"stamp", "path", "data", "line_map", "error", "warnings", "names"}
+        self._presets = OrderedDict()
+        # (preset key, options key) -> {"stamp", "dependencies", "result"}
+        self._results = OrderedDict()
+        self._samples = WarmSamples()
+        self._lock = threading.Lock()
+
+    def handle(self, request):
+        """Answer one request (see the class docstring); {"stats": true} returns the cache counters."""
+        if request.get("stats"):
+            return self.stats()
+        with self._lock, sample_run(self._samples.caches):
+            start = time.perf_counter()
+            result, cached = self._validate(request)
+            self.requests += 1
+            self.hits += cached
+        return dict(result, cached=cached, elapsed_ms=round((time.perf_counter() - start) * 1000, 3))
+
+    def stats(self):
+        """Return request and cache counters."""
+        return {
+            "requests": self.requests,
+            "hits": self.hits,
+            "presets": len(self._presets),
+            "results": len(self._results),
+            "samples": len(self._samples.probes),
+            "cache_size": self.cache_size,
+        }
+
+    def _remember(self, table, key, value):
+        table[key] = value
+        table.move_to_end(key)
+        while len(table) > self.cache_size:
+            table.popitem(last=False)
+
+    def _validate(self, request):
+        options = dict(_SERVICE_OPTIONS)
+        for key, value in (request.get("options") or {}).items():
+            if key not in _SERVICE_OPTIONS:
+                raise ValueError("unknown option {!r}".format(key))
+            options[key] = value
+
+        content = None
+        if "file" in request:
+            file_path = Path(os.path.abspath(request["file"]))
+            key = ("file", str(file_path))
+            try:
+                st = os.stat(file_path)
+                stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+            except OSError:
+                # Not cached: parse_yaml_file reports the missing file
+                stamp = None
+            default_samples = [str(file_path.parent)]
+        elif "text" in request:
+            content = request["text"].encode("utf-8")
+            file_path = Path(request.get("name") or "prst001.yml")
+            stamp = content_hash(content)
+            key = ("text", file_path.name, stamp)
+            default_samples = None
+        else:
+            raise ValueError("a request needs 'file' or 'text'")
+        samples_dir = request.get("samples_dir", default_samples)
+        if isinstance(samples_dir, str):
+            samples_dir = [samples_dir]
+        folders = [os.path.abspath(folder) for folder in samples_dir or []]
+        run_samples = bool(options["run_samples"] and folders)
+        sample_dir = [Path(folder) for folder in folders]
+
+        preset = self._presets.get(key)
+        if preset is None or stamp is None or preset["stamp"] != stamp:
+            line_map = {}
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always")
+                try:
+                    # Cross-references are an option, so they are checked per request below
+                    preset_data = load_preset(file_path, line_map, False, content=content)
+                    error = None
+                except Exception as e:
+                    preset_data, error = None, error_message(e, line_map)
+            preset = {
+                "stamp": stamp,
+                "data": preset_data,
+                "line_map": line_map,
+                "error": error,
+                "warnings": [str(w.message) for w in caught],
+                "names": referenced_sample_names(preset_data) if preset_data is not None else [],
+            }
+            if stamp is not None:
+                self._remember(self._presets, key, preset)
+        else:
+            self._presets.move_to_end(key)
+
+        dependencies = None
+        if preset["error"] is None and run_samples:
+            dependencies = self._samples.dependencies(preset["names"], folders)
+        options_key = tuple(sorted(options.items())) + tuple(folders)
+        cached = self._results.get((key, options_key))
+        if cached is not None and cached["stamp"] == stamp and cached["dependencies"] == dependencies:
+            self._results.move_to_end((key, options_key))
+            return cached["result"], True
+
+        error = preset["error"]
+        report = {}
+        message = "Valid"
+        preset_warnings = list(preset["warnings"])
+        if error is None:
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always")
+                try:
+                    if options["run_crossref"]:
+                        validate_relationships(preset["data"])
+                    if run_samples:
+                        check_options = {k: options[k] for k in CHECK_OPTIONS if k in options}
+                        message = check_samples(
+                            preset["data"],
+                            sample_dir,
+                            report,
+                            probes=self._samples.probes,
+                            overview_dir=self.overview_dir,
+                            **check_options,
+                        )
+                except Exception as e:
+                    error = error_message(e, preset["line_map"])
+            preset_warnings += [str(w.message) for w in caught]
+        result = preset_result(file_path, error is None, error or message, preset_warnings, report)
+        if stamp is not None:
+            self._remember(
+                self._results, (key, options_key), {"stamp": stamp, "dependencies": dependencies, "result": result}
+            )
+        return result, False
@@ -0,0 +1,359 @@
+"""Streaming schema validator for Assimil8or preset files.
+
+Checks a preset line by line against the schema tables without building the preset
+dictionary or a line map. Intended for schema-only runs over very large corpora where
+only a pass/fail verdict and the first offending line are needed.
+
+The streaming validator handles the plain ``Key : value`` layout that the Assimil8or and
+preset generators write. Anything outside that subset (flow collections, multi-line
+scalars, tags, anchors, duplicate keys, irregular indentation, ...) raises
+UnsupportedSyntaxError so the caller can fall back to parse_yaml_file + validate_preset,
+which keeps verdicts identical to the full path.
+"""
+
+import functools
+import os
+import re
+
+import yaml
+
+from a8_validate.schema_validator import (
+    CHANNEL_SCHEMA,
+    PRESET_SCHEMA,
+    ZONE_SCHEMA,
+    InvalidParameterError,
+    MissingRequiredParameterError,
+    SchemaValidationError,
+    _validate_parameter_value,
+)
+from a8_validate.yaml_parser import (
+    DEFAULT_MAX_FILE_BYTES,
+    DEFAULT_MAX_KEYS,
+    InvalidPresetError,
+    PresetParseError,
+    PresetTooLargeError,
+    TooManyKeysError,
+    coerce_number,
+)
+
+# Nesting levels of a preset: top-level preset keys, preset body, channel body, zone body
+_ROOT, _PRESET, _CHANNEL, _ZONE = range(4)
+
+# Keys the streaming validator accepts; anything else is left to the full parser
+_SIMPLE_KEY_PATTERN = re.compile(r"^[A-Za-z][A-Za-z0-9 ]*$")
+
+# Values starting with these characters are quoted by parse_yaml_file's preprocessing
+_PREPROCESS_QUOTED = "@#:-?"
+
+# Plain scalars may not start with these YAML indicators
+_UNSUPPORTED_VALUE_START = "[]{},&*!|>%`"
+
+_resolver = yaml.resolver.Resolver()
+
+
+class UnsupportedSyntaxError(Exception):
+    """Raised when a preset uses YAML syntax the streaming validator does not handle."""
+
+    def __init__(self, message, line=None):
+        super().__init__(message)
+        self.line = line
+
+
+class _Block:
+    """An open mapping (root, preset, channel or zone) while streaming."""
+
+    __slots__ = ("level", "indent", "key", "line", "path", "number", "seen", "channel_mode", "numbers")
+
+    def __init__(self, level, indent, key=None, line=None, path=(), number=None):
+        self.level = level
+        self.indent = indent
+        self.key = key
+        self.line = line
+        self.path = path
+        self.number = number
+        self.seen = set()
+        self.channel_mode = 0
+        # Channel numbers for a preset block, zone numbers for a channel block
+        self.numbers = []
+
+
+@functools.lru_cache(maxsize=4096)
+def _plain_scalar_tag(value):
+    """Resolve the implicit YAML tag of a plain scalar (as SafeLoader would)."""
+    return _resolver.resolve(yaml.ScalarNode, value, (True, False))
+
+
+def _scalar_value(raw, line):
+    """
+    Convert the raw text after 'Key :' into the value parse_yaml_file would produce.
+
+    Raises:
+        UnsupportedSyntaxError: If the value needs the full YAML parser
+    """
+    first = raw[0]
+
+    # parse_yaml_file wraps these in double quotes; backslashes would become escapes
+    if first in _PREPROCESS_QUOTED:
+        if "\\" in raw:
+            raise UnsupportedSyntaxError("escape sequence in quoted value", line)
+        return raw
+
+    if first in "\"'":
+        if len(raw) < 2 or raw[-1] != first or first in raw[1:-1] or (first == '"' and "\\" in raw):
+            raise UnsupportedSyntaxError("complex quoted value", line)
+        return raw[1:-1]
+
+    if first in _UNSUPPORTED_VALUE_START:
+        raise UnsupportedSyntaxError("YAML indicator at start of value", line)
+
+    comment = raw.find(" #")
+    if comment != -1:
+        raw = raw[:comment].rstrip()
+    if ": " in raw or raw.endswith(":"):
+        raise UnsupportedSyntaxError("mapping indicator inside value", line)
+
+    tag = _plain_scalar_tag(raw)
+    if tag == "tag:yaml.org,2002:str":
+        return raw
+    if tag in ("tag:yaml.org,2002:int", "tag:yaml.org,2002:float"):
+        return coerce_number(raw)
+    if tag == "tag:yaml.org,2002:bool":
+        return yaml.constructor.SafeConstructor.bool_values[raw.lower()]
+    if tag == "tag:yaml.org,2002:null":
+        return None
+    raise UnsupportedSyntaxError(f"unsupported implicit type {tag}", line)
+
+
+def _with_line(error, line):
+    """Return a copy of a schema error with the line number appended to its message."""
+    return type(error)(f"{error} (line {line})", path=error.path)
+
+
+def validate_preset_stream(file_path, max_bytes=DEFAULT_MAX_FILE_BYTES, max_keys=DEFAULT_MAX_KEYS):
+    """
+    Validate a preset file against the schema in a single streaming pass.
+
+    Each line is checked against PRESET_SCHEMA, CHANNEL_SCHEMA and ZONE_SCHEMA as it is
+    read. After the first error, the rest of the file is only scanned for duplicate keys
+    (a later duplicate replaces the offending value in the parsed preset, so it needs the
+    full parser). When a file has several errors, the reported one is the first by line,
+    which may differ from the one validate_preset reports first; the verdict is the same.
+
+    Args:
+        file_path: Path to the preset file
+        max_bytes: Maximum file size in bytes, as in parse_yaml_file (None to disable)
+        max_keys: Maximum number of keys in any single mapping, as in parse_yaml_file
+
+    Raises:
+        SchemaValidationError: If the preset violates the schema (message includes the line)
+        PresetParseError: If the file is empty, too large or not a preset
+        UnsupportedSyntaxError: If the file must be checked with the full parser instead
+    """
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+    file_size = os.path.getsize(file_path)
+    if file_size == 0:
+        raise PresetParseError(f"Empty file: {file_path}")
+    if max_bytes is not None and file_size > max_bytes:
+        raise PresetTooLargeError(f"File size ({file_size} bytes) exceeds the limit of {max_bytes} bytes: {file_path}")
+
+    stack = []
+    # Key whose value was empty: it opens a block if the next line is indented further
+    pending = None
+    first_error = None
+
+    def check(func, *args):
+        nonlocal first_error
+        if first_error is None:
+            try:
+                func(*args)
+            except SchemaValidationError as e:
+                first_error = e
+
+    with open(file_path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.rstrip("\n")
+            stripped = line.lstrip(" ")
+            if not stripped.strip(" ") or stripped.startswith("#"):
+                continue
+            if not line.isprintable():
+                raise UnsupportedSyntaxError("tab or control character", line_number)
+
+            indent = len(line) - len(stripped)
+            colon = stripped.find(":")
+            if colon <= 0 or stripped.startswith(("---", "...", "%", "- ")):
+                raise UnsupportedSyntaxError("line is not a 'Key : value' pair", line_number)
+            key = stripped[:colon].rstrip(" ")
+            raw_value = stripped[colon + 1 :].strip(" ")
+
+            if not stack:
+                stack.append(_Block(_ROOT, indent))
+            if pending is not None:
+                pending_block, pending_key, pending_line = pending
+                pending = None
+                if indent > pending_block.indent:
+                    _open_block(stack, pending_block, pending_key, pending_line, indent)
+                else:
+                    _require_scalar(pending_block, pending_key, pending_line)
+                    check(_handle_value, pending_block, pending_key, None, pending_line)
+            while len(stack) > 1 and indent < stack[-1].indent:
+                check(_close_block, stack.pop())
+            if indent != stack[-1].indent:
+                raise UnsupportedSyntaxError("irregular indentation", line_number)
+
+            block = stack[-1]
+            _track_key(block, key, line_number, max_keys)
+            check(_check_key, block, key, line_number)
+            if raw_value:
+                _require_scalar(block, key, line_number)
+                value = _scalar_value(raw_value, line_number)
+                check(_handle_value, block, key, value, line_number)
+            else:
+                pending = (block, key, line_number)
+
+    if pending is not None:
+        _require_scalar(pending[0], pending[1], pending[2])
+        check(_handle_value, pending[0], pending[1], None, pending[2])
+    if not stack or not stack[0].seen:
+        raise InvalidPresetError(f"Empty or invalid preset file: {file_path}")
+    while stack:
+        check(_close_block, stack.pop())
+    if first_error is not None:
+        raise first_error
+
+
+def _track_key(block, key, line, max_keys):
+    """Record a key in its block, checking for supported syntax, duplicates and the key-count limit."""
+    if not _SIMPLE_KEY_PATTERN.match(key) or _plain_scalar_tag(key) != "tag:yaml.org,2002:str":
+        raise UnsupportedSyntaxError(f"unsupported key {key!r}", line)
+    if key in block.seen:
+        raise UnsupportedSyntaxError(f"duplicate key {key!r}", line)
+    if max_keys is not None and len(block.seen) >= max_keys:
+        raise TooManyKeysError(f"Mapping has more than {max_keys} keys (line {line})")
+    block.seen.add(key)
+
+
+def _check_key(block, key, line):
+    """Check a key against the preset structure (preset keys, channel and zone numbering)."""
+    if block.level == _ROOT:
+        if not key.startswith("Preset "):
+            raise InvalidParameterError(f"Invalid preset key: {key} (line {line})", path=(key,))
+
+    elif block.level == _PRESET and key.startswith("Channel "):
+        try:
+            number = int(key.split(" ")[1])
+        except (IndexError, ValueError):
+            raise InvalidParameterError(f"Invalid channel key format: {key} (line {line})", path=block.path + (key,))
+        if len(block.numbers) >= 8:
+            raise SchemaValidationError(
+                f"Preset {block.key} has more than 8 channels, maximum allowed is 8 (line {line})", path=block.path
+            )
+        if block.numbers and number < block.numbers[-1]:
+            raise SchemaValidationError(
+                f"Channel numbers in {block.key} must be in ascending order (line {line})", path=block.path
+            )
+        if number < 1 or number > 8:
+            raise SchemaValidationError(
+                f"Channel numbers in {block.key} must be between 1 and 8 (line {line})", path=block.path
+            )
+        block.numbers.append(number)
+
+    elif block.level == _CHANNEL and key.startswith("Zone "):
+        try:
+            number = int(key.split(" ")[1])
+        except (IndexError, ValueError):
+            raise InvalidParameterError(f"Invalid zone key format: {key} (line {line})", path=block.path + (key,))
+        if len(block.numbers) >= 8:
+            raise SchemaValidationError(
+                f"Channel {block.number} has more than 8 zones, maximum allowed is 8 (line {line})", path=block.path
+            )
+        block.numbers.append(number)
+
+
+def _is_section_key(block, key):
+    """Return True if key opens a nested preset, channel or zone mapping."""
+    return (
+        block.level == _ROOT
+        or (block.level == _PRESET and key.startswith("Channel "))
+        or (block.level == _CHANNEL and key.startswith("Zone "))
+    )
+
+
+def _open_block(stack, parent, key, line, indent):
+    """Push the mapping opened by key onto the stack."""
+    if not _is_section_key(parent, key):
+        raise UnsupportedSyntaxError(f"nested mapping under parameter {key!r}", line)
+    try:
+        number = int(key.split(" ")[1])
+    except (IndexError, ValueError):
+        # Already reported by _check_key; the number is only used in messages
+        number = None
+    stack.append(_Block(parent.level + 1, indent, key=key, line=line, path=parent.path + (key,), number=number))
+
+
+def _require_scalar(block, key, line):
+    """Leave preset, channel and zone keys with scalar or empty values to the full parser."""
+    if _is_section_key(block, key):
+        raise UnsupportedSyntaxError(f"{key!r} is not a mapping", line)
+
+
+def _handle_value(block, key, value, line):
+    """Validate a scalar value for key in the given block."""
+    path = block.path + (key,)
+    try:
+        if block.level == _PRESET:
+            if key not in PRESET_SCHEMA:
+                raise InvalidParameterError(f"Invalid preset parameter: {key}", path=path)
+            # Special case: convert Name to string if not already
+            if key == "Name" and not isinstance(value, str):
+                value = str(value)
+            _validate_parameter_value(key, value, PRESET_SCHEMA[key], context=block.key, path=path)
+
+        elif block.level == _CHANNEL:
+            if key not in CHANNEL_SCHEMA:
+                raise InvalidParameterError(f"Invalid channel parameter: {key} in Channel {block.number}", path=path)
+            value = _validate_parameter_value(
+                key, value, CHANNEL_SCHEMA[key], context=f"Channel {block.number}", path=path
+            )
+            if key == "ChannelMode":
+                block.channel_mode = value
+
+        else:
+            context = f"Channel {block.path[1].split(' ')[1]}, Zone {block.number}"
+            if key not in ZONE_SCHEMA:
+                raise InvalidParameterError(f"Invalid zone parameter: {key} in {context}", path=path)
+            _validate_parameter_value(key, value, ZONE_SCHEMA[key], context, path=path)
+    except SchemaValidationError as e:
+        raise _with_line(e, line) from e
+
+
+def _close_block(block):
+    """Run the checks that need a complete preset, channel or zone mapping."""
+    if block.level == _PRESET:
+        for param, schema in PRESET_SCHEMA.items():
+            if schema.get("required", False) and param not in block.seen:
+                raise MissingRequiredParameterError(
+                    f"Missing required preset parameter: {param} (line {block.line})", path=block.path + (param,)
+                )
+
+    elif block.level == _CHANNEL:
+        # Link (1) and Cycle (2) modes reference another channel's zones
+        if not block.numbers and block.channel_mode not in (1, 2):
+            raise SchemaValidationError(
+                f"Channel {block.number} must have at least one zone (line {block.line})", path=block.path
+            )
+        if sorted(block.numbers) != list(range(1, len(block.numbers) + 1)):
+            raise SchemaValidationError(
+                f"Zone numbers in Channel {block.number} must be sequential starting from 1 (line {block.line})",
+                path=block.path,
+            )
+
+    elif block.level == _ZONE:
+        channel_number = block.path[1].split(" ")[1]
+        for param, schema in ZONE_SCHEMA.items():
+            if schema.get("required", False) and param not in block.seen:
+                raise MissingRequiredParameterError(
+                    f"Missing required zone parameter: {param} in Channel {channel_number}, Zone {block.number} "
+                    f"(line {block.line})",
+                    path=block.path + (param,),
+                )
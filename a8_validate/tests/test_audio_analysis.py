@@ -0,0 +1,99 @@
+"""Tests for the streaming audio analysis component."""
+
+import struct
+import wave
+
+import pytest
+
+from a8_validate import audio_analysis, file_system_validator
+from a8_validate.audio_analysis import analyze_wav
+from a8_validate.file_system_validator import (
+    SampleContentWarning,
+    clear_sample_index_cache,
+    sample_run,
+    validate_sample_files,
+)
+
+DECODERS = [
+    pytest.param(False, id="python"),
+    pytest.param(
+        True, id="numpy", marks=pytest.mark.skipif(audio_analysis.np is None, reason="NumPy is not installed")
+    ),
+]
+
+
+def _encode(values, sample_width):
+    """Encode signed integer sample values as little-endian PCM of the given width."""
+    if sample_width == 1:
+        return bytes(v + 128 for v in values)
+    if sample_width == 3:
+        return b"".join(struct.pack("<i", v)[:3] for v in values)
+    return struct.pack("<" + ("h" if sample_width == 2 else "i") * len(values), *values)
+
+
+def _write_wav(path, values, sample_width=2, channels=1):
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(sample_width)
+        w.setframerate(48000)
+        w.writeframes(_encode(values, sample_width))
+    return str(path)
+
+
+class TestAnalyzeWav:
+    """Test cases for analyze_wav."""
+
+    @pytest.mark.parametrize("use_numpy", DECODERS)
+    @pytest.mark.parametrize("sample_width,full_scale", [(1, 128), (2, 32768), (3, 8388608), (4, 2147483648)])
+    def test_decodes_every_width(self, tmp_path, use_numpy, sample_width, full_scale):
+        high, low = full_scale - 1, -full_scale
+        values = [0, full_scale // 2, -(full_scale // 2), high, low, 0]
+        path = _write_wav(tmp_path / "s.wav", values, sample_width=sample_width)
+        stats = analyze_wav(path, block_frames=4, use_numpy=use_numpy)
+        assert stats.frames == 6
+        assert stats.peak == pytest.approx(1.0)
+        assert stats.dc == pytest.approx(sum(values) / 6 / full_scale)
+        assert stats.rms == pytest.approx((sum(v * v for v in values) / 6) ** 0.5 / full_scale)
+        assert stats.clipped == 2
+
+    @pytest.mark.parametrize("use_numpy", DECODERS)
+    def test_stereo_and_empty(self, tmp_path, use_numpy):
+        stats = analyze_wav(_write_wav(tmp_path / "st.wav", [100, -100] * 10, channels=2), use_numpy=use_numpy)
+        assert (stats.frames, stats.channels, stats.dc) == (10, 2, 0.0)
+        stats = analyze_wav(_write_wav(tmp_path / "e.wav", []), use_numpy=use_numpy)
+        assert (stats.frames, stats.peak, stats.clipped) == (0, 0.0, 0)
+
+
+class TestSampleContentAnalysis:
+    """Test cases for the opt-in analysis stage of validate_sample_files."""
+
+    def _preset(self, *samples):
+        channels = {f"Channel {i}": {"Zone 1": {"Sample": name}} for i, name in enumerate(samples, start=1)}
+        return {"Preset 1": {"Name": "T", **channels}}
+
+    def test_reports_silence_dc_and_clipping(self, tmp_path):
+        _write_wav(tmp_path / "silent.wav", [0] * 100)
+        _write_wav(tmp_path / "dc.wav", [8000] * 100)
+        _write_wav(tmp_path / "clip.wav", [32767, -32768] * 20)
+        clear_sample_index_cache()
+        with pytest.warns(SampleContentWarning) as record:
+            resolved = validate_sample_files(
+                self._preset("silent.wav", "dc.wav", "clip.wav"), str(tmp_path), analyze_audio=True
+            )
+        messages = [str(w.message) for w in record]
+        assert any("'silent.wav'" in m and "is silent" in m for m in messages)
+        assert any("'dc.wav'" in m and "DC offset of +24.4%" in m for m in messages)
+        assert any("'clip.wav'" in m and "40 clipped samples" in m for m in messages)
+        assert resolved[2]["audio"]["clipped"] == 40
+        clear_sample_index_cache()
+
+    def test_repeated_references_are_analyzed_once(self, tmp_path, monkeypatch):
+        _write_wav(tmp_path / "kick.wav", [1000, -1000] * 10)
+        clear_sample_index_cache()
+        calls = []
+        real_analyze = file_system_validator.analyze_wav
+        monkeypatch.setattr(file_system_validator, "analyze_wav", lambda p: calls.append(p) or real_analyze(p))
+        with sample_run():
+            validate_sample_files(self._preset("kick.wav", "kick.wav"), str(tmp_path), analyze_audio=True)
+            validate_sample_files(self._preset("kick.wav"), str(tmp_path), analyze_audio=True)
+        assert len(calls) == 1
@@ -550,3 +550,40 @@ class TestCrossReferenceValidator:
 
         # Error should mention missing LoopLength
         assert "LoopLength" in str(exc_info.value)
+
+
+class TestRelationshipSubtreeCache:
+    """Test cases for validate_relationships' subtree_cache (user-050)."""
+
+    def test_channel_results_are_reused(self, monkeypatch):
+        import a8_validate.cross_reference_validator as cross_reference_validator
+
+        preset = {
+            "Preset 1": {
+                "Name": "Cached",
+                "Channel 1": {
+                    "Zone 1": {"Sample": "a.wav", "MinVoltage": 5.0},
+                    "Zone 2": {"Sample": "b.wav", "MinVoltage": 0.0},
+                },
+                "Channel 2": {
+                    "Zone 1": {"Sample": "a.wav", "MinVoltage": 0.0},
+                    "Zone 2": {"Sample": "b.wav", "MinVoltage": 5.0},
+                },
+            }
+        }
+        cache = {}
+        raised = []
+        for _ in range(2):
+            with pytest.raises(ZoneVoltageRangeError) as exc_info:
+                validate_relationships(preset, subtree_cache=cache)
+            assert exc_info.value.path[:2] == ("Preset 1", "Channel 2")
+            raised.append(exc_info.value)
+        assert raised[0] is not raised[1] and str(raised[0]) == str(raised[1])
+        assert all(len(key[2]) == 16 for key in cache)
+        calls = []
+        monkeypatch.setattr(
+            cross_reference_validator, "_validate_channel_relationships", lambda *args, **kwargs: calls.append(args)
+        )
+        with pytest.raises(ZoneVoltageRangeError):
+            validate_relationships(preset, subtree_cache=cache)
+        assert calls == []
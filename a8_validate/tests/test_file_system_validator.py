@@ -1,21 +1,44 @@
 """Tests for the file system validator component."""
 
 import os
+import sys
 import tempfile
+import threading
+import warnings
 
 import pytest
 
 # Import the module that doesn't exist yet (this will cause the test to fail initially)
 from a8_validate.file_system_validator import (
+    AmbiguousSampleNameError,
     FileSystemValidationError,
     InvalidPresetFilenameError,
     InvalidSampleFormatError,
     MemoryLimitExceededError,
+    SampleCaches,
+    SampleCaseMismatchWarning,
+    SampleDirectoryIndex,
     SampleFileNotFoundError,
+    SampleNameCollisionWarning,
+    SampleSearchPath,
+    calculate_total_memory,
+    check_memory_budget,
+    clear_sample_index_cache,
+    estimate_total_memory,
+    get_sample_index,
+    probe_samples,
+    resolve_sample_files,
+    sample_identity,
+    sample_run,
     validate_preset_filename,
     validate_sample_files,
 )
 
+MINIMAL_WAV = (
+    b"RIFF\x24\x00\x00\x00WAVEfmt \x10\x00\x00\x00\x01\x00\x01\x00"
+    b"\x44\xac\x00\x00\x88\x58\x01\x00\x02\x00\x10\x00data\x00\x00\x00\x00"
+)
+
 
 class TestFileSystemValidator:
     """Test cases for the file system validator component."""
@@ -359,3 +382,363 @@ class TestFileSystemValidator:
             with pytest.raises(InvalidPresetFilenameError) as exc_info:
                 validate_preset_filename(filename)
             assert "format" in str(exc_info.value).lower() or "lowercase" in str(exc_info.value).lower()
+
+
+class TestSampleDirectoryIndex:
+    """Test cases for the per-folder sample index (user-028)."""
+
+    def test_lookups_answered_from_listing(self, tmp_path):
+        (tmp_path / "kick.wav").write_bytes(MINIMAL_WAV)
+        index = SampleDirectoryIndex(str(tmp_path))
+        assert index.exists("kick.wav")
+        assert index.size("kick.wav") == len(MINIMAL_WAV)
+        assert index.inode("kick.wav") == os.stat(tmp_path / "kick.wav").st_ino
+        assert not index.exists("snare.wav")
+        assert index.size("snare.wav") is None
+
+    def test_negative_lookups_are_cached(self, tmp_path, monkeypatch):
+        index = SampleDirectoryIndex(str(tmp_path))
+        calls = []
+        real_stat = os.stat
+        monkeypatch.setattr(os, "stat", lambda p, *a, **k: calls.append(p) or real_stat(p, *a, **k))
+        for _ in range(5):
+            assert not index.exists("missing.wav")
+        assert len(calls) == 1
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="symlinks need elevated privileges on Windows")
+    def test_broken_symlink_does_not_exist(self, tmp_path):
+        os.symlink(str(tmp_path / "gone.wav"), str(tmp_path / "link.wav"))
+        assert not SampleDirectoryIndex(str(tmp_path)).exists("link.wav")
+
+    def test_index_is_cached_per_folder_until_cleared(self, tmp_path):
+        with sample_run():
+            first = get_sample_index(str(tmp_path))
+            assert get_sample_index(str(tmp_path) + os.sep) is first
+            clear_sample_index_cache(str(tmp_path))
+            assert get_sample_index(str(tmp_path)) is not first
+
+    def test_folder_listed_once_for_many_presets(self, tmp_path, monkeypatch):
+        (tmp_path / "kick.wav").write_bytes(MINIMAL_WAV)
+        scans = []
+        real_scandir = os.scandir
+        monkeypatch.setattr(os, "scandir", lambda p: scans.append(p) or real_scandir(p))
+        preset = {"Preset 1": {"Name": "T", "Channel 1": {"Zone 1": {"Sample": "kick.wav"}}}}
+        with sample_run():
+            for _ in range(3):
+                validate_sample_files(preset, str(tmp_path))
+        assert len(scans) == 1
+
+
+class TestSampleRun:
+    """Test cases for run-scoped sample caches (user-028)."""
+
+    PRESET = {"Preset 1": {"Name": "T", "Channel 1": {"Zone 1": {"Sample": "kick.wav"}}}}
+
+    def test_calls_outside_a_run_see_new_files(self, tmp_path):
+        with pytest.raises(SampleFileNotFoundError):
+            validate_sample_files(self.PRESET, str(tmp_path))
+        (tmp_path / "kick.wav").write_bytes(MINIMAL_WAV)
+        validate_sample_files(self.PRESET, str(tmp_path))
+
+    def test_caches_are_dropped_when_the_run_ends(self, tmp_path):
+        (tmp_path / "kick.wav").write_bytes(MINIMAL_WAV)
+        with sample_run() as caches:
+            with sample_run() as inner:
+                assert inner is caches
+                validate_sample_files(self.PRESET, str(tmp_path), deep_wav=True)
+            assert caches.indexes and caches.layouts
+            assert get_sample_index(str(tmp_path)) is caches.indexes[str(tmp_path)]
+        assert get_sample_index(str(tmp_path)) is not get_sample_index(str(tmp_path))
+        (tmp_path / "kick.wav").write_bytes(MINIMAL_WAV[:-4])
+        with pytest.raises(InvalidSampleFormatError):
+            validate_sample_files(self.PRESET, str(tmp_path), deep_wav=True)
+
+    def test_long_running_callers_keep_their_caches(self, tmp_path):
+        (tmp_path / "kick.wav").write_bytes(MINIMAL_WAV)
+        caches = SampleCaches()
+        with sample_run(caches):
+            validate_sample_files(self.PRESET, str(tmp_path))
+        index = caches.indexes[str(tmp_path)]
+        with sample_run(caches):
+            assert get_sample_index(str(tmp_path)) is index
+        caches.clear(str(tmp_path))
+        assert not caches.indexes
+
+    def test_explicit_caches_are_used_inside_another_run(self, tmp_path):
+        (tmp_path / "kick.wav").write_bytes(MINIMAL_WAV)
+        own = SampleCaches()
+        with sample_run() as outer:
+            with sample_run(own) as inner:
+                assert inner is own
+                validate_sample_files(self.PRESET, str(tmp_path))
+            assert str(tmp_path) in own.indexes and not outer.indexes
+            with sample_run() as joined:
+                assert joined is outer
+
+    def test_runs_are_not_shared_between_threads(self, tmp_path):
+        (tmp_path / "kick.wav").write_bytes(MINIMAL_WAV)
+        seen = []
+
+        def other_thread():
+            with sample_run() as caches:
+                validate_sample_files(self.PRESET, str(tmp_path))
+                seen.append(caches)
+
+        with sample_run() as caches:
+            thread = threading.Thread(target=other_thread)
+            thread.start()
+            thread.join()
+            assert seen[0] is not caches and not caches.indexes
+
+
+class TestCaseInsensitiveSampleResolution:
+    """Test cases for case-fold and Unicode-normalized sample resolution (user-029)."""
+
+    def _preset(self, sample):
+        return {"Preset 1": {"Name": "T", "Channel 1": {"Zone 1": {"Sample": sample}}}}
+
+    def test_case_mismatch_resolves_with_warning(self, tmp_path):
+        (tmp_path / "kick.wav").write_bytes(MINIMAL_WAV)
+        clear_sample_index_cache()
+        with pytest.warns(SampleCaseMismatchWarning, match="resolved by case-fold to 'kick.wav'"):
+            validate_sample_files(self._preset("Kick.WAV"), str(tmp_path))
+
+    def test_unicode_normalization_resolves(self, tmp_path):
+        # NFD name on disk (as written by macOS), NFC name in the preset
+        (tmp_path / "Cafe\u0301.wav").write_bytes(MINIMAL_WAV)
+        index = SampleDirectoryIndex(str(tmp_path))
+        assert index.resolve("Caf\u00e9.wav") == "Cafe\u0301.wav"
+
+    def test_ambiguous_reference_is_an_error(self, tmp_path):
+        (tmp_path / "kick.wav").write_bytes(MINIMAL_WAV)
+        (tmp_path / "KICK.wav").write_bytes(MINIMAL_WAV)
+        if len(os.listdir(tmp_path)) < 2:
+            pytest.skip("case-insensitive filesystem")
+        clear_sample_index_cache()
+        with pytest.raises(AmbiguousSampleNameError, match="ambiguous"):
+            validate_sample_files(self._preset("Kick.wav"), str(tmp_path))
+        with pytest.warns(SampleNameCollisionWarning, match="KICK.wav"):
+            validate_sample_files(self._preset("kick.wav"), str(tmp_path))
+
+    def test_memory_counts_case_variants_once(self, tmp_path):
+        (tmp_path / "kick.wav").write_bytes(MINIMAL_WAV[:-4] + b"\x04\x00\x00\x00\x00\x00\x00\x00")
+        clear_sample_index_cache()
+        preset = self._preset("kick.wav")
+        preset["Preset 1"]["Channel 2"] = {"Zone 1": {"Sample": "KICK.WAV"}}
+        assert calculate_total_memory(preset, str(tmp_path)) == 4
+
+
+class TestSampleSearchPath:
+    """Test cases for ordered multi-folder sample resolution (user-030)."""
+
+    def _preset(self, *samples):
+        channels = {f"Channel {i}": {"Zone 1": {"Sample": name}} for i, name in enumerate(samples, start=1)}
+        return {"Preset 1": {"Name": "T", **channels}}
+
+    def test_first_root_wins(self, tmp_path):
+        shared, project = tmp_path / "shared", tmp_path / "project"
+        shared.mkdir()
+        project.mkdir()
+        (shared / "kick.wav").write_bytes(MINIMAL_WAV)
+        (project / "kick.wav").write_bytes(MINIMAL_WAV)
+        (project / "snare.wav").write_bytes(MINIMAL_WAV)
+        clear_sample_index_cache()
+        resolved = validate_sample_files(self._preset("kick.wav", "snare.wav"), [str(project), str(shared)])
+        assert [r["root"] for r in resolved] == [str(project), str(project)]
+        resolved = validate_sample_files(self._preset("kick.wav", "snare.wav"), [str(shared), str(project)])
+        assert [r["root"] for r in resolved] == [str(shared), str(project)]
+        assert resolved[1]["file"] == os.path.join(str(project), "snare.wav")
+        clear_sample_index_cache()
+
+    def test_missing_everywhere_raises(self, tmp_path):
+        (tmp_path / "a").mkdir()
+        (tmp_path / "b").mkdir()
+        clear_sample_index_cache()
+        with pytest.raises(SampleFileNotFoundError):
+            validate_sample_files(self._preset("hat.wav"), [str(tmp_path / "a"), str(tmp_path / "b")])
+
+    def test_search_path_is_cached_and_merged(self, tmp_path, monkeypatch):
+        roots = []
+        for name in ("a", "b", "c"):
+            (tmp_path / name).mkdir()
+            roots.append(str(tmp_path / name))
+        (tmp_path / "c" / "tom.wav").write_bytes(MINIMAL_WAV)
+        with sample_run():
+            index = get_sample_index(roots)
+            assert isinstance(index, SampleSearchPath)
+            assert get_sample_index(list(roots)) is index
+            calls = []
+            monkeypatch.setattr(os, "stat", lambda *a, **k: calls.append(a))
+            assert index.locate("TOM.wav") == (roots[2], "tom.wav")
+            assert calls == []
+            monkeypatch.undo()
+            clear_sample_index_cache(roots[1])
+            assert get_sample_index(roots) is not index
+
+    def test_exact_name_in_later_root_beats_case_fold(self, tmp_path):
+        shared, project = tmp_path / "shared", tmp_path / "project"
+        shared.mkdir()
+        project.mkdir()
+        (project / "KICK.wav").write_bytes(MINIMAL_WAV)
+        (shared / "kick.wav").write_bytes(MINIMAL_WAV)
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            resolved = validate_sample_files(self._preset("kick.wav"), [str(project), str(shared)])
+        assert resolved[0]["file"] == os.path.join(str(shared), "kick.wav")
+        with pytest.warns(SampleCaseMismatchWarning):
+            resolved = validate_sample_files(self._preset("Kick.wav"), [str(project), str(shared)])
+        assert resolved[0]["root"] == str(project)
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="symlinks need elevated privileges on Windows")
+    def test_broken_symlink_falls_through_to_later_roots(self, tmp_path):
+        a, b = tmp_path / "a", tmp_path / "b"
+        a.mkdir()
+        b.mkdir()
+        os.symlink(str(tmp_path / "gone.wav"), str(a / "kick.wav"))
+        os.symlink(str(tmp_path / "gone.wav"), str(a / "SNARE.wav"))
+        (b / "kick.wav").write_bytes(MINIMAL_WAV)
+        (b / "snare.wav").write_bytes(MINIMAL_WAV)
+        with pytest.warns(SampleCaseMismatchWarning, match="'snare.wav'"):
+            resolved = validate_sample_files(self._preset("kick.wav", "Snare.wav"), [str(a), str(b)])
+        assert [r["root"] for r in resolved] == [str(b), str(b)]
+
+    def test_memory_uses_resolved_root(self, tmp_path):
+        a, b = tmp_path / "a", tmp_path / "b"
+        a.mkdir()
+        b.mkdir()
+        (b / "kick.wav").write_bytes(MINIMAL_WAV[:-4] + b"\x04\x00\x00\x00\x00\x00\x00\x00")
+        clear_sample_index_cache()
+        assert calculate_total_memory(self._preset("kick.wav"), [str(a), str(b)]) == 4
+        clear_sample_index_cache()
+
+
+class TestSampleProbeTable:
+    """Test cases for validating against a shared sample probe table (user-031)."""
+
+    def _preset(self, *samples):
+        channels = {f"Channel {i}": {"Zone 1": {"Sample": name}} for i, name in enumerate(samples, start=1)}
+        return {"Preset 1": {"Name": "T", **channels}}
+
+    def test_each_file_probed_once_across_presets(self, tmp_path, monkeypatch):
+        import wave
+
+        (tmp_path / "kick.wav").write_bytes(MINIMAL_WAV)
+        (tmp_path / "snare.wav").write_bytes(MINIMAL_WAV)
+        clear_sample_index_cache()
+        paths = [str(tmp_path / "snare.wav"), str(tmp_path / "kick.wav"), str(tmp_path / "kick.wav")]
+        opened = []
+        real_open = wave.open
+        monkeypatch.setattr(wave, "open", lambda f, mode=None: opened.append(f) or real_open(f, mode))
+        probes = probe_samples(paths)
+        assert opened == [str(tmp_path / "kick.wav"), str(tmp_path / "snare.wav")]
+        assert probes[sample_identity(str(tmp_path / "kick.wav"))].frame_rate == 44100
+
+        validate_sample_files(self._preset("kick.wav", "snare.wav"), str(tmp_path), probes=probes)
+        validate_sample_files(self._preset("snare.wav", "kick.wav", "kick.wav"), str(tmp_path), probes=probes)
+        assert len(opened) == 2
+        clear_sample_index_cache()
+
+    def test_probe_errors_raise_as_before(self, tmp_path):
+        (tmp_path / "bad.wav").write_bytes(b"not a wav file")
+        clear_sample_index_cache()
+        probes = probe_samples([str(tmp_path / "bad.wav")])
+        with pytest.raises(InvalidSampleFormatError, match="not a valid WAV file format"):
+            validate_sample_files(self._preset("bad.wav"), str(tmp_path), probes=probes)
+        clear_sample_index_cache()
+
+    def test_positions_use_probed_length(self, tmp_path):
+        (tmp_path / "kick.wav").write_bytes(MINIMAL_WAV)
+        clear_sample_index_cache()
+        preset = self._preset("kick.wav")
+        preset["Preset 1"]["Channel 1"]["Zone 1"]["SampleStart"] = 10
+        probes = probe_samples([str(tmp_path / "kick.wav")])
+        with pytest.raises(FileSystemValidationError, match="SampleStart"):
+            validate_sample_files(preset, str(tmp_path), probes=probes)
+        clear_sample_index_cache()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="symlinks need extra privileges on Windows")
+class TestSampleIdentity:
+    """Test cases for (st_dev, st_ino) sample identity across links (user-032)."""
+
+    WAV_4_BYTES = MINIMAL_WAV[:-4] + b"\x04\x00\x00\x00\x00\x00\x00\x00"
+
+    def _preset(self, *samples):
+        channels = {f"Channel {i}": {"Zone 1": {"Sample": name}} for i, name in enumerate(samples, start=1)}
+        return {"Preset 1": {"Name": "T", **channels}}
+
+    def _linked_kit(self, tmp_path):
+        (tmp_path / "kick.wav").write_bytes(self.WAV_4_BYTES)
+        os.link(tmp_path / "kick.wav", tmp_path / "kick_hard.wav")
+        os.symlink(tmp_path / "kick.wav", tmp_path / "kick_soft.wav")
+        clear_sample_index_cache()
+
+    def test_links_share_identity(self, tmp_path):
+        self._linked_kit(tmp_path)
+        identities = {sample_identity(str(tmp_path / n)) for n in ("kick.wav", "kick_hard.wav", "kick_soft.wav")}
+        assert len(identities) == 1
+        assert get_sample_index(str(tmp_path)).identity("KICK_SOFT.wav") in identities
+        clear_sample_index_cache()
+
+    def test_memory_counts_linked_file_once(self, tmp_path):
+        self._linked_kit(tmp_path)
+        preset = self._preset("kick.wav", "kick_hard.wav", "kick_soft.wav")
+        assert calculate_total_memory(preset, str(tmp_path)) == 4
+        clear_sample_index_cache()
+
+    def test_probe_table_probes_linked_file_once(self, tmp_path):
+        self._linked_kit(tmp_path)
+        paths = [str(tmp_path / n) for n in ("kick_soft.wav", "kick_hard.wav", "kick.wav")]
+        probes = probe_samples(paths)
+        assert len(probes) == 1
+        validate_sample_files(self._preset("kick_hard.wav", "kick_soft.wav"), str(tmp_path), probes=probes)
+        assert len(probes) == 1
+        clear_sample_index_cache()
+
+
+class TestFastMemoryCheck:
+    """Test cases for the file-size memory bound (user-040)."""
+
+    WAV_4_BYTES = MINIMAL_WAV[:-4] + b"\x04\x00\x00\x00\x00\x00\x00\x00"
+
+    def _preset(self, *samples):
+        channels = {f"Channel {i}": {"Zone 1": {"Sample": name}} for i, name in enumerate(samples, start=1)}
+        return {"Preset 1": {"Name": "T", **channels}}
+
+    def test_bound_never_underestimates(self, tmp_path):
+        (tmp_path / "kick.wav").write_bytes(self.WAV_4_BYTES)
+        clear_sample_index_cache()
+        preset = self._preset("kick.wav", "KICK.wav")
+        assert estimate_total_memory(preset, str(tmp_path)) == 4 == calculate_total_memory(preset, str(tmp_path))
+        clear_sample_index_cache()
+
+    def test_small_presets_are_decided_without_opening_samples(self, tmp_path, monkeypatch):
+        (tmp_path / "kick.wav").write_bytes(b"not even a wav")
+        clear_sample_index_cache()
+        monkeypatch.setattr(
+            "a8_validate.file_system_validator.calculate_total_memory",
+            lambda *args, **kwargs: pytest.fail("read WAV headers"),
+        )
+        preset = self._preset("kick.wav")
+        assert resolve_sample_files(preset, str(tmp_path))[0]["sample"] == "kick.wav"
+        assert check_memory_budget(preset, str(tmp_path)) == {"estimate_bytes": 0, "exact_bytes": None}
+        clear_sample_index_cache()
+
+    def test_presets_near_the_limit_are_probed(self, tmp_path, monkeypatch):
+        (tmp_path / "big.wav").write_bytes(self.WAV_4_BYTES)
+        clear_sample_index_cache()
+        monkeypatch.setattr("a8_validate.file_system_validator.WAV_HEADER_ALLOWANCE", -500 * 1024 * 1024)
+        assert check_memory_budget(self._preset("big.wav"), str(tmp_path))["exact_bytes"] == 4
+        monkeypatch.setattr(
+            "a8_validate.file_system_validator.calculate_total_memory",
+            lambda *args, **kwargs: 500 * 1024 * 1024,
+        )
+        with pytest.raises(MemoryLimitExceededError):
+            check_memory_budget(self._preset("big.wav"), str(tmp_path))
+        clear_sample_index_cache()
+
+    def test_missing_sample_still_fails(self, tmp_path):
+        clear_sample_index_cache()
+        with pytest.raises(SampleFileNotFoundError):
+            resolve_sample_files(self._preset("gone.wav"), str(tmp_path))
+        clear_sample_index_cache()
@@ -0,0 +1,92 @@
+"""Tests for .a8ignore exclusion rules and the pruned preset walk."""
+
+import os
+
+import pytest
+
+import validate_directory
+from a8_validate.ignore_rules import IgnoreRules, parse_ignore_lines
+
+
+def _rules(base, *lines):
+    return IgnoreRules(base, parse_ignore_lines(lines))
+
+
+class TestIgnoreRules:
+    """Test cases for gitignore-style pattern matching."""
+
+    @pytest.mark.parametrize(
+        "pattern, path, is_dir, ignored",
+        [
+            ("Archive/", "Archive", True, True),
+            ("Archive/", "Archive", False, False),
+            ("Archive/", "kits/Archive", True, True),
+            ("/Archive", "kits/Archive", True, False),
+            ("kits/old", "kits/old", True, True),
+            ("kits/old", "x/kits/old", True, False),
+            ("*.bak.yml", "a/b/prst001.bak.yml", False, True),
+            ("prst00?.yml", "prst001.yml", False, True),
+            ("prst00[!1].yml", "prst001.yml", False, False),
+            ("prst00[!1].yml", "prst002.yml", False, True),
+            ("**/backup", "a/b/backup", True, True),
+            ("dumps/**/raw", "dumps/raw", True, True),
+            ("dumps/**/raw", "dumps/x/y/raw", True, True),
+            ("\\#hash.yml", "#hash.yml", False, True),
+            ("# comment", "# comment", False, False),
+        ],
+    )
+    def test_patterns(self, pattern, path, is_dir, ignored):
+        base = os.path.join(os.sep, "lib")
+        assert _rules(base, pattern).is_ignored(os.path.join(base, *path.split("/")), is_dir) is ignored
+
+    def test_last_match_wins_and_negation(self):
+        base = os.path.join(os.sep, "lib")
+        rules = _rules(base, "prst*.yml", "!prst001.yml", "")
+        assert rules.is_ignored(os.path.join(base, "prst002.yml"))
+        assert not rules.is_ignored(os.path.join(base, "prst001.yml"))
+        assert _rules(base, "!prst001.yml", "prst*.yml").is_ignored(os.path.join(base, "prst001.yml"))
+
+    def test_deeper_files_override_their_parents(self):
+        root = os.path.join(os.sep, "lib")
+        sub = os.path.join(root, "kits")
+        rules = IgnoreRules(sub, parse_ignore_lines(["!prst001.yml"]), IgnoreRules(root, parse_ignore_lines(["*.yml"])))
+        assert not rules.is_ignored(os.path.join(sub, "prst001.yml"))
+        assert rules.is_ignored(os.path.join(sub, "prst002.yml"))
+        # Patterns are relative to their own file's directory
+        assert not _rules(sub, "/prst001.yml").is_ignored(os.path.join(root, "prst001.yml"))
+
+
+class TestIgnoredWalk:
+    """Test cases for .a8ignore pruning in iter_preset_files."""
+
+    def _tree(self, tmp_path):
+        for rel in (
+            "prst001.yml",
+            "Archive/old/prst002.yml",
+            "kits/prst003.yml",
+            "kits/prst004.yml",
+            "kits/x/prst005.yml",
+        ):
+            (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / rel).touch()
+        (tmp_path / ".a8ignore").write_text("# backups\nArchive/\nprst004.yml\n")
+        (tmp_path / "kits" / ".a8ignore").write_text("!prst004.yml\nx/\n")
+
+    @pytest.mark.parametrize("workers", [1, 3])
+    def test_excluded_directories_are_never_listed(self, tmp_path, monkeypatch, workers):
+        self._tree(tmp_path)
+        listed = []
+        real_scandir = os.scandir
+        monkeypatch.setattr(validate_directory.os, "scandir", lambda p: listed.append(p) or real_scandir(p))
+        found = validate_directory.iter_preset_files(str(tmp_path), recursive=True, workers=workers)
+        assert sorted(f.relative_to(tmp_path).as_posix() for f in found) == [
+            "kits/prst003.yml",
+            "kits/prst004.yml",
+            "prst001.yml",
+        ]
+        assert sorted(os.path.relpath(p, tmp_path) for p in listed) == [".", "kits"]
+
+    def test_ignore_files_can_be_disabled(self, tmp_path):
+        self._tree(tmp_path)
+        found = validate_directory.iter_preset_files(str(tmp_path), recursive=True, use_ignore_files=False)
+        assert len(list(found)) == 5
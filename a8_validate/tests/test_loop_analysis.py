@@ -0,0 +1,86 @@
+"""Tests for the loop-point click analysis component."""
+
+import math
+import struct
+import warnings
+import wave
+
+import pytest
+
+from a8_validate.file_system_validator import LoopClickWarning, clear_sample_index_cache, validate_sample_files
+from a8_validate.loop_analysis import score_boundaries
+
+PERIOD = 100
+
+
+def _write_sine(path, frames=1000, sample_width=2, channels=1):
+    full_scale = 2 ** (8 * sample_width - 1) - 1
+    values = [int(0.8 * full_scale * math.sin(2 * math.pi * i / PERIOD)) for i in range(frames)]
+    if sample_width == 1:
+        raw = bytes(v + 128 for v in values for _ in range(channels))
+    elif sample_width == 3:
+        raw = b"".join(struct.pack("<i", v)[:3] for v in values for _ in range(channels))
+    else:
+        code = "h" if sample_width == 2 else "i"
+        raw = struct.pack("<" + code * frames * channels, *(v for v in values for _ in range(channels)))
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(sample_width)
+        w.setframerate(48000)
+        w.writeframes(raw)
+    return str(path)
+
+
+class TestScoreBoundaries:
+    """Test cases for score_boundaries."""
+
+    @pytest.mark.parametrize("sample_width", [1, 2, 3, 4])
+    def test_whole_period_loop_is_smooth(self, tmp_path, sample_width):
+        path = _write_sine(tmp_path / "sine.wav", sample_width=sample_width, channels=2)
+        (score,) = score_boundaries(path, [("loop", 2 * PERIOD - 1, PERIOD)])
+        assert not score.clicks
+        assert score.score < 0.01
+
+    def test_out_of_phase_loop_clicks(self, tmp_path):
+        path = _write_sine(tmp_path / "sine.wav")
+        (score,) = score_boundaries(path, [("loop", PERIOD + PERIOD // 4 - 1, PERIOD * 3 // 4)])
+        assert score.clicks
+        assert score.jump > 1.0
+        assert score.frame == PERIOD * 3 // 4
+
+    def test_start_and_end_boundaries(self, tmp_path):
+        path = _write_sine(tmp_path / "sine.wav")
+        start_zero, start_peak, end_peak = score_boundaries(
+            path, [("SampleStart", None, PERIOD), ("SampleStart", None, PERIOD // 4), ("SampleEnd", PERIOD // 4, None)]
+        )
+        assert not start_zero.clicks
+        assert start_peak.clicks
+        assert end_peak.clicks and end_peak.frame == PERIOD // 4 + 1
+
+    def test_out_of_range_boundaries_are_skipped(self, tmp_path):
+        path = _write_sine(tmp_path / "sine.wav", frames=50)
+        assert score_boundaries(path, [("loop", 80, 10), ("SampleStart", None, 50)]) == []
+
+
+class TestLoopClickValidation:
+    """Test cases for the opt-in loop analysis of validate_sample_files."""
+
+    def _preset(self, channel, zone):
+        return {"Preset 1": {"Name": "T", "Channel 1": {**channel, "Zone 1": {"Sample": "sine.wav", **zone}}}}
+
+    def test_clicking_loop_warns(self, tmp_path):
+        _write_sine(tmp_path / "sine.wav")
+        clear_sample_index_cache()
+        preset = self._preset({"LoopMode": 1}, {"LoopStart": 25, "LoopLength": 150.0})
+        with pytest.warns(LoopClickWarning, match="loop back to frame 25 is likely to click"):
+            validate_sample_files(preset, str(tmp_path), analyze_loops=True)
+        clear_sample_index_cache()
+
+    def test_smooth_loop_and_channel_inheritance(self, tmp_path):
+        _write_sine(tmp_path / "sine.wav")
+        clear_sample_index_cache()
+        preset = self._preset({"LoopMode": 1, "LoopStart": 100, "LoopLength": 300, "LoopLengthIsEnd": 1}, {})
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", LoopClickWarning)
+            validate_sample_files(preset, str(tmp_path), analyze_loops=True)
+        clear_sample_index_cache()
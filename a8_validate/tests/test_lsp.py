@@ -0,0 +1,179 @@
+"""Tests for the language server transport and document checks."""
+
+import io
+import os
+import threading
+
+from a8_validate.lsp import (
+    LanguageServer,
+    PresetDiagnostics,
+    diagnostic_range,
+    read_message,
+    uri_to_path,
+    write_message,
+)
+
+KICK_WAV = (
+    b"RIFF\x24\x00\x00\x00WAVEfmt \x10\x00\x00\x00\x01\x00\x01\x00"
+    b"\x44\xac\x00\x00\x88\x58\x01\x00\x02\x00\x10\x00data\x00\x00\x00\x00"
+)
+
+
+def _notify(stream, method, params):
+    write_message(stream, {"jsonrpc": "2.0", "method": method, "params": params})
+
+
+class TestFraming:
+    """Tests for JSON-RPC framing and positions (user-050)."""
+
+    def test_round_trip(self):
+        stream = io.BytesIO()
+        write_message(stream, {"id": 1, "text": "é"})
+        write_message(stream, {"id": 2})
+        stream.seek(0)
+        assert read_message(stream) == {"id": 1, "text": "é"}
+        assert read_message(stream) == {"id": 2}
+        assert read_message(stream) is None
+
+    def test_ranges_and_uris(self):
+        lines = ["Preset 1:", "  Name: 🎹 keys"]
+        assert diagnostic_range(lines, 2) == {"start": {"line": 1, "character": 2}, "end": {"line": 1, "character": 15}}
+        assert diagnostic_range(lines, None)["end"] == {"line": 0, "character": 0}
+        assert uri_to_path("file:///tmp/My%20Kit/prst001.yml") == os.path.normpath("/tmp/My Kit/prst001.yml")
+        assert uri_to_path("untitled:Untitled-1") is None
+
+
+class TestLanguageServer:
+    """Tests for the language server session (user-050)."""
+
+    def test_session_debounces_edits(self):
+        checked = []
+
+        def check(file_path, text):
+            checked.append(text)
+            return [{"line": 1, "severity": "error", "message": "bad " + text}]
+
+        to_server_r, to_server_w = os.pipe()
+        from_server_r, from_server_w = os.pipe()
+        server_in, client_out = os.fdopen(to_server_r, "rb"), os.fdopen(to_server_w, "wb")
+        client_in, server_out = os.fdopen(from_server_r, "rb"), os.fdopen(from_server_w, "wb")
+        server = LanguageServer(check, debounce=0.2, stdin=server_in, stdout=server_out)
+        outcome = []
+        thread = threading.Thread(target=lambda: outcome.append(server.run()), daemon=True)
+        thread.start()
+        try:
+            write_message(client_out, {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}})
+            response = read_message(client_in)
+            assert response["id"] == 1 and response["result"]["capabilities"]["textDocumentSync"]["change"] == 1
+
+            uri = "file:///tmp/prst001.yml"
+            _notify(client_out, "textDocument/didOpen", {"textDocument": {"uri": uri, "version": 1, "text": "v1"}})
+            published = read_message(client_in)["params"]
+            assert published["version"] == 1
+            assert published["diagnostics"][0]["message"] == "bad v1"
+            assert published["diagnostics"][0]["severity"] == 1
+
+            # A burst of edits is checked once, against its last text
+            for version in (2, 3, 4):
+                _notify(
+                    client_out,
+                    "textDocument/didChange",
+                    {"textDocument": {"uri": uri, "version": version}, "contentChanges": [{"text": "v%d" % version}]},
+                )
+            assert read_message(client_in)["params"]["version"] == 4
+            assert checked == ["v1", "v4"]
+
+            _notify(client_out, "textDocument/didClose", {"textDocument": {"uri": uri}})
+            assert read_message(client_in)["params"] == {"uri": uri, "diagnostics": []}
+            write_message(client_out, {"jsonrpc": "2.0", "id": 2, "method": "textDocument/hover", "params": {}})
+            assert read_message(client_in)["error"]["code"] == -32601
+            write_message(client_out, {"jsonrpc": "2.0", "id": 3, "method": "shutdown"})
+            assert read_message(client_in) == {"jsonrpc": "2.0", "id": 3, "result": None}
+            _notify(client_out, "exit", None)
+            thread.join(5)
+            assert outcome == [0]
+        finally:
+            for stream in (client_out, client_in, server_in, server_out):
+                stream.close()
+
+    def test_check_finishing_after_close_is_not_published(self):
+        started, release = threading.Event(), threading.Event()
+
+        def check(file_path, text):
+            started.set()
+            release.wait(5)
+            return [{"line": 1, "severity": "error", "message": "stale"}]
+
+        to_server_r, to_server_w = os.pipe()
+        from_server_r, from_server_w = os.pipe()
+        server_in, client_out = os.fdopen(to_server_r, "rb"), os.fdopen(to_server_w, "wb")
+        client_in, server_out = os.fdopen(from_server_r, "rb"), os.fdopen(from_server_w, "wb")
+        server = LanguageServer(check, debounce=0.2, stdin=server_in, stdout=server_out)
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        try:
+            uri = "file:///tmp/prst001.yml"
+            _notify(client_out, "textDocument/didOpen", {"textDocument": {"uri": uri, "version": 1, "text": "v1"}})
+            assert started.wait(5)
+            _notify(client_out, "textDocument/didClose", {"textDocument": {"uri": uri}})
+            assert read_message(client_in)["params"] == {"uri": uri, "diagnostics": []}
+            release.set()
+            _notify(client_out, "exit", None)
+            thread.join(5)
+            server_out.close()
+            # Only end of stream follows: the finished check was dropped
+            assert read_message(client_in) is None
+        finally:
+            release.set()
+            for stream in (client_out, client_in, server_in, server_out):
+                stream.close()
+
+
+class TestPresetDiagnostics:
+    """Tests for the language server's document checks (user-050)."""
+
+    TEXT = (
+        "Preset 1:\n  Name: A\n  Channel 1:\n    Zone 1:\n      Sample: kick.wav\n    Zone 2:\n      Sample: KICK.wav\n"
+    )
+
+    def test_findings_carry_the_line_they_concern(self, tmp_path):
+        (tmp_path / "kick.wav").write_bytes(KICK_WAV)
+        checker = PresetDiagnostics()
+        path = str(tmp_path / "prst001.yml")
+        findings = checker.check(path, self.TEXT)
+        assert [(f["line"], f["severity"]) for f in findings] == [(7, "warning")]
+        assert "KICK.wav" in findings[0]["message"]
+        findings = checker.check(path, self.TEXT.replace("Name: A", "Name: A\n  Bogus: 1"))
+        assert [(f["line"], f["severity"]) for f in findings] == [(3, "error")]
+        findings = checker.check(path, self.TEXT.replace("KICK.wav", "snare.wav"))
+        assert [(f["line"], f["severity"]) for f in findings] == [(6, "error")]
+        assert "snare.wav" in findings[0]["message"]
+        findings = checker.check(path, "Preset 1:\n  Name: [A\n")
+        assert findings[0]["line"] is not None and findings[0]["severity"] == "error"
+
+    def test_malformed_numbered_key_is_reported_on_its_line(self, tmp_path):
+        (tmp_path / "kick.wav").write_bytes(KICK_WAV)
+        checker = PresetDiagnostics()
+        findings = checker.check(str(tmp_path / "prst001.yml"), self.TEXT.replace("Zone 2", "Zone x"))
+        assert [(f["line"], f["severity"]) for f in findings] == [(6, "error")]
+        assert "'x'" in findings[0]["message"]
+        findings = checker.check(str(tmp_path / "prst001.yml"), self.TEXT.replace("Channel 1", "Channel one"))
+        assert [(f["line"], f["severity"]) for f in findings] == [(3, "error")]
+
+    def test_unsaved_documents_and_file_names(self, tmp_path):
+        checker = PresetDiagnostics()
+        # No folder to resolve samples in, and no filename to check
+        assert checker.check(None, self.TEXT) == []
+        findings = checker.check(str(tmp_path / "kit.yml"), self.TEXT)
+        assert findings[0]["message"].startswith("Filename error") and findings[0]["line"] is None
+        assert checker.check(str(tmp_path / "folderprefs.yml"), "not: a preset") == []
+
+    def test_sample_rewritten_on_disk_is_seen(self, tmp_path):
+        (tmp_path / "kick.wav").write_bytes(KICK_WAV)
+        checker = PresetDiagnostics(samples_dirs=[str(tmp_path)])
+        text = self.TEXT.replace("KICK.wav", "kick.wav")
+        assert checker.check(None, text) == []
+        with open(tmp_path / "kick.wav", "r+b") as f:
+            f.write(b"JUNK")
+        os.utime(tmp_path / "kick.wav", ns=(1, 1))
+        assert [f["severity"] for f in checker.check(None, text)] == ["error"]
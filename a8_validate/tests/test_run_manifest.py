@@ -0,0 +1,88 @@
+"""Tests for the --incremental run manifest."""
+
+import os
+from pathlib import Path
+
+# validate_directory is a top-level module (py-modules in pyproject.toml)
+import validate_directory
+from a8_validate.file_system_validator import clear_sample_index_cache
+from a8_validate.run_manifest import RunManifest
+
+KICK_WAV = (
+    b"RIFF\x24\x00\x00\x00WAVEfmt \x10\x00\x00\x00\x01\x00\x01\x00"
+    b"\x44\xac\x00\x00\x88\x58\x01\x00\x02\x00\x10\x00data\x00\x00\x00\x00"
+)
+
+
+def _run(root, manifest_path, options=None):
+    clear_sample_index_cache()
+    manifest = RunManifest.load(manifest_path, root, options or {})
+    results = list(validate_directory.iter_validate(str(root), manifest=manifest))
+    manifest.save()
+    return manifest, {Path(r["file"]).name: r for r in results}
+
+
+class TestRunManifest:
+    """Test cases for reusing verdicts between runs."""
+
+    def _library(self, root):
+        (root / "kick.wav").write_bytes(KICK_WAV)
+        (root / "prst001.yml").write_text("Preset 1:\n  Name: A\n  Channel 1:\n    Zone 1:\n      Sample: kick.wav\n")
+        (root / "prst002.yml").write_text("Preset 2:\n  Name: B\n  Channel 1:\n    Zone 1:\n      Sample: Snare.wav\n")
+        (root / "prst003.yml").write_text("Preset 3:\n  Name: C\n  Bogus: 1\n")
+
+    def test_unchanged_presets_reuse_their_verdicts(self, tmp_path):
+        self._library(tmp_path)
+        manifest_path = tmp_path / ".a8-manifest.json"
+        first, results = _run(tmp_path, manifest_path)
+        assert (first.reused, first.validated) == (0, 3)
+        second, reused = _run(tmp_path, manifest_path)
+        assert (second.reused, second.validated) == (3, 0)
+        assert reused == results
+
+    def test_changes_invalidate_only_dependent_presets(self, tmp_path):
+        self._library(tmp_path)
+        manifest_path = tmp_path / ".a8-manifest.json"
+        _run(tmp_path, manifest_path)
+        # A missing sample that appears under another case re-checks its preset
+        (tmp_path / "snare.wav").write_bytes(KICK_WAV)
+        # Same bytes with a new mtime (e.g. a fresh checkout) are matched by hash
+        os.utime(tmp_path / "prst003.yml", ns=(0, 10**18))
+        manifest, results = _run(tmp_path, manifest_path)
+        assert (manifest.reused, manifest.validated) == (2, 1)
+        assert results["prst002.yml"]["valid"] and results["prst002.yml"]["warnings"]
+
+        (tmp_path / "kick.wav").write_bytes(KICK_WAV + b"\x00\x00")
+        (tmp_path / "prst003.yml").write_text("Preset 3:\n  Name: C\n")
+        manifest, results = _run(tmp_path, manifest_path)
+        assert (manifest.reused, manifest.validated) == (1, 2)
+        assert results["prst003.yml"]["valid"]
+
+    def test_other_options_start_from_an_empty_manifest(self, tmp_path):
+        self._library(tmp_path)
+        manifest_path = tmp_path / ".a8-manifest.json"
+        _run(tmp_path, manifest_path, {"deep_wav": False})
+        manifest, _ = _run(tmp_path, manifest_path, {"deep_wav": True})
+        assert manifest.reused == 0
+        manifest_path.write_text("not json")
+        manifest, _ = _run(tmp_path, manifest_path, {"deep_wav": True})
+        assert (manifest.reused, manifest.validated) == (0, 3)
+
+    def test_lookup_does_not_hash_oversized_presets(self, tmp_path, monkeypatch):
+        from a8_validate import run_manifest
+
+        preset = tmp_path / "prst001.yml"
+        preset.write_bytes(b"Preset 1:\n  Name: A\n" + b"#" * (1024 * 1024))
+        manifest = RunManifest(tmp_path / ".a8-manifest.json", tmp_path, {})
+        # An entry for a file of the same size, say from a run with a larger limit
+        manifest.entries["prst001.yml"] = {
+            "size": preset.stat().st_size,
+            "mtime_ns": 0,
+            "hash": "",
+            "result": {"valid": True},
+            "samples": [],
+        }
+        hashed = []
+        monkeypatch.setattr(run_manifest, "content_hash", lambda content: hashed.append(len(content)) or "")
+        assert manifest.lookup(preset, None) is None
+        assert hashed == []
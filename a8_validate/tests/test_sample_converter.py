@@ -0,0 +1,182 @@
+"""Tests for the streaming WAV sample converter."""
+
+import math
+import os
+import struct
+import wave
+
+import pytest
+
+import validate_directory
+from a8_validate import sample_converter
+from a8_validate.sample_converter import SampleConversionError, StreamingResampler, convert_sample
+
+
+def _riff_wav(path, fmt_body, data, extra=b""):
+    fmt_chunk = b"fmt " + struct.pack("<I", len(fmt_body)) + fmt_body
+    data_chunk = b"data" + struct.pack("<I", len(data)) + data + (b"\x00" if len(data) % 2 else b"")
+    body = b"WAVE" + fmt_chunk + data_chunk + extra
+    path.write_bytes(b"RIFF" + struct.pack("<I", len(body)) + body)
+    return str(path)
+
+
+def _fmt(tag, channels, rate, width, bits=None, sub_tag=None):
+    bits = bits or width * 8
+    body = struct.pack("<HHIIHH", tag, channels, rate, rate * channels * width, channels * width, bits)
+    if sub_tag is not None:
+        guid_tail = b"\x00\x00\x00\x00\x10\x00\x80\x00\x00\xaa\x00\x38\x9b\x71"
+        body += struct.pack("<HHI", 22, bits, 3) + struct.pack("<H", sub_tag) + guid_tail
+    return body
+
+
+def _write_sine(path, rate, frames, channels=1, amplitude=0.5, period=None):
+    period = period or rate / 1000
+    values = [int(amplitude * 32767 * math.sin(2 * math.pi * i / period)) for i in range(frames)]
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(struct.pack("<" + "h" * frames * channels, *(v for v in values for _ in range(channels))))
+    return str(path)
+
+
+def _read(path):
+    with wave.open(str(path), "rb") as w:
+        return w.getparams(), w.readframes(w.getnframes())
+
+
+class TestConvertSample:
+    """Test cases for convert_sample."""
+
+    def test_extensible_header_becomes_plain_pcm(self, tmp_path):
+        data = struct.pack("<4h", 0, 1000, -1000, 32767)
+        path = _riff_wav(tmp_path / "ext.wav", _fmt(0xFFFE, 1, 48000, 2, sub_tag=1), data)
+        assert convert_sample(path) == ["WAVE_FORMAT_EXTENSIBLE header"]
+        params, frames = _read(path)
+        assert (params.nchannels, params.sampwidth, params.framerate) == (1, 2, 48000)
+        assert frames == data
+        assert convert_sample(path) == []
+
+    def test_float_becomes_24_bit(self, tmp_path):
+        data = struct.pack("<3f", 0.0, 0.5, -1.0)
+        path = _riff_wav(tmp_path / "float.wav", _fmt(3, 1, 44100, 4), data)
+        assert convert_sample(path) == ["32-bit float samples"]
+        params, frames = _read(path)
+        assert params.sampwidth == 3
+        values = [int.from_bytes(frames[i : i + 3], "little", signed=True) for i in range(0, 9, 3)]
+        assert values == [0, 4194304, -8388608]
+
+    def test_extra_channels_keep_front_pair_and_bits_change(self, tmp_path):
+        data = struct.pack("<8h", 1, 2, 3, 4, 5, 6, 7, 8)
+        path = _riff_wav(tmp_path / "quad.wav", _fmt(1, 4, 48000, 2), data)
+        dest = tmp_path / "out.wav"
+        assert convert_sample(path, str(dest), bits=24) == ["4 channels", "16-bit to 24-bit"]
+        params, frames = _read(dest)
+        assert (params.nchannels, params.sampwidth) == (2, 3)
+        values = [int.from_bytes(frames[i : i + 3], "little", signed=True) >> 8 for i in range(0, len(frames), 3)]
+        assert values == [1, 2, 5, 6]
+
+    def test_resample_preserves_length_and_level(self, tmp_path, monkeypatch):
+        # Small blocks so the resampler carries history across many block boundaries
+        monkeypatch.setattr(sample_converter, "CONVERT_BLOCK_FRAMES", 1000)
+        path = _write_sine(tmp_path / "low.wav", 22050, 4410, channels=2, period=22050 / 441)
+        assert convert_sample(path) == ["22050Hz sample rate"]
+        params, frames = _read(path)
+        assert (params.framerate, params.nframes) == (48000, 9600)
+        left = struct.unpack("<" + "h" * params.nframes * 2, frames)[::2]
+        # Away from the edges, a 441Hz sine keeps its level and lands on the same phase
+        middle = left[2000:7600]
+        peak = max(abs(v) for v in middle)
+        assert abs(peak / 16383 - 1) < 0.01
+        expected = [16383 * math.sin(2 * math.pi * 441 * (2000 + i) / 48000) for i in range(len(middle))]
+        assert max(abs(a - b) for a, b in zip(middle, expected)) < 100
+
+    def test_report_names_dropped_chunks_and_rate_change(self, tmp_path):
+        cue = b"cue " + struct.pack("<I", 4) + struct.pack("<I", 0)
+        path = _riff_wav(tmp_path / "low.wav", _fmt(1, 1, 22050, 2), b"\x00\x00" * 64, extra=cue)
+        report = {}
+        assert convert_sample(path, dry_run=True, report=report) == ["22050Hz sample rate"]
+        assert report == {"dropped_chunks": ["cue"], "rate": (22050, 48000)}
+        report = {}
+        assert convert_sample(path, report=report) == ["22050Hz sample rate"]
+        assert report == {"dropped_chunks": ["cue"], "rate": (22050, 48000)}
+        # Files left alone report nothing
+        report = {}
+        assert convert_sample(path, report=report) == [] and report == {}
+
+    def test_resampler_is_block_size_independent(self):
+        signal = [math.sin(i / 7.0) for i in range(3000)]
+        whole = StreamingResampler(44000, 48000, 1).process([signal], final=True)[0]
+        resampler = StreamingResampler(44000, 48000, 1)
+        pieces = []
+        for start in range(0, 3000, 256):
+            pieces.extend(resampler.process([signal[start : start + 256]], final=start + 256 >= 3000)[0])
+        assert len(whole) == len(pieces) == 3273
+        assert max(abs(a - b) for a, b in zip(whole, pieces)) < 1e-9
+
+    def test_failed_conversion_leaves_source_intact(self, tmp_path, monkeypatch):
+        path = _riff_wav(tmp_path / "ext.wav", _fmt(0xFFFE, 1, 48000, 2, sub_tag=1), b"\x01\x00" * 64)
+        original = (tmp_path / "ext.wav").read_bytes()
+
+        def fail(*args):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(sample_converter, "_encode", fail)
+        with pytest.raises(OSError, match="disk full"):
+            convert_sample(path)
+        assert (tmp_path / "ext.wav").read_bytes() == original
+        assert os.listdir(tmp_path) == ["ext.wav"]
+
+    @pytest.mark.parametrize(
+        "fmt_body, match",
+        [
+            (_fmt(2, 1, 48000, 2), "Unsupported sample encoding 0x0002"),
+            (_fmt(0xFFFE, 1, 48000, 2, sub_tag=0x55), "Unsupported sample encoding 0x0055"),
+            (_fmt(3, 1, 48000, 2), "Unsupported float width"),
+        ],
+    )
+    def test_unsupported_formats_are_rejected(self, tmp_path, fmt_body, match):
+        path = _riff_wav(tmp_path / "bad.wav", fmt_body, b"\x00" * 8)
+        with pytest.raises(SampleConversionError, match=match):
+            convert_sample(path)
+
+
+class TestFixSamplesCli:
+    """Test cases for the fix-samples subcommand."""
+
+    def test_dry_run_then_fix(self, tmp_path, capsys):
+        _riff_wav(tmp_path / "ext.wav", _fmt(0xFFFE, 1, 48000, 2, sub_tag=1), b"\x01\x00" * 64)
+        _write_sine(tmp_path / "ok.wav", 48000, 100)
+        (tmp_path / "junk.wav").write_bytes(b"not a wav")
+        before = (tmp_path / "ext.wav").read_bytes()
+
+        assert validate_directory.fix_samples_main([str(tmp_path), "--dry-run", "--jobs", "1"]) == 1
+        out = capsys.readouterr().out
+        assert "ext.wav: would convert WAVE_FORMAT_EXTENSIBLE header" in out
+        assert "junk.wav: error:" in out
+        assert (tmp_path / "ext.wav").read_bytes() == before
+
+        (tmp_path / "junk.wav").unlink()
+        assert validate_directory.fix_samples_main([str(tmp_path), "--jobs", "2"]) == 0
+        assert "1 of 2 samples converted, 0 failed" in capsys.readouterr().out
+        assert _read(tmp_path / "ext.wav")[0].nchannels == 1
+
+    def test_resampling_reports_chunks_and_presets_to_rescale(self, tmp_path, capsys):
+        cue = b"cue " + struct.pack("<I", 4) + struct.pack("<I", 0)
+        _riff_wav(tmp_path / "low.wav", _fmt(1, 1, 22050, 2), b"\x00\x00" * 64, extra=cue)
+        _write_sine(tmp_path / "ok.wav", 48000, 100)
+        zone = "Preset 1:\n  Name: A\n  Channel 1:\n    Zone 1:\n      Sample: {}\n      SampleEnd: 60\n"
+        (tmp_path / "prst001.yml").write_text(zone.format("LOW.wav"))
+        (tmp_path / "prst002.yml").write_text(zone.format("ok.wav"))
+
+        assert validate_directory.fix_samples_main([str(tmp_path), "--dry-run", "--jobs", "1"]) == 0
+        out = capsys.readouterr().out
+        assert "low.wav: warning: would drop cue chunk(s)" in out
+        assert "prst001.yml: low.wav (22050Hz to 48000Hz, x2.17687)" in out
+        assert "prst002.yml" not in out
+
+        assert validate_directory.fix_samples_main([str(tmp_path), "--jobs", "1"]) == 0
+        out = capsys.readouterr().out
+        assert "low.wav: warning: dropped cue chunk(s)" in out
+        assert "Warning: resampling changed the length of 1 sample(s)" in out
+        assert "prst001.yml: low.wav (22050Hz to 48000Hz, x2.17687)" in out
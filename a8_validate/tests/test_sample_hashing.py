@@ -0,0 +1,118 @@
+"""Tests for sample content hashing and duplicate detection."""
+
+import json
+import os
+import struct
+import sys
+import wave
+
+import pytest
+
+import validate_directory
+from a8_validate import sample_hashing
+from a8_validate.file_system_validator import (
+    DuplicateSampleWarning,
+    clear_sample_index_cache,
+    sample_identity,
+    validate_sample_files,
+)
+from a8_validate.sample_hashing import find_duplicate_groups, hash_sample_data, hash_samples
+
+
+def _write_wav(path, payload, framerate=48000):
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(framerate)
+        w.writeframes(payload)
+    return str(path)
+
+
+def _append_chunk(path, chunk_id, body):
+    """Append a chunk after the data chunk and fix up the RIFF size."""
+    with open(path, "r+b") as f:
+        f.seek(0, os.SEEK_END)
+        f.write(chunk_id + struct.pack("<I", len(body)) + body)
+        size = f.tell() - 8
+        f.seek(4)
+        f.write(struct.pack("<I", size))
+
+
+class TestHashSampleData:
+    """Test cases for hash_sample_data and hash_samples."""
+
+    def test_hash_covers_audio_only(self, tmp_path):
+        payload = bytes(range(256)) * 8
+        a = _write_wav(tmp_path / "a.wav", payload)
+        b = _write_wav(tmp_path / "b.wav", payload)
+        _append_chunk(b, b"LIST", b"INFOtest")
+        c = _write_wav(tmp_path / "c.wav", payload[:-2] + b"\x00\x01")
+        assert hash_sample_data(a) == hash_sample_data(b)
+        assert hash_sample_data(a)[1] == len(payload)
+        assert hash_sample_data(a)[0] != hash_sample_data(c)[0]
+
+    def test_cached_by_inode_size_and_mtime(self, tmp_path, monkeypatch):
+        path = _write_wav(tmp_path / "a.wav", b"\x01\x00" * 64)
+        sample_hashing.clear_hash_cache()
+        first = hash_sample_data(path)
+        monkeypatch.setattr(sample_hashing, "scan_wav", lambda *a: pytest.fail("rehashed an unchanged file"))
+        assert hash_sample_data(path) == first
+        monkeypatch.undo()
+        _write_wav(path, b"\x02\x00" * 64)
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10**9))
+        assert hash_sample_data(path) != first
+
+    def test_hash_samples_in_parallel_skips_unreadable(self, tmp_path):
+        paths = [_write_wav(tmp_path / f"s{i}.wav", bytes([i]) * 4096) for i in range(6)]
+        (tmp_path / "bad.wav").write_bytes(b"junk")
+        hashes = hash_samples(paths + [str(tmp_path / "bad.wav")], max_workers=4)
+        assert sorted(hashes) == sorted(paths)
+        assert len({digest for digest, _ in hashes.values()}) == 6
+
+
+class TestDuplicateGroups:
+    """Test cases for duplicate grouping and reporting."""
+
+    def _preset(self, *samples):
+        channels = {f"Channel {i}": {"Zone 1": {"Sample": name}} for i, name in enumerate(samples, start=1)}
+        return {"Preset 1": {"Name": "T", **channels}}
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="hardlinks need NTFS")
+    def test_links_are_not_duplicates(self, tmp_path):
+        a = _write_wav(tmp_path / "a.wav", b"\x05\x00" * 100)
+        b = _write_wav(tmp_path / "b.wav", b"\x05\x00" * 100)
+        os.link(a, tmp_path / "a_link.wav")
+        clear_sample_index_cache()
+        hashes = hash_samples([a, b, str(tmp_path / "a_link.wav")])
+        (group,) = find_duplicate_groups(hashes, identity=sample_identity)
+        assert len(group["files"]) == 2 and b in group["files"]
+        assert group["wasted_bytes"] == 200
+        clear_sample_index_cache()
+
+    def test_preset_duplicates_warn_with_waste(self, tmp_path):
+        _write_wav(tmp_path / "kick.wav", b"\x07\x00" * 1000)
+        _write_wav(tmp_path / "kick_copy.wav", b"\x07\x00" * 1000)
+        clear_sample_index_cache()
+        with pytest.warns(DuplicateSampleWarning, match="'kick.wav', 'kick_copy.wav' hold identical audio"):
+            resolved = validate_sample_files(
+                self._preset("kick.wav", "kick_copy.wav"), str(tmp_path), find_duplicates=True
+            )
+        assert resolved[0]["hash"] == resolved[1]["hash"]
+        clear_sample_index_cache()
+
+    def test_cli_reports_library_duplicates(self, tmp_path, capsys):
+        for n, sample in ((1, "kick.wav"), (2, "kick_copy.wav")):
+            (tmp_path / f"prst00{n}.yml").write_text(
+                f"Preset {n}:\n  Name: A\n  Channel 1:\n    Zone 1:\n      Sample: {sample}\n"
+            )
+        _write_wav(tmp_path / "kick.wav", b"\x07\x00" * 1000)
+        _write_wav(tmp_path / "kick_copy.wav", b"\x07\x00" * 1000)
+        old_argv = sys.argv
+        sys.argv = ["a8-validate", str(tmp_path), "--json", "--find-duplicates"]
+        try:
+            validate_directory.main()
+        finally:
+            sys.argv = old_argv
+        duplicates = json.loads(capsys.readouterr().out)["summary"]["duplicates"]
+        assert duplicates["wasted_bytes"] == 2000
+        assert [os.path.basename(f) for f in duplicates["groups"][0]["files"]] == ["kick.wav", "kick_copy.wav"]
@@ -377,3 +377,54 @@ class TestSchemaValidator:
         assert "MinVoltage" in str(exc_info.value)
         assert "Channel 1" in str(exc_info.value)
         assert "Zone 2" in str(exc_info.value)
+
+
+class TestSubtreeCache:
+    """Test cases for validate_preset's subtree_cache (user-050)."""
+
+    def _preset(self, level=-3.0):
+        def zones():
+            return {f"Zone {z}": {"Sample": f"s{z}.wav", "MinVoltage": f"{5 - z:+.2f}"} for z in range(1, 4)}
+
+        return {
+            "Preset 1": {
+                "Name": "Cached",
+                "Channel 1": {"Level": "-3.00", **zones()},
+                "Channel 2": {"Level": str(level), **zones()},
+            }
+        }
+
+    def test_unchanged_subtrees_are_not_validated_again(self, monkeypatch):
+        import a8_validate.schema_validator as schema_validator
+
+        cache = {}
+        first = validate_preset(self._preset(), mutate=False, subtree_cache=cache)
+        assert first == validate_preset(self._preset(), mutate=False)
+        calls = []
+        real_validate_zone = schema_validator.validate_zone
+        monkeypatch.setattr(
+            schema_validator,
+            "validate_zone",
+            lambda *args, **kwargs: calls.append(args) or real_validate_zone(*args, **kwargs),
+        )
+        original = self._preset(level=-6.0)
+        second = validate_preset(original, mutate=False, subtree_cache=cache)
+        # Only Channel 2 changed, and none of its zones did
+        assert calls == []
+        assert second["Preset 1"]["Channel 2"]["Level"] == -6.0
+        assert second["Preset 1"]["Channel 1"] is first["Preset 1"]["Channel 1"]
+        assert original == self._preset(level=-6.0)
+
+    def test_cached_errors_are_raised_again(self):
+        cache = {}
+        bad = self._preset()
+        bad["Preset 1"]["Channel 2"]["Zone 2"]["MinVoltage"] = "+6.00"
+        raised = []
+        for _ in range(2):
+            with pytest.raises(InvalidValueError) as exc_info:
+                validate_preset(bad, mutate=False, subtree_cache=cache)
+            assert exc_info.value.path == ("Preset 1", "Channel 2", "Zone 2", "MinVoltage")
+            raised.append(exc_info.value)
+        # Each hit raises a new instance, so tracebacks do not pile up on a cached one
+        assert raised[0] is not raised[1] and str(raised[0]) == str(raised[1])
+        assert all(len(key[2]) == 16 for key in cache)
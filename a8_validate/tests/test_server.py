@@ -0,0 +1,140 @@
+"""Tests for the validation daemon and its transports."""
+
+import os
+import socket
+import threading
+
+import pytest
+
+from a8_validate.server import HTTPClient, UnixClient, ValidationService, make_http_server, make_unix_server
+
+KICK_WAV = (
+    b"RIFF\x24\x00\x00\x00WAVEfmt \x10\x00\x00\x00\x01\x00\x01\x00"
+    b"\x44\xac\x00\x00\x88\x58\x01\x00\x02\x00\x10\x00data\x00\x00\x00\x00"
+)
+
+
+def _echo(request):
+    if request.get("fail"):
+        raise ValueError("no")
+    return {"echo": request}
+
+
+def _run(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return thread
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix sockets not available")
+class TestUnixServer:
+    """Tests for the daemon's Unix socket transport (user-049)."""
+
+    def test_requests_over_concurrent_connections(self, tmp_path):
+        path = str(tmp_path / "a8.sock")
+        server = make_unix_server(path, _echo)
+        _run(server)
+        try:
+            clients = [UnixClient(path, timeout=5) for _ in range(3)]
+            for n, client in enumerate(clients):
+                assert client.request({"n": n}) == {"echo": {"n": n}}
+                assert client.request({"n": n, "again": True}) == {"echo": {"n": n, "again": True}}
+            assert clients[0].request({"fail": True}) == {"error": "Bad request: no"}
+            for client in clients:
+                client.close()
+            with pytest.raises(OSError):
+                make_unix_server(path, _echo)
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert not os.path.exists(path)
+
+    def test_stale_socket_file_is_replaced(self, tmp_path):
+        path = str(tmp_path / "a8.sock")
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(path)
+        stale.close()
+        server = make_unix_server(path, _echo)
+        server.server_close()
+
+
+class TestHTTPServer:
+    """Tests for the daemon's localhost HTTP transport (user-049)."""
+
+    def test_validate_and_stats(self):
+        server = make_http_server(0, lambda request: {"stats": 1} if request.get("stats") else _echo(request))
+        _run(server)
+        try:
+            client = HTTPClient(server.server_address[1], timeout=5)
+            assert client.request({"file": "x"}) == {"echo": {"file": "x"}}
+            assert client.request({"fail": True}) == {"error": "Bad request: no"}
+            client.close()
+            from http.client import HTTPConnection
+
+            connection = HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+            connection.request("GET", "/stats")
+            assert connection.getresponse().read() == b'{"stats":1}'
+            connection.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+class TestValidationService:
+    """Tests for the serve daemon's warm caches (user-049)."""
+
+    def _library(self, root):
+        (root / "kick.wav").write_bytes(KICK_WAV)
+        (root / "prst001.yml").write_text("Preset 1:\n  Name: A\n  Channel 1:\n    Zone 1:\n      Sample: kick.wav\n")
+        return ValidationService(cache_size=2)
+
+    def test_repeated_request_is_answered_from_cache(self, tmp_path):
+        service = self._library(tmp_path)
+        request = {"file": str(tmp_path / "prst001.yml")}
+        first = service.handle(request)
+        assert first["valid"] and not first["cached"]
+        second = service.handle(request)
+        assert second["cached"]
+        assert {k: v for k, v in second.items() if k not in ("cached", "elapsed_ms")} == {
+            k: v for k, v in first.items() if k not in ("cached", "elapsed_ms")
+        }
+        assert service.handle({"stats": True})["hits"] == 1
+
+    def test_changed_preset_or_sample_is_validated_again(self, tmp_path):
+        service = self._library(tmp_path)
+        request = {"file": str(tmp_path / "prst001.yml")}
+        service.handle(request)
+        # Rewriting the sample in place keeps its inode and the folder's mtime
+        with open(tmp_path / "kick.wav", "r+b") as f:
+            f.write(b"JUNK")
+        os.utime(tmp_path / "kick.wav", ns=(1, 1))
+        result = service.handle(request)
+        assert not result["cached"] and not result["valid"]
+        (tmp_path / "prst001.yml").write_text("Preset 1:\n  Name: A\n  Bogus: 1\n")
+        result = service.handle(request)
+        assert not result["cached"] and "Bogus" in result["message"]
+
+    def test_text_requests_and_options(self, tmp_path):
+        service = self._library(tmp_path)
+        text = "Preset 1:\n  Name: A\n  Channel 1:\n    Zone 1:\n      Sample: snare.wav\n"
+        assert service.handle({"text": text})["valid"]
+        result = service.handle({"text": text, "samples_dir": str(tmp_path)})
+        assert not result["valid"] and "snare.wav" in result["message"]
+        assert service.handle({"text": text, "samples_dir": str(tmp_path), "options": {"run_samples": False}})["valid"]
+        with pytest.raises(ValueError):
+            service.handle({"text": text, "options": {"bogus": True}})
+        # Where the daemon writes is fixed when it starts, not chosen per request
+        with pytest.raises(ValueError, match="overview_dir"):
+            service.handle({"text": text, "options": {"overview_dir": str(tmp_path / "elsewhere")}})
+        assert not (tmp_path / "elsewhere").exists()
+        # The LRU tables hold at most cache_size entries
+        assert service.stats()["results"] == 2
+
+    def test_overview_cache_is_the_services(self, tmp_path):
+        (tmp_path / "kick.wav").write_bytes(KICK_WAV)
+        (tmp_path / "prst001.yml").write_text(
+            "Preset 1:\n  Name: A\n  Channel 1:\n    Zone 1:\n      Sample: kick.wav\n"
+        )
+        service = ValidationService(overview_dir=str(tmp_path / "overviews"))
+        assert service.handle({"file": str(tmp_path / "prst001.yml")})["valid"]
+        assert os.listdir(tmp_path / "overviews")
@@ -0,0 +1,137 @@
+"""Tests for the streaming schema validator component."""
+
+from pathlib import Path
+
+import pytest
+
+from a8_validate.schema_validator import (
+    InvalidParameterError,
+    InvalidValueError,
+    MissingRequiredParameterError,
+    SchemaValidationError,
+    validate_preset,
+)
+from a8_validate.streaming_validator import UnsupportedSyntaxError, validate_preset_stream
+from a8_validate.yaml_parser import InvalidPresetError, PresetParseError, parse_yaml_file
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+COMPLEX_PRESET = """Preset 7 :
+  Name : Spectral Percussion Morphology
+  XfadeACV : 1A
+  XfadeAWidth : 9.10
+  Channel 1 :
+    Pitch : -12.00
+    Level : -3.0
+    PitchCV : 0A 0.50
+    Zone 1 :
+      Sample : BD_Thump_1.wav
+      MinVoltage : +5.00
+    Zone 2 :
+      Sample : BD_Elec_1.wav
+      MinVoltage : +2.50
+  Channel 2 :
+    ChannelMode : 1
+    Pitch : +7.00
+    Level : -6.0
+    Zone 1 :
+      Sample : Acid_1.wav
+      LoopMode : 1
+      LoopStart : 100
+      LoopLength : 1000
+"""
+
+# (content, expected verdict) pairs covering each kind of schema check
+PARITY_CASES = [
+    (COMPLEX_PRESET, True),
+    ("Preset 1:\n  Name: A\n  Channel 1:\n    Pitch: 0.00\n    Zone 1:\n      Sample: x.wav\n", True),
+    ("Preset 1 :\n  Name : 20\n  Channel 1 :\n    Zone 1 :\n      Sample : t.wav # comment\n", True),
+    ("Preset 1 :\n  Name : @toms\n  Channel 1 :\n    ChannelMode : 1\n", True),
+    ("Preset 1 :\n  Name : A\n  Channel 1 :\n    Pitch : 999\n    Zone 1 :\n      Sample : t.wav\n", False),
+    ("Preset 1 :\n  Name : A\n  Channel 1 :\n    Bogus : 1\n    Zone 1 :\n      Sample : t.wav\n", False),
+    ("Preset 1 :\n  Name : A\n  Channel 1 :\n    Zone 1 :\n      MinVoltage : +5.00\n", False),
+    ("Preset 1 :\n  Channel 1 :\n    Zone 1 :\n      Sample : t.wav\n", False),
+    ("Preset 1 :\n  Name : A\n  Channel 1 :\n    Pitch : 0.00\n", False),
+    ("Preset 1 :\n  Name : A\n  Channel 1 :\n    Zone 2 :\n      Sample : t.wav\n", False),
+    ("Preset 1 :\n  Name : A\n  Channel 2 :\n    ChannelMode : 1\n  Channel 1 :\n    ChannelMode : 1\n", False),
+    ("Preset 1 :\n  Name : A\n  Channel 9 :\n    ChannelMode : 1\n", False),
+    ("Preset 1 :\n  Name : A\n  XfadeACV : Off\n", False),
+    ("Preset 1 :\n  Name : A\n  XfadeACV : 9Z\n", False),
+    ("Other :\n  Name : A\n", False),
+    # A later duplicate key replaces the invalid value, so only the full parser can decide
+    ("Preset 1 :\n  Name : A\n  MidiSetup : 99\n  MidiSetup : 1\n", True),
+]
+
+
+def _full_verdict(path):
+    try:
+        validate_preset(parse_yaml_file(path), mutate=False)
+        return True
+    except Exception:
+        return False
+
+
+def _stream_verdict(path):
+    try:
+        validate_preset_stream(path)
+        return True
+    except UnsupportedSyntaxError:
+        return _full_verdict(path)
+    except (SchemaValidationError, PresetParseError):
+        return False
+
+
+class TestStreamingValidator:
+    """Test cases for validate_preset_stream."""
+
+    def _write(self, tmp_path, content):
+        path = tmp_path / "prst001.yml"
+        path.write_text(content)
+        return str(path)
+
+    @pytest.mark.parametrize("content,expected", PARITY_CASES)
+    def test_verdict_matches_validate_preset(self, tmp_path, content, expected):
+        path = self._write(tmp_path, content)
+        assert _full_verdict(path) is expected
+        assert _stream_verdict(path) is expected
+
+    @pytest.mark.parametrize("name", ["preset_min_values.yml", "preset_max_values.yml"])
+    def test_boundary_presets_stream_without_fallback(self, name):
+        validate_preset_stream(str(REPO_ROOT / name))
+
+    def test_reports_first_error_with_line(self, tmp_path):
+        content = "Preset 1 :\n  Name : A\n  Channel 1 :\n    Pitch : 999\n    Level : 99\n"
+        with pytest.raises(InvalidValueError) as exc_info:
+            validate_preset_stream(self._write(tmp_path, content))
+        assert "Pitch" in str(exc_info.value)
+        assert "(line 4)" in str(exc_info.value)
+        assert exc_info.value.path == ("Preset 1", "Channel 1", "Pitch")
+
+    def test_invalid_parameter_and_missing_required(self, tmp_path):
+        with pytest.raises(InvalidParameterError, match="Invalid zone parameter: Foo"):
+            validate_preset_stream(
+                self._write(tmp_path, "Preset 1 :\n  Name : A\n  Channel 1 :\n    Zone 1 :\n      Foo : 1\n")
+            )
+        with pytest.raises(MissingRequiredParameterError, match="Missing required zone parameter: Sample"):
+            validate_preset_stream(
+                self._write(tmp_path, "Preset 1 :\n  Name : A\n  Channel 1 :\n    Zone 1 :\n      Side : 0\n")
+            )
+
+    @pytest.mark.parametrize(
+        "content",
+        [
+            "Preset 1 :\n  Name : A\n  Name : B\n",
+            "Preset 1 :\n  Name : [A, B]\n",
+            "Preset 1 :\n  Name : &a A\n",
+            "Preset 1 :\n    Name : A\n  MidiSetup : 1\n",
+            "Preset 1 : {Name: A}\n",
+            "Preset 1 :\n  Name : A\n  - item\n",
+        ],
+    )
+    def test_unsupported_syntax_requests_fallback(self, tmp_path, content):
+        with pytest.raises(UnsupportedSyntaxError):
+            validate_preset_stream(self._write(tmp_path, content))
+
+    def test_comment_only_file_is_not_a_preset(self, tmp_path):
+        with pytest.raises(InvalidPresetError):
+            validate_preset_stream(self._write(tmp_path, "# nothing here\n"))
@@ -1,34 +1,38 @@
 """Tests for preset file discovery and CLI helpers (validate_directory module)."""
 
+import os
+from pathlib import Path
+
 import pytest
 
 # validate_directory is a top-level module (py-modules in pyproject.toml)
 import validate_directory
+from a8_validate import preset_checks, preset_files
 
 
 class TestShouldIgnorePresetFile:
-    """Tests for _should_ignore_preset_file."""
+    """Tests for should_ignore_preset_file."""
 
     def test_ignores_system_yml(self):
-        assert validate_directory._should_ignore_preset_file("folderprefs.yml") is True
-        assert validate_directory._should_ignore_preset_file("lastfolder.yml") is True
-        assert validate_directory._should_ignore_preset_file("lastpreset.yml") is True
+        assert preset_files.should_ignore_preset_file("folderprefs.yml") is True
+        assert preset_files.should_ignore_preset_file("lastfolder.yml") is True
+        assert preset_files.should_ignore_preset_file("lastpreset.yml") is True
 
     def test_ignores_system_yaml(self):
-        assert validate_directory._should_ignore_preset_file("folderprefs.yaml") is True
-        assert validate_directory._should_ignore_preset_file("lastfolder.yaml") is True
-        assert validate_directory._should_ignore_preset_file("lastpreset.yaml") is True
+        assert preset_files.should_ignore_preset_file("folderprefs.yaml") is True
+        assert preset_files.should_ignore_preset_file("lastfolder.yaml") is True
+        assert preset_files.should_ignore_preset_file("lastpreset.yaml") is True
 
     def test_ignores_midi_files(self):
-        assert validate_directory._should_ignore_preset_file("midi1.yml") is True
-        assert validate_directory._should_ignore_preset_file("midi2.yaml") is True
+        assert preset_files.should_ignore_preset_file("midi1.yml") is True
+        assert preset_files.should_ignore_preset_file("midi2.yaml") is True
 
     def test_ignores_hidden_files(self):
-        assert validate_directory._should_ignore_preset_file("._prst001.yml") is True
+        assert preset_files.should_ignore_preset_file("._prst001.yml") is True
 
     def test_does_not_ignore_valid_presets(self):
-        assert validate_directory._should_ignore_preset_file("prst001.yml") is False
-        assert validate_directory._should_ignore_preset_file("prst001.yaml") is False
+        assert preset_files.should_ignore_preset_file("prst001.yml") is False
+        assert preset_files.should_ignore_preset_file("prst001.yaml") is False
 
 
 class TestFindYmlFiles:
@@ -78,6 +82,66 @@ class TestFindYmlFiles:
         with pytest.raises(ValueError, match="Directory not found"):
             validate_directory.find_yml_files("/nonexistent/path/xyz")
 
+    def test_recursive_order_is_per_directory(self, tmp_path):
+        for rel in ("zz.yml", "prst001.yml", "b/prst002.yaml", "a/c/prst003.yml", "._prst005.yml"):
+            (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / rel).touch()
+        (tmp_path / "a" / "kick.wav").touch()
+        found = validate_directory.find_yml_files(str(tmp_path), recursive=True)
+        assert [f.relative_to(tmp_path).as_posix() for f in found] == [
+            "prst001.yml",
+            "zz.yml",
+            "a/c/prst003.yml",
+            "b/prst002.yaml",
+        ]
+
+    def test_hidden_presets_and_directories_are_found_as_with_rglob(self, tmp_path):
+        for rel in ("prst001.yml", ".x.yml", ".kits/prst004.yml"):
+            (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / rel).touch()
+        found = validate_directory.find_yml_files(str(tmp_path), recursive=True)
+        assert set(found) == {tmp_path / "prst001.yml", tmp_path / ".x.yml", tmp_path / ".kits" / "prst004.yml"}
+        baseline = [p for p in tmp_path.rglob("*.yml") if not preset_files.should_ignore_preset_file(p.name)]
+        assert set(found) == set(baseline)
+
+    def test_parallel_walk_finds_the_same_presets(self, tmp_path):
+        expected = set()
+        for a in range(4):
+            for b in range(3):
+                folder = tmp_path / f"d{a}" / f"e{b}"
+                folder.mkdir(parents=True)
+                for name in ("prst001.yml", "prst002.yaml", "folderprefs.yml", "kick.wav"):
+                    (folder / name).touch()
+                expected |= {folder / "prst001.yml", folder / "prst002.yaml"}
+        (tmp_path / ".hidden").mkdir()
+        (tmp_path / ".hidden" / "prst009.yml").touch()
+        expected.add(tmp_path / ".hidden" / "prst009.yml")
+        found = list(validate_directory.iter_preset_files(str(tmp_path), recursive=True, workers=4))
+        assert len(found) == len(expected) and set(found) == expected
+        # Within each directory the order is still sorted
+        assert found.index(tmp_path / "d0/e0/prst001.yml") + 1 == found.index(tmp_path / "d0/e0/prst002.yaml")
+
+    def test_parallel_walk_can_stop_early(self, tmp_path):
+        for a in range(20):
+            (tmp_path / f"d{a}").mkdir()
+            (tmp_path / f"d{a}" / "prst001.yml").touch()
+        files = validate_directory.iter_preset_files(str(tmp_path), recursive=True, workers=3)
+        assert next(files).name == "prst001.yml"
+        files.close()
+
+    def test_iter_preset_files_is_lazy(self, tmp_path, monkeypatch):
+        (tmp_path / "prst001.yml").touch()
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "sub" / "prst002.yml").touch()
+        listed = []
+        real_scandir = validate_directory.os.scandir
+        monkeypatch.setattr(validate_directory.os, "scandir", lambda p: listed.append(p) or real_scandir(p))
+        files = validate_directory.iter_preset_files(str(tmp_path), recursive=True)
+        assert next(files).name == "prst001.yml"
+        assert len(listed) == 1
+        assert [f.name for f in files] == ["prst002.yml"]
+        assert len(listed) == 2
+
 
 class TestValidatePresetFileOptions:
     """Tests for validate_preset_file with run_crossref/run_samples options (issue #16)."""
@@ -126,3 +190,421 @@ class TestValidatePresetFileOptions:
         valid_count = sum(1 for r in data["results"] if r["valid"])
         assert data["summary"]["valid"] == valid_count
         assert data["summary"]["invalid"] == 2 - valid_count
+
+    def test_json_output_includes_case_fold_warning(self, tmp_path, capsys):
+        """Samples resolved by case-fold are valid but reported as warnings (user-029)."""
+        (tmp_path / "prst001.yml").write_text(
+            "Preset 1:\n  Name: A\n  Channel 1:\n    Pitch: 0.00\n    Zone 1:\n      Sample: Kick.WAV\n"
+        )
+        (tmp_path / "kick.wav").write_bytes(
+            b"RIFF\x24\x00\x00\x00WAVEfmt \x10\x00\x00\x00\x01\x00\x01\x00"
+            b"\x44\xac\x00\x00\x88\x58\x01\x00\x02\x00\x10\x00data\x00\x00\x00\x00"
+        )
+        import json
+        import sys
+
+        old_argv = sys.argv
+        sys.argv = ["a8-validate", str(tmp_path), "--json"]
+        try:
+            validate_directory.main()
+        finally:
+            sys.argv = old_argv
+        data = json.loads(capsys.readouterr().out)
+        result = data["results"][0]
+        assert result["valid"] is True
+        assert any("resolved by case-fold" in w for w in result["warnings"])
+
+    def test_repeated_samples_dir_reports_resolved_root(self, tmp_path, capsys):
+        """--samples-dir is repeatable; JSON output shows the root each sample resolved in (user-030)."""
+        presets, shared, project = tmp_path / "presets", tmp_path / "shared", tmp_path / "project"
+        for d in (presets, shared, project):
+            d.mkdir()
+        (presets / "prst001.yml").write_text(
+            "Preset 1:\n  Name: A\n  Channel 1:\n    Zone 1:\n      Sample: kick.wav\n"
+            "  Channel 2:\n    Zone 1:\n      Sample: pad.wav\n"
+        )
+        wav = (
+            b"RIFF\x24\x00\x00\x00WAVEfmt \x10\x00\x00\x00\x01\x00\x01\x00"
+            b"\x44\xac\x00\x00\x88\x58\x01\x00\x02\x00\x10\x00data\x00\x00\x00\x00"
+        )
+        (shared / "kick.wav").write_bytes(wav)
+        (project / "pad.wav").write_bytes(wav)
+        import json
+        import sys
+
+        old_argv = sys.argv
+        sys.argv = ["a8-validate", str(presets), "--json", "--samples-dir", str(project), "--samples-dir", str(shared)]
+        try:
+            validate_directory.main()
+        finally:
+            sys.argv = old_argv
+        result = json.loads(capsys.readouterr().out)["results"][0]
+        assert result["valid"] is True, result["message"]
+        roots = {s["sample"]: s["root"] for s in result["samples"]}
+        assert roots == {"kick.wav": str(shared), "pad.wav": str(project)}
+
+    def test_corpus_mode_reports_dedupe(self, tmp_path, capsys):
+        """--corpus reads each shared sample once and reports the saving in the summary (user-031)."""
+        for n in (1, 2, 3):
+            (tmp_path / "prst00{}.yml".format(n)).write_text(
+                "Preset {}:\n  Name: A\n  Channel 1:\n    Zone 1:\n      Sample: kick.wav\n"
+                "  Channel 2:\n    Zone 1:\n      Sample: kick.wav\n".format(n)
+            )
+        (tmp_path / "kick.wav").write_bytes(
+            b"RIFF\x24\x00\x00\x00WAVEfmt \x10\x00\x00\x00\x01\x00\x01\x00"
+            b"\x44\xac\x00\x00\x88\x58\x01\x00\x02\x00\x10\x00data\x00\x00\x00\x00"
+        )
+        import json
+        import sys
+
+        old_argv = sys.argv
+        sys.argv = ["a8-validate", str(tmp_path), "--json", "--corpus"]
+        try:
+            validate_directory.main()
+        finally:
+            sys.argv = old_argv
+        data = json.loads(capsys.readouterr().out)
+        assert data["summary"]["valid"] == 3
+        probe = data["summary"]["sample_probe"]
+        assert probe["references"] == 6
+        assert probe["unique_files"] == 1
+        assert probe["dedupe_ratio"] == 6.0
+        # Default mode: 2 reads per reference + 1 memory read per preset
+        assert probe["header_reads_saved"] == 15 - 1
+
+    def test_fast_memory_reports_presets_decided_by_size(self, tmp_path, capsys):
+        """--fast-memory bounds memory from file sizes and reports how many presets needed no header read."""
+        (tmp_path / "prst001.yml").write_text(
+            "Preset 1:\n  Name: A\n  Channel 1:\n    Zone 1:\n      Sample: kick.wav\n"
+        )
+        (tmp_path / "prst002.yml").write_text(
+            "Preset 2:\n  Name: B\n  Channel 1:\n    Zone 1:\n      Sample: gone.wav\n"
+        )
+        # Not a readable WAV: the fast check never opens it
+        (tmp_path / "kick.wav").write_bytes(b"\x00" * 100)
+        import sys
+
+        old_argv = sys.argv
+        sys.argv = ["a8-validate", str(tmp_path), "--fast-memory"]
+        try:
+            validate_directory.main()
+        finally:
+            sys.argv = old_argv
+        out = capsys.readouterr().out
+        assert "Validation complete: 1/2 files valid" in out
+        assert "Memory: 1 of 1 presets decided from file sizes without opening any sample, 0 probed exactly" in out
+        assert "sample formats and positions were not checked" in out
+        # A pass is labelled as a memory bound, not full validation
+        success, message = validate_directory.validate_preset_file(tmp_path / "prst001.yml", tmp_path, fast_memory=True)
+        assert (success, message) == (True, preset_checks.FAST_MEMORY_VALID)
+        assert validate_directory.validate_preset_file(tmp_path / "prst001.yml", tmp_path)[0] is False
+
+    def test_walk_jobs_streams_presets_into_validation(self, tmp_path, capsys):
+        """--walk-jobs walks subtrees in parallel and still reports results in path order."""
+        for n in range(1, 6):
+            folder = tmp_path / "kit{}".format(n)
+            folder.mkdir()
+            (folder / "prst00{}.yml".format(n)).write_text("Preset {}:\n  Name: K{}\n".format(n, n))
+        import sys
+
+        old_argv = sys.argv
+        sys.argv = ["a8-validate", str(tmp_path), "-r", "--walk-jobs", "3", "--json"]
+        try:
+            validate_directory.main()
+        finally:
+            sys.argv = old_argv
+        import json
+
+        data = json.loads(capsys.readouterr().out)
+        assert data["summary"]["valid"] == 5
+        assert [Path(r["file"]).parent.name for r in data["results"]] == ["kit1", "kit2", "kit3", "kit4", "kit5"]
+
+    def test_ndjson_streams_one_record_per_preset(self, tmp_path, capsys):
+        """--ndjson writes a compact record per preset, then a summary record."""
+        (tmp_path / "prst001.yml").write_text("Preset 1:\n  Name: A\n")
+        (tmp_path / "prst002.yml").write_text("Preset 2:\n  Name: B\n  Channel 1:\n    Zone 1:\n      Sample: x.wav\n")
+        import json
+        import sys
+
+        old_argv = sys.argv
+        sys.argv = ["a8-validate", str(tmp_path), "--ndjson"]
+        try:
+            validate_directory.main()
+        finally:
+            sys.argv = old_argv
+        lines = capsys.readouterr().out.splitlines()
+        assert len(lines) == 3
+        assert '": ' not in lines[0]
+        records = [json.loads(line) for line in lines]
+        assert [Path(r["file"]).name for r in records[:2]] == ["prst001.yml", "prst002.yml"]
+        assert records[1]["valid"] is False and "x.wav" in records[1]["message"]
+        assert records[2] == {"summary": {"total": 2, "valid": 1, "invalid": 1}}
+
+
+class TestIterValidate:
+    """Tests for the iter_validate generator API (user-044)."""
+
+    def test_results_are_yielded_as_presets_are_validated(self, tmp_path, monkeypatch):
+        for n in (1, 2):
+            folder = tmp_path / "kit{}".format(n)
+            folder.mkdir()
+            (folder / "prst00{}.yml".format(n)).write_text("Preset {}:\n  Name: K\n".format(n))
+        validated = []
+        real_validate = validate_directory.validate_preset_file
+
+        def spy(file_path, *args, **kwargs):
+            validated.append(file_path.name)
+            return real_validate(file_path, *args, **kwargs)
+
+        monkeypatch.setattr(validate_directory, "validate_preset_file", spy)
+        results = validate_directory.iter_validate(str(tmp_path), recursive=True)
+        first = next(results)
+        assert first["valid"] and first["file"].endswith("prst001.yml")
+        assert validated == ["prst001.yml"]
+        assert [r["file"][-11:] for r in results] == ["prst002.yml"]
+
+    def test_sample_listings_are_dropped_folder_by_folder(self, tmp_path, monkeypatch):
+        for n in (1, 2, 3):
+            folder = tmp_path / "kit{}".format(n)
+            folder.mkdir()
+            (folder / "prst00{}.yml".format(n)).write_text("Preset {}:\n  Name: K\n".format(n))
+        cleared = []
+        monkeypatch.setattr(validate_directory, "clear_sample_index_cache", lambda folder=None: cleared.append(folder))
+        assert len(list(validate_directory.iter_validate(str(tmp_path), recursive=True))) == 3
+        assert [Path(folder).name for folder in cleared] == ["kit1", "kit2"]
+
+
+class TestPipelinedValidation:
+    """Tests for the staged --pipeline validation (user-045)."""
+
+    KICK_WAV = (
+        b"RIFF\x24\x00\x00\x00WAVEfmt \x10\x00\x00\x00\x01\x00\x01\x00"
+        b"\x44\xac\x00\x00\x88\x58\x01\x00\x02\x00\x10\x00data\x00\x00\x00\x00"
+    )
+
+    def _make_library(self, root):
+        for n in range(1, 4):
+            folder = root / "kit{}".format(n)
+            folder.mkdir()
+            (folder / "kick.wav").write_bytes(self.KICK_WAV)
+            (folder / "prst001.yml").write_text(
+                "Preset 1:\n  Name: A\n  Channel 1:\n    Zone 1:\n      Sample: kick.wav\n"
+            )
+            (folder / "prst002.yml").write_text(
+                "Preset 2:\n  Name: B\n  Channel 1:\n    Zone 1:\n      Sample: gone.wav\n"
+            )
+            (folder / "prst003.yml").write_text("Preset 3:\n  Name: C\n  Channel 1:\n    Bogus: 1\n")
+            (folder / "prst004.yml").write_text(
+                "Preset 4:\n  Name: D\n  Channel 1:\n    Zone 1:\n      Sample: KICK.wav\n"
+            )
+
+    def test_results_match_the_serial_run_in_order(self, tmp_path):
+        self._make_library(tmp_path)
+        serial = list(validate_directory.iter_validate(str(tmp_path), recursive=True))
+        stats = {}
+        pipelined = list(
+            validate_directory.iter_validate(str(tmp_path), recursive=True, pipeline=True, jobs=2, stats=stats)
+        )
+        assert pipelined == serial
+        assert [r["valid"] for r in pipelined[:4]] == [True, False, False, True]
+        assert pipelined[3]["warnings"]
+        assert set(stats["stages"]) == {"read", "parse", "probe", "report"}
+        assert stats["stages"]["parse"]["workers"] == 2
+        assert stats["stages"]["read"]["items"] == stats["stages"]["report"]["items"] == 12
+        assert all(0.0 <= stage["utilization"] <= 1.0 for stage in stats["stages"].values())
+
+    def test_workers_are_not_forked_and_probes_share_the_run_caches(self, tmp_path, monkeypatch):
+        self._make_library(tmp_path)
+        contexts, probe_caches = [], []
+        real_pool, real_probe = validate_directory.ProcessPoolExecutor, validate_directory._probe_stage
+
+        def pool(*args, **kwargs):
+            contexts.append(kwargs.get("mp_context"))
+            return real_pool(*args, **kwargs)
+
+        def probe(*args):
+            probe_caches.append(args[-1])
+            return real_probe(*args)
+
+        monkeypatch.setattr(validate_directory, "ProcessPoolExecutor", pool)
+        monkeypatch.setattr(validate_directory, "_probe_stage", probe)
+        list(validate_directory.iter_validate(str(tmp_path), recursive=True, pipeline=True, jobs=1))
+        assert contexts[0].get_start_method() in ("forkserver", "spawn")
+        assert len(probe_caches) == 9 and all(caches is probe_caches[0] for caches in probe_caches)
+
+    def test_bounded_queues_still_deliver_everything(self, tmp_path):
+        for n in range(1, 21):
+            (tmp_path / "prst{:03d}.yml".format(n)).write_text("Preset {}:\n  Name: P\n".format(n))
+        results = validate_directory._iter_validate_pipelined(
+            validate_directory.iter_preset_files(str(tmp_path)),
+            tmp_path,
+            False,
+            None,
+            {"run_samples": False},
+            jobs=1,
+            queue_size=1,
+        )
+        assert [Path(r["file"]).name for r in results] == ["prst{:03d}.yml".format(n) for n in range(1, 21)]
+
+    def test_stage_errors_are_raised_by_the_reporter(self, tmp_path):
+        (tmp_path / "prst001.yml").write_text("Preset 1:\n  Name: A\n")
+
+        def walk():
+            yield tmp_path / "prst001.yml"
+            raise OSError("listing failed")
+
+        results = validate_directory._iter_validate_pipelined(walk(), tmp_path, False, None, {}, jobs=1)
+        with pytest.raises(OSError, match="listing failed"):
+            list(results)
+
+    def test_oversized_presets_are_rejected_without_being_read(self, tmp_path, monkeypatch):
+        (tmp_path / "prst001.yml").write_bytes(b"Preset 1:\n  Name: A\n" + b"#" * (1024 * 1024))
+        (tmp_path / "prst002.yml").write_text("Preset 2:\n  Name: B\n")
+        reads = []
+        real_read = validate_directory.read_preset
+        monkeypatch.setattr(validate_directory, "read_preset", lambda p: reads.append(real_read(p)) or reads[-1])
+        serial = list(validate_directory.iter_validate(str(tmp_path), run_samples=False))
+        pipelined = list(validate_directory.iter_validate(str(tmp_path), run_samples=False, pipeline=True, jobs=1))
+        assert pipelined == serial
+        assert "exceeds the limit of 1048576 bytes" in pipelined[0]["message"]
+        assert [content is None for _, content in reads] == [True, False]
+
+    def test_cli_reports_stage_utilization(self, tmp_path, capsys):
+        self._make_library(tmp_path)
+        import json
+        import sys
+
+        old_argv = sys.argv
+        sys.argv = ["a8-validate", str(tmp_path), "-r", "--pipeline", "-j", "2", "--json"]
+        try:
+            validate_directory.main()
+        finally:
+            sys.argv = old_argv
+        data = json.loads(capsys.readouterr().out)
+        assert data["summary"]["valid"] == 6
+        # Every preset that parsed is probed, including the one whose sample is missing
+        assert data["summary"]["pipeline"]["stages"]["probe"]["items"] == 9
+
+
+class TestIncrementalCli:
+    """Tests for --incremental (user-047)."""
+
+    def test_summary_reports_reused_verdicts(self, tmp_path, capsys):
+        (tmp_path / "prst001.yml").write_text("Preset 1:\n  Name: A\n")
+        (tmp_path / "prst002.yml").write_text("Preset 2:\n  Name: B\n")
+        import json
+        import sys
+
+        old_argv = sys.argv
+        manifest = str(tmp_path / "state" / "manifest.json")
+        os.mkdir(tmp_path / "state")
+        try:
+            for _ in range(2):
+                sys.argv = ["a8-validate", str(tmp_path), "--incremental", manifest, "--json"]
+                validate_directory.main()
+        finally:
+            sys.argv = old_argv
+        first, second = capsys.readouterr().out.split("\n}\n", 1)
+        assert json.loads(first + "}")["summary"]["incremental"]["reused"] == 0
+        incremental = json.loads(second)["summary"]["incremental"]
+        assert incremental == {"reused": 2, "validated": 0, "manifest": manifest}
+
+    def test_pipeline_cannot_be_combined(self, tmp_path, monkeypatch, capsys):
+        import sys
+
+        monkeypatch.setattr(sys, "argv", ["a8-validate", str(tmp_path), "--incremental", "--pipeline"])
+        with pytest.raises(SystemExit) as exc_info:
+            validate_directory.main()
+        assert exc_info.value.code == 2
+        assert "not allowed with argument" in capsys.readouterr().err
+
+    def test_oversized_presets_are_not_read_or_recorded(self, tmp_path, monkeypatch):
+        (tmp_path / "prst001.yml").write_bytes(b"Preset 1:\n  Name: A\n" + b"#" * (1024 * 1024))
+        reads = []
+        real_read = validate_directory.read_preset
+        monkeypatch.setattr(validate_directory, "read_preset", lambda p: reads.append(real_read(p)) or reads[-1])
+        manifest = validate_directory.RunManifest.load(str(tmp_path / "manifest.json"), tmp_path, {})
+        results = list(validate_directory.iter_validate(str(tmp_path), run_samples=False, manifest=manifest))
+        assert "exceeds the limit of 1048576 bytes" in results[0]["message"]
+        assert reads[0][1] is None
+        assert manifest.validated == 0
+
+
+class TestFilesFrom:
+    """Tests for --files-from change lists (user-048)."""
+
+    def _tree(self, root):
+        for kit in ("kit1", "kit2", "old"):
+            folder = root / kit
+            folder.mkdir()
+            (folder / "kick.wav").write_bytes(TestPipelinedValidation.KICK_WAV)
+            (folder / "prst001.yml").write_text(
+                "Preset 1:\n  Name: A\n  Channel 1:\n    Zone 1:\n      Sample: Kick.wav\n"
+            )
+            (folder / "prst002.yml").write_text("Preset 2:\n  Name: B\n")
+        (root / ".a8ignore").write_text("old/\n")
+
+    def test_read_file_list_accepts_lines_and_nul(self, tmp_path):
+        (tmp_path / "lines.txt").write_text("a.yml\n\nb dir/c.wav\n")
+        (tmp_path / "nul.txt").write_bytes(b"a.yml\0b\ndir/c.wav\0")
+        assert validate_directory.read_file_list(str(tmp_path / "lines.txt")) == ["a.yml", "b dir/c.wav"]
+        assert validate_directory.read_file_list(str(tmp_path / "nul.txt")) == ["a.yml", "b\ndir/c.wav"]
+
+    def test_changed_samples_expand_to_referencing_presets(self, tmp_path, monkeypatch):
+        self._tree(tmp_path)
+        parsed = []
+        real_parse = preset_files.parse_yaml_file
+        monkeypatch.setattr(preset_files, "parse_yaml_file", lambda p, **k: parsed.append(p) or real_parse(p, **k))
+        changed = [
+            str(tmp_path / "kit1" / "KICK.wav"),
+            str(tmp_path / "kit2" / "prst002.yml"),
+            str(tmp_path / "old" / "prst002.yml"),
+            str(tmp_path / "old" / "kick.wav"),
+            str(tmp_path / "notes.txt"),
+        ]
+        presets, stats = validate_directory.presets_for_changed_files(changed, str(tmp_path), recursive=True)
+        assert [p.relative_to(tmp_path).as_posix() for p in presets] == ["kit1/prst001.yml", "kit2/prst002.yml"]
+        assert stats == {"listed": 5, "presets": 2, "expanded": 1, "skipped": 2}
+        # prst002.yml does not mention the sample, so only prst001.yml was parsed
+        assert parsed == [str(tmp_path / "kit1" / "prst001.yml")]
+
+    def test_oversized_presets_are_selected_without_being_scanned(self, tmp_path, monkeypatch):
+        self._tree(tmp_path)
+        (tmp_path / "kit1" / "prst003.yml").write_bytes(b"Preset 3:\n  Name: C\n" + b"#" * (1024 * 1024))
+        reads = []
+        real_read = preset_files.read_preset
+        monkeypatch.setattr(preset_files, "read_preset", lambda p: reads.append(real_read(p)) or reads[-1])
+        presets, _ = validate_directory.presets_for_changed_files(
+            [str(tmp_path / "kit1" / "kick.wav")], str(tmp_path), recursive=True
+        )
+        assert [p.name for p in presets] == ["prst001.yml", "prst003.yml"]
+        assert sorted(content is None for _, content in reads) == [False, False, True]
+
+    def test_scope_follows_recursion_and_samples_dirs(self, tmp_path):
+        self._tree(tmp_path)
+        changed = [str(tmp_path / "kit1" / "kick.wav"), str(tmp_path / "kit1" / "prst002.yml")]
+        assert validate_directory.presets_for_changed_files(changed, str(tmp_path))[0] == []
+        presets, _ = validate_directory.presets_for_changed_files(
+            changed, str(tmp_path), recursive=True, samples_dirs=[tmp_path / "kit1"]
+        )
+        assert [p.relative_to(tmp_path).as_posix() for p in presets] == [
+            "kit1/prst001.yml",
+            "kit1/prst002.yml",
+            "kit2/prst001.yml",
+        ]
+
+    def test_cli_validates_only_the_selected_presets(self, tmp_path, capsys):
+        self._tree(tmp_path)
+        (tmp_path / "changed.txt").write_bytes(os.fsencode(str(tmp_path / "kit2" / "kick.wav")) + b"\0")
+        import json
+        import sys
+
+        old_argv = sys.argv
+        sys.argv = ["a8-validate", str(tmp_path), "-r", "--files-from", str(tmp_path / "changed.txt"), "--json"]
+        try:
+            validate_directory.main()
+        finally:
+            sys.argv = old_argv
+        data = json.loads(capsys.readouterr().out)
+        assert [Path(r["file"]).relative_to(tmp_path).as_posix() for r in data["results"]] == ["kit2/prst001.yml"]
+        assert data["summary"]["files_from"]["expanded"] == 1
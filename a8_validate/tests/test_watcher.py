@@ -0,0 +1,142 @@
+"""Tests for the watch mode change notifiers and session state."""
+
+import errno
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from a8_validate.preset_checks import load_preset
+from a8_validate.watcher import (
+    InotifyWatcher,
+    PollingWatcher,
+    PresetWatch,
+    add_watches,
+    make_watcher,
+    watch_directories,
+)
+
+KICK_WAV = (
+    b"RIFF\x24\x00\x00\x00WAVEfmt \x10\x00\x00\x00\x01\x00\x01\x00"
+    b"\x44\xac\x00\x00\x88\x58\x01\x00\x02\x00\x10\x00data\x00\x00\x00\x00"
+)
+
+
+def _watcher(kind):
+    if kind == "inotify":
+        try:
+            return InotifyWatcher()
+        except OSError:
+            pytest.skip("inotify is not available")
+    return PollingWatcher(interval=0.01)
+
+
+@pytest.mark.parametrize("kind", ["inotify", "polling"])
+class TestWatchers:
+    """Test cases shared by the inotify and polling watchers."""
+
+    def test_reports_written_created_and_deleted_files(self, tmp_path, kind):
+        (tmp_path / "old.wav").write_bytes(b"1")
+        watcher = _watcher(kind)
+        try:
+            watcher.add(str(tmp_path))
+            assert watcher.changes(timeout=0.05) == set()
+            (tmp_path / "prst001.yml").write_text("Preset 1:\n")
+            os.unlink(tmp_path / "old.wav")
+            changed = watcher.changes(timeout=2)
+            assert changed == {str(tmp_path / "prst001.yml"), str(tmp_path / "old.wav")}
+        finally:
+            watcher.close()
+
+    def test_reports_new_subdirectories(self, tmp_path, kind):
+        watcher = _watcher(kind)
+        try:
+            watcher.add(str(tmp_path))
+            (tmp_path / "kit").mkdir()
+            assert str(tmp_path / "kit") in watcher.changes(timeout=2)
+        finally:
+            watcher.close()
+
+
+def test_watch_directories_skip_links(tmp_path):
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    (tmp_path / ".kit").mkdir()
+    if sys.platform != "win32":
+        os.symlink(tmp_path / "a", tmp_path / "link")
+    found = list(watch_directories(tmp_path, recursive=True))
+    assert found == [str(tmp_path), str(tmp_path / ".kit"), str(tmp_path / "a"), str(tmp_path / "a" / "b")]
+    assert list(watch_directories(tmp_path)) == [str(tmp_path)]
+
+
+def test_poll_interval_forces_polling():
+    assert make_watcher(poll_interval=1.0).backend == "polling"
+
+
+def test_out_of_inotify_watches_falls_back_to_polling(tmp_path, monkeypatch):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    watcher = _watcher("inotify")
+    real_add = watcher.add
+
+    def add(directory):
+        if watcher.directories():
+            raise OSError(errno.ENOSPC, os.strerror(errno.ENOSPC), directory)
+        real_add(directory)
+
+    monkeypatch.setattr(watcher, "add", add)
+    replacement = add_watches(watcher, [tmp_path / "a", tmp_path / "b"], poll_interval=0.01)
+    try:
+        assert isinstance(replacement, PollingWatcher)
+        assert replacement.directories() == [str(tmp_path / "a"), str(tmp_path / "b")]
+        (tmp_path / "b" / "kick.wav").write_bytes(b"1")
+        assert replacement.changes(timeout=2) == {str(tmp_path / "b" / "kick.wav")}
+    finally:
+        replacement.close()
+        watcher.close()
+    # Other errors are not a reason to switch
+    with pytest.raises(FileNotFoundError):
+        add_watches(PollingWatcher(), [tmp_path / "missing"])
+
+
+class TestPresetWatch:
+    """Tests for the --watch session state (user-046)."""
+
+    def _session(self, root):
+        (root / "kick.wav").write_bytes(KICK_WAV)
+        (root / "prst001.yml").write_text("Preset 1:\n  Name: A\n  Channel 1:\n    Zone 1:\n      Sample: kick.wav\n")
+        (root / "prst002.yml").write_text("Preset 2:\n  Name: B\n  Channel 1:\n    Zone 1:\n      Sample: snare.wav\n")
+        session = PresetWatch(str(root))
+        results = session.scan()
+        assert [r["valid"] for r in results] == [True, False]
+        return session
+
+    def test_changed_sample_rechecks_only_its_presets(self, tmp_path, monkeypatch):
+        session = self._session(tmp_path)
+        loads = []
+        monkeypatch.setattr(
+            "a8_validate.watcher.load_preset", lambda p, *a, **k: loads.append(p) or load_preset(p, *a, **k)
+        )
+        (tmp_path / "snare.wav").write_bytes(KICK_WAV)
+        results = session.apply([str(tmp_path / "snare.wav")])
+        assert [(Path(r["file"]).name, r["valid"]) for r in results] == [("prst002.yml", True)]
+        # Sample changes re-check the parsed preset without reading its YAML again
+        assert loads == []
+        os.unlink(tmp_path / "kick.wav")
+        results = session.apply([str(tmp_path / "kick.wav")])
+        assert [(Path(r["file"]).name, r["valid"]) for r in results] == [("prst001.yml", False)]
+
+    def test_changed_added_and_removed_presets(self, tmp_path):
+        session = self._session(tmp_path)
+        (tmp_path / "prst001.yml").write_text("Preset 1:\n  Name: A\n  Bogus: 1\n")
+        (tmp_path / "prst003.yml").write_text("Preset 3:\n  Name: C\n")
+        os.unlink(tmp_path / "prst002.yml")
+        changed = [str(tmp_path / name) for name in ("prst001.yml", "prst002.yml", "prst003.yml")]
+        results = {Path(r["file"]).name: r for r in session.apply(changed)}
+        assert set(results) == {"prst001.yml", "prst002.yml", "prst003.yml"}
+        assert not results["prst001.yml"]["valid"] and "Bogus" in results["prst001.yml"]["message"]
+        assert results["prst002.yml"] == {"file": str(tmp_path / "prst002.yml"), "removed": True}
+        assert results["prst003.yml"]["valid"]
+        assert "snare.wav" not in session.dependents
+        # Unchanged files are not reported again
+        assert session.apply([str(tmp_path / "prst003.yml")]) == []
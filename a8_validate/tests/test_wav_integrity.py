@@ -0,0 +1,154 @@
+"""Tests for the WAV structural integrity check."""
+
+import struct
+import wave
+
+import pytest
+
+from a8_validate.file_system_validator import (
+    EmbeddedLoopMismatchWarning,
+    InvalidSampleFormatError,
+    WavStructureWarning,
+    clear_sample_index_cache,
+    validate_sample_files,
+)
+from a8_validate.wav_integrity import WavStructureError, check_wav_structure, inspect_wav
+
+FMT_CHUNK = b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, 44100, 88200, 2, 16)
+
+
+def _riff(*chunks, riff_size=None):
+    body = b"WAVE" + b"".join(chunks)
+    size = len(body) if riff_size is None else riff_size
+    return b"RIFF" + struct.pack("<I", size) + body
+
+
+def _data(payload, claimed=None):
+    return b"data" + struct.pack("<I", len(payload) if claimed is None else claimed) + payload
+
+
+def _smpl(*loops, declared=None):
+    header = struct.pack("<9I", 0, 0, 20833, 60, 0, 0, 0, len(loops) if declared is None else declared, 0)
+    body = header + b"".join(struct.pack("<6I", i, 0, start, end, 0, 0) for i, (start, end) in enumerate(loops))
+    return b"smpl" + struct.pack("<I", len(body)) + body
+
+
+def _cue(*positions):
+    body = struct.pack("<I", len(positions)) + b"".join(
+        struct.pack("<II4sIII", i + 1, p, b"data", 0, 0, p) for i, p in enumerate(positions)
+    )
+    return b"cue " + struct.pack("<I", len(body)) + body
+
+
+class TestCheckWavStructure:
+    """Test cases for check_wav_structure."""
+
+    def _write(self, tmp_path, content, name="s.wav"):
+        path = tmp_path / name
+        path.write_bytes(content)
+        return str(path)
+
+    def test_valid_file_has_no_findings(self, tmp_path):
+        path = str(tmp_path / "ok.wav")
+        with wave.open(path, "wb") as w:
+            w.setnchannels(2)
+            w.setsampwidth(2)
+            w.setframerate(48000)
+            w.writeframes(b"\x00" * 400)
+        assert check_wav_structure(path) == []
+
+    def test_truncated_data_chunk_is_rejected(self, tmp_path):
+        # A data chunk claiming more than the file holds; wave.open accepts this
+        content = _riff(FMT_CHUNK, _data(b"\x00" * 8, claimed=4000), riff_size=4 + len(FMT_CHUNK) + 8 + 4000)
+        path = self._write(tmp_path, content)
+        with wave.open(path, "rb") as w:
+            assert w.getnframes() == 2000
+        with pytest.raises(WavStructureError, match="truncated"):
+            check_wav_structure(path)
+
+    def test_data_chunk_past_riff_end(self, tmp_path):
+        path = self._write(tmp_path, _riff(FMT_CHUNK, _data(b"\x00" * 8, claimed=100)))
+        with pytest.raises(WavStructureError, match="'data' chunk .* claims 100 bytes"):
+            check_wav_structure(path)
+
+    def test_missing_pad_byte_on_last_chunk_is_a_finding(self, tmp_path):
+        path = self._write(tmp_path, _riff(FMT_CHUNK, _data(b"\x00" * 3)))
+        assert check_wav_structure(path) == ["'data' chunk at offset 36 is missing its pad byte"]
+        assert check_wav_structure(self._write(tmp_path, _riff(FMT_CHUNK, _data(b"\x00" * 3) + b"\x00"))) == []
+        # A truncated body is still an error
+        with pytest.raises(WavStructureError, match="claims 5 bytes"):
+            check_wav_structure(self._write(tmp_path, _riff(FMT_CHUNK, _data(b"\x00" * 3, claimed=5))))
+
+    def test_duplicate_fmt_chunk(self, tmp_path):
+        path = self._write(tmp_path, _riff(FMT_CHUNK, FMT_CHUNK, _data(b"\x00" * 4)))
+        with pytest.raises(WavStructureError, match="Duplicate 'fmt ' chunk"):
+            check_wav_structure(path)
+
+    def test_trailing_bytes_are_reported(self, tmp_path):
+        path = self._write(tmp_path, _riff(FMT_CHUNK, _data(b"\x00" * 4)) + b"ID3tag")
+        assert check_wav_structure(path) == ["6 trailing bytes after the RIFF chunk"]
+
+    @pytest.mark.parametrize("content", [b"", b"RIFF", b"RIFX" + b"\x00" * 12])
+    def test_not_a_riff_file(self, tmp_path, content):
+        with pytest.raises(WavStructureError):
+            check_wav_structure(self._write(tmp_path, content))
+
+
+class TestEmbeddedMarkers:
+    """Test cases for smpl/cue indexing in the chunk scan."""
+
+    def test_reads_smpl_loops_and_cue_points(self, tmp_path):
+        path = tmp_path / "loop.wav"
+        path.write_bytes(_riff(FMT_CHUNK, _cue(10, 90), _data(b"\x00" * 200), _smpl((10, 89), (20, 49))))
+        layout = inspect_wav(str(path))
+        assert [(loop["start"], loop["end"]) for loop in layout.loops] == [(10, 89), (20, 49)]
+        assert layout.cues == [{"id": 1, "position": 10}, {"id": 2, "position": 90}]
+        assert layout.findings == []
+
+    def test_overstated_loop_count_is_a_finding(self, tmp_path):
+        path = tmp_path / "loop.wav"
+        path.write_bytes(_riff(FMT_CHUNK, _data(b"\x00" * 8), _smpl((0, 3), declared=5)))
+        layout = inspect_wav(str(path))
+        assert len(layout.loops) == 1
+        assert layout.findings == ["'smpl' chunk declares 5 loops but holds 1"]
+
+
+class TestDeepWavValidation:
+    """Test cases for the opt-in deep WAV stage of validate_sample_files."""
+
+    def _preset(self, sample):
+        return {"Preset 1": {"Name": "T", "Channel 1": {"Zone 1": {"Sample": sample}}}}
+
+    def test_truncated_sample_fails_only_with_deep_wav(self, tmp_path):
+        content = _riff(FMT_CHUNK, _data(b"\x00" * 8, claimed=4000), riff_size=4 + len(FMT_CHUNK) + 8 + 4000)
+        (tmp_path / "cut.wav").write_bytes(content)
+        clear_sample_index_cache()
+        validate_sample_files(self._preset("cut.wav"), str(tmp_path))
+        with pytest.raises(InvalidSampleFormatError, match="damaged WAV structure"):
+            validate_sample_files(self._preset("cut.wav"), str(tmp_path), deep_wav=True)
+        clear_sample_index_cache()
+
+    def test_findings_are_warnings(self, tmp_path):
+        (tmp_path / "tail.wav").write_bytes(_riff(FMT_CHUNK, _data(b"\x00" * 4)) + b"xx")
+        clear_sample_index_cache()
+        with pytest.warns(WavStructureWarning, match="2 trailing bytes"):
+            validate_sample_files(self._preset("tail.wav"), str(tmp_path), deep_wav=True)
+        (tmp_path / "odd.wav").write_bytes(_riff(FMT_CHUNK, _data(b"\x00" * 5)))
+        with pytest.warns(WavStructureWarning, match="missing its pad byte"):
+            validate_sample_files(self._preset("odd.wav"), str(tmp_path), deep_wav=True)
+        clear_sample_index_cache()
+
+    def test_preset_loop_is_cross_checked_against_smpl(self, tmp_path):
+        # 100 mono 16-bit frames with an embedded loop over frames 10-89 (inclusive)
+        (tmp_path / "loop.wav").write_bytes(_riff(FMT_CHUNK, _data(b"\x00" * 200), _smpl((10, 89))))
+        clear_sample_index_cache()
+        preset = self._preset("loop.wav")
+        channel = preset["Preset 1"]["Channel 1"]
+        channel.update({"LoopMode": 1, "LoopStart": 10, "LoopLength": 80.0})
+        resolved = validate_sample_files(preset, str(tmp_path), deep_wav=True)
+        assert resolved[0]["embedded"]["loops"][0]["start"] == 10
+
+        channel["Zone 1"]["LoopStart"] = 12
+        with pytest.warns(EmbeddedLoopMismatchWarning, match="expected LoopStart : 10 and LoopLength : 80"):
+            validate_sample_files(preset, str(tmp_path), deep_wav=True)
+        clear_sample_index_cache()
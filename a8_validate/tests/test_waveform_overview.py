@@ -0,0 +1,98 @@
+"""Tests for the waveform overview sidecar cache."""
+
+import os
+import struct
+import sys
+import wave
+
+import pytest
+
+from a8_validate import waveform_overview
+from a8_validate.file_system_validator import clear_sample_index_cache, validate_sample_files
+from a8_validate.waveform_overview import (
+    OVERVIEW_LEVELS,
+    compute_overview,
+    get_overview,
+    load_overview,
+    overview_path,
+    read_overview,
+    write_overview,
+)
+
+
+def _write_ramp(path, frames, channels=1):
+    # Left channel ramps up from -16384; a second channel is its negation
+    values = [-16384 + (i % 32768) for i in range(frames)]
+    interleaved = [v if c == 0 else -v for v in values for c in range(channels)]
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(48000)
+        w.writeframes(struct.pack("<" + "h" * len(interleaved), *interleaved))
+    return str(path)
+
+
+class TestComputeOverview:
+    """Test cases for computing and storing overviews."""
+
+    def test_levels_hold_min_max_per_bucket(self, tmp_path):
+        finest, middle, coarse = OVERVIEW_LEVELS
+        frames = 20000
+        overview = compute_overview(_write_ramp(tmp_path / "ramp.wav", frames, channels=2))
+        assert (overview.channels, overview.n_frames) == (2, frames)
+        fine = overview.envelope(finest, channel=0)
+        assert len(fine) == -(-frames // finest)
+        # The last bucket is partial; its max is the last frame
+        assert fine[0] == (round(-16384 / 32768 * 32767) / 32767, round(-16129 / 32768 * 32767) / 32767)
+        assert fine[-1][1] == round((-16384 + frames - 1) / 32768 * 32767) / 32767
+        right = overview.envelope(middle, channel=1)
+        assert len(right) == -(-frames // middle)
+        assert right[0][0] == -overview.envelope(middle, channel=0)[0][1]
+        assert len(overview.envelope(coarse)) == 2
+        assert overview.best_level(10) == middle
+        assert overview.best_level(1000) == finest
+
+    def test_sidecar_round_trip(self, tmp_path):
+        overview = compute_overview(_write_ramp(tmp_path / "ramp.wav", 5000))
+        write_overview(overview, str(tmp_path / "ramp.a8ov"))
+        loaded = read_overview(str(tmp_path / "ramp.a8ov"))
+        assert loaded.levels == overview.levels
+        assert (loaded.frame_rate, loaded.n_frames, loaded.source_size) == (48000, 5000, overview.source_size)
+        assert sorted(os.listdir(tmp_path)) == ["ramp.a8ov", "ramp.wav"]
+
+    def test_cache_is_reused_until_the_sample_changes(self, tmp_path, monkeypatch):
+        cache = str(tmp_path / "cache")
+        sample = _write_ramp(tmp_path / "ramp.wav", 3000)
+        assert load_overview(sample, cache) is None
+        first = get_overview(sample, cache)
+        calls = []
+        monkeypatch.setattr(waveform_overview, "compute_overview", lambda p: calls.append(p) or first)
+        assert load_overview(sample, cache).levels == first.levels
+        get_overview(sample, cache)
+        assert calls == []
+
+        _write_ramp(sample, 4000)
+        os.utime(sample, ns=(0, os.stat(sample).st_mtime_ns + 10**9))
+        assert load_overview(sample, cache) is None
+        get_overview(sample, cache)
+        assert calls == [sample]
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="hardlinks need NTFS")
+    def test_links_share_one_sidecar(self, tmp_path):
+        sample = _write_ramp(tmp_path / "ramp.wav", 100)
+        os.link(sample, tmp_path / "alias.wav")
+        assert overview_path(sample, "c") == overview_path(str(tmp_path / "alias.wav"), "c")
+
+
+class TestOverviewValidation:
+    """Test cases for overview generation during the sample stage."""
+
+    def test_validate_sample_files_fills_the_cache(self, tmp_path):
+        _write_ramp(tmp_path / "ramp.wav", 1000)
+        cache = str(tmp_path / "cache")
+        preset = {"Preset 1": {"Name": "T", "Channel 1": {"Zone 1": {"Sample": "ramp.wav"}}}}
+        clear_sample_index_cache()
+        (sample_info,) = validate_sample_files(preset, str(tmp_path), overview_dir=cache)
+        assert sample_info["overview"] == overview_path(sample_info["file"], cache)
+        assert load_overview(sample_info["file"], cache).n_frames == 1000
+        clear_sample_index_cache()
@@ -7,7 +7,18 @@ from unittest import mock
 import pytest
 
 # Import the module that doesn't exist yet (this will cause the test to fail initially)
-from a8_validate.yaml_parser import InvalidPresetError, PresetParseError, YAMLSyntaxError, parse_yaml_file
+from a8_validate.yaml_parser import (
+    IncrementalPresetParser,
+    InvalidPresetError,
+    NestingTooDeepError,
+    PresetLimitError,
+    PresetParseError,
+    PresetTooLargeError,
+    TooManyKeysError,
+    YAMLAliasError,
+    YAMLSyntaxError,
+    parse_yaml_file,
+)
 
 
 class TestYAMLParser:
@@ -254,3 +265,142 @@ class TestYAMLParser:
         finally:
             # Clean up
             os.unlink(temp_path)
+
+
+class TestParseLimits:
+    """Test cases for resource limits enforced by parse_yaml_file (user-026)."""
+
+    VALID_YAML = """Preset 1 :
+  Name : Limits
+  Channel 1 :
+    Pitch : 0.00
+    Zone 1 :
+      Sample : test.wav
+"""
+
+    def _write(self, tmp_path, content):
+        path = tmp_path / "prst001.yml"
+        path.write_text(content)
+        return str(path)
+
+    def test_default_limits_accept_normal_preset(self, tmp_path):
+        result = parse_yaml_file(self._write(tmp_path, self.VALID_YAML))
+        assert result["Preset 1"]["Channel 1"]["Zone 1"]["Sample"] == "test.wav"
+
+    def test_rejects_file_over_max_bytes(self, tmp_path):
+        path = self._write(tmp_path, self.VALID_YAML)
+        with pytest.raises(PresetTooLargeError) as exc_info:
+            parse_yaml_file(path, max_bytes=32)
+        assert isinstance(exc_info.value, PresetLimitError)
+        assert isinstance(exc_info.value, PresetParseError)
+        assert "32 bytes" in str(exc_info.value)
+
+    def test_rejects_deep_nesting(self, tmp_path):
+        path = self._write(tmp_path, self.VALID_YAML)
+        # Root, Preset, Channel and Zone mappings are four levels deep
+        parse_yaml_file(path, max_depth=4)
+        with pytest.raises(NestingTooDeepError) as exc_info:
+            parse_yaml_file(path, max_depth=3)
+        assert "line 5" in str(exc_info.value)
+
+    def test_rejects_too_many_keys(self, tmp_path):
+        lines = ["Preset 1 :", "  Name : Keys", "  Channel 1 :"]
+        lines += [f"    Key{i} : {i}" for i in range(20)]
+        path = self._write(tmp_path, "\n".join(lines) + "\n")
+        with pytest.raises(TooManyKeysError) as exc_info:
+            parse_yaml_file(path, max_keys=10)
+        assert "10 keys" in str(exc_info.value)
+        assert parse_yaml_file(path, max_keys=None)["Preset 1"]["Channel 1"]["Key19"] == 19
+
+    def test_rejects_aliases_and_anchors(self, tmp_path):
+        content = """Preset 1 :
+  Name : Alias
+  Channel 1 : &chan
+    Zone 1 :
+      Sample : test.wav
+  Channel 2 : *chan
+"""
+        path = self._write(tmp_path, content)
+        with pytest.raises(YAMLAliasError) as exc_info:
+            parse_yaml_file(path)
+        assert "line 3" in str(exc_info.value)
+        data = parse_yaml_file(path, allow_aliases=True)
+        assert data["Preset 1"]["Channel 2"]["Zone 1"]["Sample"] == "test.wav"
+
+
+class TestIncrementalPresetParser:
+    """Test cases for IncrementalPresetParser (user-050)."""
+
+    @staticmethod
+    def _document(level="-3.00", channels=3):
+        lines = ["Preset 1 :", "  Name : Kit", "  XfadeACV : 1A"]
+        for c in range(1, channels + 1):
+            lines += [f"  Channel {c} :", f"    Level : {level if c == 2 else '0.00'}"]
+            for z in range(1, 3):
+                lines += [f"    Zone {z} :", f"      Sample : s{z}.wav", f"      MinVoltage : {5 - 5 * z:+.2f}"]
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _full(text, **limits):
+        data, line_map = parse_yaml_file("prst001.yml", return_line_map=True, content=text.encode(), **limits)
+        return data, list(line_map.items())
+
+    def _parse(self, parser, text):
+        data, line_map = parser.parse("prst001.yml", text)
+        return data, list(line_map.items())
+
+    def test_matches_parse_yaml_file_and_reparses_only_edited_channels(self, monkeypatch):
+        import a8_validate.yaml_parser as yaml_parser
+
+        parser = IncrementalPresetParser()
+        text = self._document()
+        assert self._parse(parser, text) == self._full(text)
+        edited = self._document(level="-6.00")
+        expected = self._full(edited)
+        loads = []
+        real_load = yaml_parser._load_with_line_map
+        monkeypatch.setattr(
+            yaml_parser,
+            "_load_with_line_map",
+            lambda *args, **kwargs: loads.append(args[0]) or real_load(*args, **kwargs),
+        )
+        assert self._parse(parser, edited) == expected
+        # Only the edited channel's piece is parsed again
+        assert len(loads) == 1 and loads[0].startswith("  Channel 2 :")
+
+    @pytest.mark.parametrize(
+        "edit",
+        [
+            lambda text: text + "Preset 2 :\n  Name : Other\n",
+            lambda text: text.replace("  Name : Kit", "  Name : |\n    Kit"),
+            lambda text: text.replace("  XfadeACV : 1A", "  XfadeACV : [1A,\n  Channel 9 :\n  ]"),
+            lambda text: text.replace("  Name : Kit", "    Name : Kit"),
+            lambda text: text.replace("    Level : 0.00", "    Level : 0.00\n  Name : Again", 1),
+            lambda text: "# leading comment\n" + text + "\n\n",
+        ],
+    )
+    def test_unusual_layouts_match_parse_yaml_file(self, edit):
+        text = edit(self._document())
+        try:
+            expected = self._full(text)
+        except PresetParseError as e:
+            with pytest.raises(type(e)) as exc_info:
+                IncrementalPresetParser().parse("prst001.yml", text)
+            assert str(exc_info.value) == str(e)
+        else:
+            assert self._parse(IncrementalPresetParser(), text) == expected
+
+    def test_errors_and_limits_match_parse_yaml_file(self):
+        text = self._document().replace("      Sample : s1.wav", "      Sample : [s1.wav", 1)
+        with pytest.raises(YAMLSyntaxError) as expected:
+            self._full(text)
+        with pytest.raises(YAMLSyntaxError) as exc_info:
+            IncrementalPresetParser().parse("prst001.yml", text)
+        assert str(exc_info.value) == str(expected.value)
+        # The preset body's keys are counted across pieces
+        text = self._document(channels=4)
+        with pytest.raises(TooManyKeysError):
+            IncrementalPresetParser(max_keys=5).parse("prst001.yml", text)
+        assert self._parse(IncrementalPresetParser(max_keys=6), text) == self._full(text, max_keys=6)
+        with pytest.raises(NestingTooDeepError):
+            IncrementalPresetParser(max_depth=3).parse("prst001.yml", text)
@@ -0,0 +1,461 @@
+"""Watch mode: change notification (inotify through ctypes on Linux, mtime polling elsewhere) and session state."""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+import warnings
+from pathlib import Path
+
+from a8_validate.file_system_validator import SampleCaches, sample_reference_key, sample_reference_keys, sample_run
+from a8_validate.ignore_rules import IGNORE_FILENAME
+from a8_validate.preset_checks import CHECK_OPTIONS, check_samples, error_message, load_preset, preset_result
+from a8_validate.preset_files import PRESET_SUFFIXES, iter_preset_files
+
+# inotify(7) constants
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+# Completed writes, renames in and out, creations and deletions; IN_MODIFY would fire once per write() call
+WATCH_MASK = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+# wd, mask, cookie, name length (struct inotify_event, followed by the name)
+_EVENT = struct.Struct("iIII")
+
+# Seconds to keep collecting after the first change, so one save (write, rename, chmod) is one batch
+WATCH_SETTLE_SECONDS = 0.01
+DEFAULT_POLL_INTERVAL = 0.5
+# inotify_add_watch errors meaning the per-user watch limit (fs.inotify.max_user_watches) or its memory ran out
+_WATCH_LIMIT_ERRNOS = (errno.ENOSPC, errno.ENOMEM)
+
+
+def watch_directories(directory, recursive=False):
+    """Yield a directory and, if recursive, its subdirectories, skipping symlinked ones (as preset discovery does)."""
+    yield str(directory)
+    if not recursive:
+        return
+    for root, dirs, _ in os.walk(str(directory)):
+        dirs[:] = sorted(d for d in dirs if not os.path.islink(os.path.join(root, d)))
+        for d in dirs:
+            yield os.path.join(root, d)
+
+
+class InotifyWatcher:
+    """
+    Directory watcher using the Linux inotify API, called through ctypes.
+
+    Each added directory gets one watch (inotify is not recursive); callers add new
+    subdirectories as they are reported. changes() returns the paths of entries created,
+    written, renamed or deleted in watched directories. If the kernel event queue
+    overflows, every watched directory is reported instead.
+    """
+
+    backend = "inotify"
+
+    def __init__(self):
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        try:
+            self._add_watch = libc.inotify_add_watch
+            init = libc.inotify_init1
+        except AttributeError:
+            raise OSError(errno.ENOSYS, "libc has no inotify support")
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._add_watch.restype = ctypes.c_int
+        self._fd = init(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        # watch descriptor -> directory
+        self._directories = {}
+
+    def add(self, directory):
+        """Watch one directory (not its subdirectories)."""
+        wd = self._add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), directory)
+        self._directories[wd] = str(directory)
+
+    def directories(self):
+        """Return the directories being watched."""
+        return list(self._directories.values())
+
+    def _read(self, timeout):
+        """Return the paths in one read of the event queue, waiting up to timeout seconds (None: forever)."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        paths = set()
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = data[offset : offset + length].split(b"\0", 1)[0]
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                paths.update(self._directories.values())
+                continue
+            directory = self._directories.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                # The directory was removed or unmounted; the kernel dropped the watch
+                del self._directories[wd]
+                continue
+            paths.add(os.path.join(directory, os.fsdecode(name)) if name else directory)
+        return paths
+
+    def changes(self, timeout=None):
+        """Wait up to timeout seconds (None: forever) for changes; return the changed paths, settled."""
+        paths = self._read(timeout)
+        while paths:
+            more = self._read(WATCH_SETTLE_SECONDS)
+            if not more:
+                break
+            paths |= more
+        return paths
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingWatcher:
+    """
+    Portable directory watcher that rescans watched directories every interval seconds.
+
+    A directory's files are compared by (mtime, size); this costs one listing and
+    a stat per entry per scan, so the interval trades latency for load on large folders.
+    """
+
+    backend = "polling"
+
+    def __init__(self, interval=DEFAULT_POLL_INTERVAL):
+        self.interval = interval
+        # directory -> {name: (mtime_ns, size), or None for subdirectories}
+        self._snapshots = {}
+
+    @staticmethod
+    def _snapshot(directory):
+        snapshot = {}
+        with os.scandir(directory) as listing:
+            for entry in listing:
+                try:
+                    if entry.is_dir():
+                        # Only additions and removals of subdirectories count; their own
+                        # entries are seen when they are watched themselves
+                        snapshot[entry.name] = None
+                        continue
+                    st = entry.stat()
+                except OSError:
+                    continue
+                snapshot[entry.name] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def add(self, directory):
+        """Watch one directory (not its subdirectories)."""
+        self._snapshots[str(directory)] = self._snapshot(directory)
+
+    def directories(self):
+        """Return the directories being watched."""
+        return list(self._snapshots)
+
+    def _scan(self):
+        paths = set()
+        for directory, old in list(self._snapshots.items()):
+            try:
+                new = self._snapshot(directory)
+            except OSError:
+                # Removed: report the directory and stop watching it
+                del self._snapshots[directory]
+                paths.add(directory)
+                continue
+            for name in old.keys() ^ new.keys():
+                paths.add(os.path.join(directory, name))
+            for name in old.keys() & new.keys():
+                if old[name] != new[name]:
+                    paths.add(os.path.join(directory, name))
+            self._snapshots[directory] = new
+        return paths
+
+    def changes(self, timeout=None):
+        """Wait up to timeout seconds (None: forever) for changes; return the changed paths."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            paths = self._scan()
+            if paths:
+                return paths
+            if deadline is not None and time.monotonic() >= deadline:
+                return paths
+            wait = self.interval if deadline is None else min(self.interval, max(0.0, deadline - time.monotonic()))
+            time.sleep(wait)
+
+    def close(self):
+        self._snapshots.clear()
+
+
+def make_watcher(poll_interval=None):
+    """
+    Return an InotifyWatcher, or a PollingWatcher where inotify is unavailable.
+
+    Passing poll_interval forces polling (e.g. for network file systems, where inotify
+    does not see changes made by other hosts).
+    """
+    if poll_interval is None:
+        try:
+            return InotifyWatcher()
+        except OSError:
+            poll_interval = DEFAULT_POLL_INTERVAL
+    return PollingWatcher(poll_interval)
+
+
+def add_watches(watcher, directories, poll_interval=DEFAULT_POLL_INTERVAL):
+    """
+    Watch each directory, switching to polling if inotify runs out of watches.
+
+    Large libraries can exceed the per-user inotify watch limit, which makes adding a
+    watch fail with ENOSPC. The InotifyWatcher is then closed and replaced by a
+    PollingWatcher over the directories it watched and the rest of directories (skipping
+    any that no longer exist). Other errors are raised.
+
+    Returns:
+        The watcher to use from now on: watcher itself, or the PollingWatcher replacing it
+    """
+    directories = [str(directory) for directory in directories]
+    for position, directory in enumerate(directories):
+        try:
+            watcher.add(directory)
+        except OSError as e:
+            if e.errno not in _WATCH_LIMIT_ERRNOS or not isinstance(watcher, InotifyWatcher):
+                raise
+            polling = PollingWatcher(poll_interval)
+            for watched in watcher.directories() + directories[position:]:
+                try:
+                    polling.add(watched)
+                except OSError:
+                    pass
+            watcher.close()
+            return polling
+    return watcher
+
+
+class PresetWatch:
+    """
+    In-memory state of a --watch session: parsed presets, sample headers and a reverse index.
+
+    Each preset is kept parsed with its file stamp (mtime, size, inode), so a preset is
+    parsed again only when its YAML changes. The reverse index maps each referenced
+    sample's folded file name (including samples that are missing) to the presets that
+    reference it, so a changed WAV re-checks only those presets, against the sample
+    headers kept in a shared probe table.
+    """
+
+    __slots__ = (
+        "directory",
+        "recursive",
+        "samples_dirs",
+        "use_ignore_files",
+        "options",
+        "presets",
+        "dependents",
+        "probes",
+        "caches",
+    )
+
+    def __init__(self, directory, recursive=False, samples_dirs=None, use_ignore_files=True, **options):
+        self.directory = Path(directory)
+        self.recursive = recursive
+        self.samples_dirs = list(samples_dirs) if samples_dirs else None
+        self.use_ignore_files = use_ignore_files
+        # run_crossref, run_samples and the check_samples options
+        self.options = options
+        # absolute path -> {"path", "stamp", "data", "line_map", "error", "warnings", "keys"}
+        self.presets = {}
+        # sample reference key -> absolute paths of the presets referencing it
+        self.dependents = {}
+        # sample identity -> SampleProbe, shared by every preset
+        self.probes = {}
+        # Sample folder listings, kept for the session and dropped per folder as it changes
+        self.caches = SampleCaches()
+
+    def _sample_dir(self, file_path):
+        if not self.options.get("run_samples", True):
+            return None
+        if self.samples_dirs:
+            return self.samples_dirs
+        return file_path.parent if self.recursive else self.directory
+
+    def _sample_roots(self, file_path):
+        sample_dir = self._sample_dir(file_path)
+        if sample_dir is None:
+            return []
+        folders = sample_dir if isinstance(sample_dir, list) else [sample_dir]
+        return [os.path.abspath(folder) for folder in folders]
+
+    @staticmethod
+    def _stamp(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def _forget(self, key):
+        entry = self.presets.pop(key)
+        for sample_key in entry["keys"]:
+            presets = self.dependents.get(sample_key)
+            if presets is not None:
+                presets.discard(key)
+                if not presets:
+                    del self.dependents[sample_key]
+
+    def _load(self, file_path, stamp):
+        """Parse a preset and record it in the reverse index; return its key."""
+        key = os.path.abspath(file_path)
+        if key in self.presets:
+            self._forget(key)
+        line_map = {}
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            try:
+                preset_data = load_preset(file_path, line_map, self.options.get("run_crossref", True))
+                error = None
+            except Exception as e:
+                preset_data, error = None, error_message(e, line_map)
+        keys = sample_reference_keys(preset_data) if preset_data is not None else set()
+        self.presets[key] = {
+            "path": file_path,
+            "stamp": stamp,
+            "data": preset_data,
+            "line_map": line_map,
+            "error": error,
+            "warnings": [str(w.message) for w in caught],
+            "keys": keys,
+        }
+        for sample_key in keys:
+            self.dependents.setdefault(sample_key, set()).add(key)
+        return key
+
+    def _check(self, key):
+        """Run the sample checks of a loaded preset and return its result record."""
+        entry = self.presets[key]
+        error = entry["error"]
+        preset_warnings = list(entry["warnings"])
+        report = {}
+        message = "Valid"
+        sample_dir = self._sample_dir(entry["path"])
+        if error is None and sample_dir:
+            with warnings.catch_warnings(record=True) as caught, sample_run(self.caches):
+                warnings.simplefilter("always")
+                try:
+                    check_options = {k: self.options[k] for k in CHECK_OPTIONS if k in self.options}
+                    message = check_samples(entry["data"], sample_dir, report, probes=self.probes, **check_options)
+                except Exception as e:
+                    error = error_message(e, entry["line_map"])
+            preset_warnings += [str(w.message) for w in caught]
+        return preset_result(entry["path"], error is None, error or message, preset_warnings, report)
+
+    def _sample_folder_changed(self, folder):
+        """Drop the cached listing and headers of a sample folder."""
+        self.caches.clear(folder)
+        for identity, probe in list(self.probes.items()):
+            if os.path.dirname(os.path.abspath(probe.path)) == folder:
+                del self.probes[identity]
+
+    def scan(self):
+        """
+        Bring the preset set in line with the directory walk.
+
+        Returns:
+            Result records of presets that are new or whose file changed, plus
+            {"file": ..., "removed": True} for presets that are gone, in walk order.
+        """
+        results = []
+        seen = set()
+        for file_path in iter_preset_files(
+            str(self.directory), recursive=self.recursive, use_ignore_files=self.use_ignore_files
+        ):
+            key = os.path.abspath(file_path)
+            seen.add(key)
+            stamp = self._stamp(key)
+            entry = self.presets.get(key)
+            if stamp is not None and (entry is None or entry["stamp"] != stamp):
+                results.append(self._check(self._load(file_path, stamp)))
+        for key in [key for key in self.presets if key not in seen]:
+            results.append({"file": str(self.presets[key]["path"]), "removed": True})
+            self._forget(key)
+        return results
+
+    def apply(self, changed_paths):
+        """
+        Re-validate what a batch of changed paths affects.
+
+        A changed preset is parsed and checked again; a changed WAV re-checks the presets
+        that reference its name and search its folder, without parsing them again. New
+        presets, .a8ignore edits and added or removed directories rescan the walk (which
+        parses only new or changed files); a changed directory also re-checks every preset
+        whose samples it holds.
+
+        Returns:
+            Result records of the re-validated presets (see scan), each preset once.
+        """
+        rescan = False
+        reload = set()
+        recheck = set()
+        for path in changed_paths:
+            key = os.path.abspath(path)
+            name = os.path.basename(key)
+            if key in self.presets:
+                reload.add(key)
+            elif name.endswith(PRESET_SUFFIXES) or name == IGNORE_FILENAME:
+                rescan = True
+            elif name.lower().endswith(".wav"):
+                folder = os.path.dirname(key)
+                self._sample_folder_changed(folder)
+                for preset_key in self.dependents.get(sample_reference_key(name), ()):
+                    if folder in self._sample_roots(self.presets[preset_key]["path"]):
+                        recheck.add(preset_key)
+            elif os.path.isdir(key) or not os.path.exists(key):
+                # A directory was added or removed, or the watcher lost track of a folder's events
+                rescan = True
+                self._sample_folder_changed(key)
+                for preset_key, entry in self.presets.items():
+                    if key in self._sample_roots(entry["path"]):
+                        recheck.add(preset_key)
+
+        results = self.scan() if rescan else []
+        done = {os.path.abspath(result["file"]) for result in results}
+        for key in sorted(reload - done):
+            if key not in self.presets:
+                continue
+            stamp = self._stamp(key)
+            if stamp is None:
+                results.append({"file": str(self.presets[key]["path"]), "removed": True})
+                self._forget(key)
+            elif stamp != self.presets[key]["stamp"]:
+                results.append(self._check(self._load(self.presets[key]["path"], stamp)))
+                done.add(key)
+        for key in sorted(recheck - done):
+            if key in self.presets:
+                results.append(self._check(key))
+        return results
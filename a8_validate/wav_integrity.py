@@ -0,0 +1,191 @@
+"""WAV structural integrity checks for Assimil8or sample files."""
+
+import mmap
+import os
+import struct
+
+# Every RIFF chunk starts with a 4-byte id and a little-endian 32-bit size
+_CHUNK_HEADER = struct.Struct("<4sI")
+_RIFF_HEADER_SIZE = 12
+# smpl chunk: 9 header fields then 6 fields per loop; cue chunk: count then 6 fields per point
+_SMPL_HEADER = struct.Struct("<9I")
+_SMPL_LOOP = struct.Struct("<6I")
+_CUE_POINT = struct.Struct("<II4sIII")
+
+
+class WavStructureError(Exception):
+    """Exception raised when a WAV file's RIFF chunk structure is damaged."""
+
+    pass
+
+
+class WavLayout:
+    """Chunk table of a WAV file as found by scan_wav."""
+
+    __slots__ = ("file_size", "riff_end", "chunks", "findings", "loops", "cues")
+
+    def __init__(self, file_size, riff_end):
+        self.file_size = file_size
+        self.riff_end = riff_end
+        # Chunk id (bytes) -> list of (payload offset, payload size), in file order
+        self.chunks = {}
+        # Non-fatal findings (e.g. trailing bytes after the RIFF chunk)
+        self.findings = []
+        # Loops from the 'smpl' chunk: dicts with "start", "end" (inclusive frames), "type", "play_count"
+        self.loops = []
+        # Markers from the 'cue ' chunk: dicts with "id" and "position" (frame)
+        self.cues = []
+
+    def chunk(self, chunk_id):
+        """Return (payload offset, payload size) of the first chunk with this id, or None."""
+        found = self.chunks.get(chunk_id)
+        return found[0] if found else None
+
+
+def _read_smpl(view, offset, size, layout):
+    if size < _SMPL_HEADER.size:
+        layout.findings.append(f"'smpl' chunk is too short ({size} bytes)")
+        return
+    declared = _SMPL_HEADER.unpack_from(view, offset)[7]
+    available = (size - _SMPL_HEADER.size) // _SMPL_LOOP.size
+    if declared > available:
+        layout.findings.append(f"'smpl' chunk declares {declared} loops but holds {available}")
+    for i in range(min(declared, available)):
+        _, loop_type, start, end, _, play_count = _SMPL_LOOP.unpack_from(
+            view, offset + _SMPL_HEADER.size + i * _SMPL_LOOP.size
+        )
+        layout.loops.append({"start": start, "end": end, "type": loop_type, "play_count": play_count})
+
+
+def _read_cue(view, offset, size, layout):
+    if size < 4:
+        layout.findings.append(f"'cue ' chunk is too short ({size} bytes)")
+        return
+    declared = struct.unpack_from("<I", view, offset)[0]
+    available = (size - 4) // _CUE_POINT.size
+    if declared > available:
+        layout.findings.append(f"'cue ' chunk declares {declared} points but holds {available}")
+    for i in range(min(declared, available)):
+        cue_id, _, _, _, _, sample_offset = _CUE_POINT.unpack_from(view, offset + 4 + i * _CUE_POINT.size)
+        layout.cues.append({"id": cue_id, "position": sample_offset})
+
+
+def scan_wav(view, file_size):
+    """
+    Walk the RIFF chunk table of a memory-mapped WAV file, checking it as it goes.
+
+    Only the 8-byte chunk headers are read, plus the small 'smpl' and 'cue ' payloads,
+    whose loops and markers are indexed in the same pass. See check_wav_structure for
+    the checks.
+
+    Args:
+        view: Buffer over the whole file (typically an mmap)
+        file_size: Size of the file in bytes
+
+    Returns:
+        WavLayout: Chunk table and non-fatal findings
+
+    Raises:
+        WavStructureError: If the chunk structure is damaged
+    """
+    if file_size < _RIFF_HEADER_SIZE:
+        raise WavStructureError(f"File is too short for a RIFF header ({file_size} bytes)")
+    if view[0:4] != b"RIFF" or view[8:12] != b"WAVE":
+        raise WavStructureError("Missing RIFF/WAVE header")
+
+    riff_end = 8 + struct.unpack_from("<I", view, 4)[0]
+    if riff_end > file_size:
+        raise WavStructureError(f"RIFF size claims {riff_end} bytes but the file is {file_size} bytes (truncated)")
+    layout = WavLayout(file_size, riff_end)
+    if riff_end < file_size:
+        layout.findings.append(f"{file_size - riff_end} trailing bytes after the RIFF chunk")
+
+    offset = _RIFF_HEADER_SIZE
+    while offset < riff_end:
+        if offset + _CHUNK_HEADER.size > riff_end:
+            raise WavStructureError(f"Incomplete chunk header at offset {offset}")
+        chunk_id, chunk_size = _CHUNK_HEADER.unpack_from(view, offset)
+        name = chunk_id.decode("latin-1")
+        chunk_end = offset + _CHUNK_HEADER.size + chunk_size
+        if chunk_end > riff_end:
+            raise WavStructureError(
+                f"'{name}' chunk at offset {offset} claims {chunk_size} bytes "
+                f"but only {riff_end - offset - _CHUNK_HEADER.size} remain"
+            )
+
+        if chunk_id == b"fmt " and chunk_id in layout.chunks:
+            raise WavStructureError(f"Duplicate 'fmt ' chunk at offset {offset}")
+        if chunk_id == b"data":
+            if chunk_id in layout.chunks:
+                raise WavStructureError(f"Duplicate 'data' chunk at offset {offset}")
+            if b"fmt " not in layout.chunks:
+                raise WavStructureError("'data' chunk precedes the 'fmt ' chunk")
+        layout.chunks.setdefault(chunk_id, []).append((offset + _CHUNK_HEADER.size, chunk_size))
+        if chunk_id == b"smpl":
+            _read_smpl(view, offset + _CHUNK_HEADER.size, chunk_size, layout)
+        elif chunk_id == b"cue ":
+            _read_cue(view, offset + _CHUNK_HEADER.size, chunk_size, layout)
+
+        # Chunks are word-aligned: an odd-sized chunk is followed by one pad byte. Many
+        # writers leave it off the last chunk, and such files play, so that only warns
+        if chunk_size % 2:
+            if chunk_end + 1 > riff_end:
+                layout.findings.append(f"'{name}' chunk at offset {offset} is missing its pad byte")
+                break
+            chunk_end += 1
+        offset = chunk_end
+
+    if b"fmt " not in layout.chunks:
+        raise WavStructureError("Missing 'fmt ' chunk")
+    if b"data" not in layout.chunks:
+        raise WavStructureError("Missing 'data' chunk")
+    return layout
+
+
+def inspect_wav(file_path):
+    """
+    Memory-map a WAV file and scan its chunk table (see scan_wav).
+
+    Args:
+        file_path: Path to the WAV file
+
+    Returns:
+        WavLayout: Chunk table, embedded loops and cue points, and non-fatal findings
+
+    Raises:
+        WavStructureError: If the chunk structure is damaged
+        OSError: If the file cannot be opened
+    """
+    with open(file_path, "rb") as f:
+        file_size = os.fstat(f.fileno()).st_size
+        if file_size < _RIFF_HEADER_SIZE:
+            raise WavStructureError(f"File is too short for a RIFF header ({file_size} bytes)")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            return scan_wav(view, file_size)
+
+
+def check_wav_structure(file_path):
+    """
+    Walk the RIFF chunk table of a WAV file and check it against the file on disk.
+
+    The file is memory-mapped and only the 8-byte chunk headers are read, so audio
+    pages are never touched and the cost is independent of the sample length.
+
+    Checks:
+    - RIFF/WAVE magic, and the RIFF size against the file size (truncation)
+    - every chunk, in particular the data chunk, lies inside the file
+    - odd-sized chunks are followed by their pad byte (a finding, not an error, for the last chunk)
+    - exactly one 'fmt ' chunk, preceding exactly one 'data' chunk
+
+    Args:
+        file_path: Path to the WAV file
+
+    Returns:
+        List of non-fatal findings (e.g. trailing bytes after the RIFF chunk, or a last
+        chunk without its pad byte)
+
+    Raises:
+        WavStructureError: If the chunk structure is damaged
+        OSError: If the file cannot be opened
+    """
+    return inspect_wav(file_path).findings
@@ -0,0 +1,276 @@
+"""Precomputed waveform overviews (per-block min/max) stored in a sidecar cache."""
+
+import array
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+
+from a8_validate.sample_converter import SampleConversionError, decode_frames, read_wav_format
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the pure-Python reduction is used without it
+    np = None
+
+# Frames per min/max bucket of each stored resolution, finest first. Each level is a
+# whole multiple of the finest, so coarser levels are reduced from it without rereading.
+OVERVIEW_LEVELS = (256, 2048, 16384)
+# Buckets of the finest level decoded per block while streaming the data chunk
+_BLOCK_BUCKETS = 64
+
+OVERVIEW_MAGIC = b"A8OV"
+OVERVIEW_VERSION = 1
+OVERVIEW_SUFFIX = ".a8ov"
+
+# magic, version, channels, frame rate, frames, source size, source mtime (ns), level count
+_HEADER = struct.Struct("<4sHHIQQqI")
+# frames per bucket, bucket count
+_LEVEL = struct.Struct("<II")
+
+
+class WaveformOverview:
+    """
+    Min/max envelope of a sample at the resolutions in OVERVIEW_LEVELS.
+
+    Each level is an array('h') of interleaved (min, max) pairs, one pair per channel per
+    bucket, as 16-bit codes of the -1.0-1.0 sample range.
+    """
+
+    __slots__ = ("channels", "frame_rate", "n_frames", "source_size", "source_mtime_ns", "levels")
+
+    def __init__(self, channels, frame_rate, n_frames, source_size, source_mtime_ns, levels):
+        self.channels = channels
+        self.frame_rate = frame_rate
+        self.n_frames = n_frames
+        # Size and mtime of the WAV file the overview was computed from (staleness check)
+        self.source_size = source_size
+        self.source_mtime_ns = source_mtime_ns
+        # frames per bucket -> array('h') of interleaved min/max codes
+        self.levels = levels
+
+    def best_level(self, width):
+        """Return the frames-per-bucket of the coarsest level with at least width buckets (else the finest)."""
+        for frames_per_bucket in sorted(self.levels, reverse=True):
+            if len(self.levels[frames_per_bucket]) // (2 * self.channels) >= width:
+                return frames_per_bucket
+        return min(self.levels)
+
+    def envelope(self, frames_per_bucket, channel=0):
+        """Return the (min, max) pairs of one channel at one level, scaled to -1.0-1.0."""
+        codes = self.levels[frames_per_bucket]
+        step = 2 * self.channels
+        lows = codes[2 * channel :: step]
+        highs = codes[2 * channel + 1 :: step]
+        return [(low / 32767.0, high / 32767.0) for low, high in zip(lows, highs)]
+
+
+def _quantize(value):
+    return max(-32767, min(32767, int(round(value * 32767))))
+
+
+def _reduce_block(channels, frames_per_bucket):
+    """Return interleaved (min, max) codes per bucket and channel for decoded per-channel samples."""
+    count = len(channels[0])
+    if not count:
+        return array.array("h")
+    if np is not None:
+        frames = np.stack([np.asarray(c, dtype=np.float64) for c in channels], axis=1)
+        buckets = -(-count // frames_per_bucket)
+        padded = np.empty((buckets * frames_per_bucket, len(channels)))
+        padded[:count] = frames
+        # Repeat the last frame into the pad so it cannot widen the last bucket
+        padded[count:] = frames[-1]
+        shaped = padded.reshape(buckets, frames_per_bucket, len(channels))
+        pairs = np.stack([shaped.min(axis=1), shaped.max(axis=1)], axis=2)
+        codes = np.clip(np.round(pairs * 32767), -32767, 32767).astype(np.int16)
+        out = array.array("h")
+        out.frombytes(codes.tobytes())
+        return out
+    out = array.array("h")
+    for start in range(0, count, frames_per_bucket):
+        for channel in channels:
+            bucket = channel[start : start + frames_per_bucket]
+            out.append(_quantize(min(bucket)))
+            out.append(_quantize(max(bucket)))
+    return out
+
+
+def _coarsen(codes, channels, factor):
+    """Combine every factor consecutive buckets of an interleaved min/max array into one."""
+    step = 2 * channels
+    buckets = len(codes) // step
+    out = array.array("h")
+    for start in range(0, buckets, factor):
+        group = codes[start * step : min(buckets, start + factor) * step]
+        for c in range(channels):
+            out.append(min(group[2 * c :: step]))
+            out.append(max(group[2 * c + 1 :: step]))
+    return out
+
+
+def compute_overview(file_path):
+    """
+    Compute the waveform overview of a WAV file in one streaming pass over its data chunk.
+
+    The finest level is reduced block by block (vectorized with NumPy when installed);
+    coarser levels are derived from it. Integer, float and extensible WAV files are read.
+
+    Returns:
+        WaveformOverview
+
+    Raises:
+        SampleConversionError: If the file cannot be decoded
+        OSError: If the file cannot be read
+    """
+    finest = OVERVIEW_LEVELS[0]
+    with open(file_path, "rb") as f:
+        st = os.fstat(f.fileno())
+        if st.st_size == 0:
+            raise SampleConversionError("File is empty")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            fmt = read_wav_format(view, st.st_size)
+            end = fmt.data_offset + fmt.data_size - fmt.data_size % fmt.block_align
+            block_bytes = _BLOCK_BUCKETS * finest * fmt.block_align
+            codes = array.array("h")
+            for offset in range(fmt.data_offset, end, block_bytes):
+                block = decode_frames(view[offset : min(offset + block_bytes, end)], fmt)
+                codes.extend(_reduce_block(block, finest))
+    levels = {finest: codes}
+    for frames_per_bucket in OVERVIEW_LEVELS[1:]:
+        levels[frames_per_bucket] = _coarsen(codes, fmt.channels, frames_per_bucket // finest)
+    n_frames = (end - fmt.data_offset) // fmt.block_align
+    return WaveformOverview(fmt.channels, fmt.frame_rate, n_frames, st.st_size, st.st_mtime_ns, levels)
+
+
+def write_overview(overview, file_path):
+    """Write an overview in the binary sidecar format, atomically via a temporary file."""
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(prefix=".a8-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(
+                _HEADER.pack(
+                    OVERVIEW_MAGIC,
+                    OVERVIEW_VERSION,
+                    overview.channels,
+                    overview.frame_rate,
+                    overview.n_frames,
+                    overview.source_size,
+                    overview.source_mtime_ns,
+                    len(overview.levels),
+                )
+            )
+            for frames_per_bucket in sorted(overview.levels):
+                codes = overview.levels[frames_per_bucket]
+                f.write(_LEVEL.pack(frames_per_bucket, len(codes) // (2 * overview.channels)))
+                if sys.byteorder == "big":
+                    codes = array.array("h", codes)
+                    codes.byteswap()
+                f.write(codes.tobytes())
+        os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def read_overview(file_path):
+    """
+    Read an overview from a sidecar file.
+
+    Raises:
+        ValueError: If the file is not a valid overview of this version
+        OSError: If the file cannot be read
+    """
+    with open(file_path, "rb") as f:
+        data = f.read()
+    if len(data) < _HEADER.size:
+        raise ValueError("Overview file is truncated")
+    magic, version, channels, frame_rate, n_frames, size, mtime_ns, count = _HEADER.unpack_from(data)
+    if magic != OVERVIEW_MAGIC or version != OVERVIEW_VERSION or not channels:
+        raise ValueError("Not a version {} waveform overview".format(OVERVIEW_VERSION))
+    offset = _HEADER.size
+    levels = {}
+    for _ in range(count):
+        if offset + _LEVEL.size > len(data):
+            raise ValueError("Overview file is truncated")
+        frames_per_bucket, buckets = _LEVEL.unpack_from(data, offset)
+        offset += _LEVEL.size
+        length = buckets * channels * 4
+        if offset + length > len(data):
+            raise ValueError("Overview file is truncated")
+        codes = array.array("h", data[offset : offset + length])
+        if sys.byteorder == "big":
+            codes.byteswap()
+        levels[frames_per_bucket] = codes
+        offset += length
+    return WaveformOverview(channels, frame_rate, n_frames, size, mtime_ns, levels)
+
+
+def default_overview_dir():
+    """Return the default overview cache directory ($A8_VALIDATE_CACHE or the user cache dir)."""
+    base = os.environ.get("A8_VALIDATE_CACHE")
+    if base:
+        return os.path.join(base, "overviews")
+    if sys.platform == "win32":
+        root = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        root = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(root, "a8-validate", "overviews")
+
+
+def overview_path(sample_path, cache_dir=None):
+    """
+    Return the sidecar path of a sample's overview in cache_dir.
+
+    Sidecars are named by the sample's identity (device and inode, following symlinks),
+    so every name or link of one file shares one overview. File systems without inode
+    numbers fall back to a digest of the canonical path.
+    """
+    cache_dir = cache_dir or default_overview_dir()
+    st = os.stat(sample_path)
+    if st.st_ino:
+        name = "{:x}-{:x}".format(st.st_dev, st.st_ino)
+    else:
+        name = hashlib.blake2b(os.path.realpath(sample_path).encode("utf-8", "surrogateescape"), digest_size=16)
+        name = name.hexdigest()
+    return os.path.join(cache_dir, name + OVERVIEW_SUFFIX)
+
+
+def load_overview(sample_path, cache_dir=None):
+    """
+    Return the cached overview of a sample, or None if there is none or it is stale.
+
+    This never decodes audio, so it is cheap enough for browsing: any sample seen by
+    validate_sample_files(..., overview_dir=cache_dir) or get_overview has an entry.
+    """
+    try:
+        st = os.stat(sample_path)
+        overview = read_overview(overview_path(sample_path, cache_dir))
+    except (OSError, ValueError):
+        return None
+    if overview.source_size != st.st_size or overview.source_mtime_ns != st.st_mtime_ns:
+        return None
+    return overview
+
+
+def get_overview(sample_path, cache_dir=None):
+    """
+    Return a sample's overview, computing and caching it if the cache has no fresh entry.
+
+    Raises:
+        SampleConversionError: If the sample cannot be decoded
+        OSError: If the sample cannot be read or the cache cannot be written
+    """
+    overview = load_overview(sample_path, cache_dir)
+    if overview is None:
+        overview = compute_overview(sample_path)
+        sidecar = overview_path(sample_path, cache_dir)
+        os.makedirs(os.path.dirname(sidecar), exist_ok=True)
+        write_overview(overview, sidecar)
+    return overview
@@ -1,9 +1,17 @@
 """YAML Parser module for Assimil8or preset files."""
 
 import os
+import re
 
 import yaml
 
+# Default resource limits for a single preset file. A full 8-channel, 8-zone preset is
+# around 20KB and four mappings deep, so these leave generous headroom while keeping
+# memory per file bounded for pathological or adversarial input.
+DEFAULT_MAX_FILE_BYTES = 1024 * 1024
+DEFAULT_MAX_DEPTH = 16
+DEFAULT_MAX_KEYS = 256
+
 
 class PresetParseError(Exception):
     """Base exception for parse errors."""
@@ -23,6 +31,36 @@ class InvalidPresetError(PresetParseError):
     pass
 
 
+class PresetLimitError(PresetParseError):
+    """Base exception for preset files that exceed a parsing resource limit."""
+
+    pass
+
+
+class PresetTooLargeError(PresetLimitError):
+    """Exception raised when a preset file exceeds the maximum size in bytes."""
+
+    pass
+
+
+class NestingTooDeepError(PresetLimitError):
+    """Exception raised when a preset file nests mappings or sequences too deeply."""
+
+    pass
+
+
+class TooManyKeysError(PresetLimitError):
+    """Exception raised when a single mapping in a preset file has too many keys."""
+
+    pass
+
+
+class YAMLAliasError(PresetLimitError):
+    """Exception raised when a preset file uses YAML anchors or aliases."""
+
+    pass
+
+
 # Custom YAML loader to preserve string formatting for specific types of values
 class AssimPresetLoader(yaml.SafeLoader):
     """Custom YAML loader for Assimil8or presets."""
@@ -30,11 +68,8 @@ class AssimPresetLoader(yaml.SafeLoader):
     pass
 
 
-# Custom constructor for numbers to preserve original format
-def construct_number(loader, node):
-    """Custom constructor for numeric values to ensure proper type conversion."""
-    value = loader.construct_scalar(node)
-
+def coerce_number(value):
+    """Convert a YAML int/float scalar to int or float; return the original string if it is not numeric."""
     # Try to convert to float first (handles both integers and floats)
     try:
         # Remove any leading/trailing whitespace and handle signed numbers
@@ -53,79 +88,124 @@ def construct_number(loader, node):
         return value
 
 
+# Custom constructor for numbers to preserve original format
+def construct_number(loader, node):
+    """Custom constructor for numeric values to ensure proper type conversion."""
+    return coerce_number(loader.construct_scalar(node))
+
+
 # Register custom constructor
 AssimPresetLoader.add_constructor("tag:yaml.org,2002:float", construct_number)
 AssimPresetLoader.add_constructor("tag:yaml.org,2002:int", construct_number)
 
 
-def parse_yaml_file(file_path, return_line_map=False):
-    """
-    Parse an Assimil8or preset YAML file, optionally returning a mapping of key paths to line numbers.
+class LimitedPresetLoader(AssimPresetLoader):
     """
-    import re
+    Preset loader that enforces depth, key-count and alias limits while composing nodes.
 
-    def preprocess_assimil8or_yaml(content):
-        """
-        Preprocess Assimil8or YAML content to quote unquoted values starting with special characters.
-        """
+    Limits are checked as each node is composed, so an oversized document fails before
+    the rest of it is turned into Python objects.
+    """
 
-        def needs_quoting(value):
-            # Check if value starts with special characters that need quoting
-            return bool(re.match(r"^[@#:\-\?]", value))
-
-        processed_lines = []
-        for line in content.splitlines():
-            # Match lines with 'key : value' pattern
-            match = re.match(r"^(\s*[^:\s][^:]*)\s*:\s*(.+)$", line)
-            if match:
-                key, value = match.groups()
-                value = value.strip()
-                # If value is unquoted and needs quoting, add quotes
-                if value and not (value.startswith('"') or value.startswith("'")) and needs_quoting(value):
-                    # Escape existing quotes in value
-                    value_escaped = value.replace('"', '\\"')
-                    value = f'"{value_escaped}"'
-                processed_lines.append(f"{key} : {value}")
+    def __init__(self, stream, max_depth=DEFAULT_MAX_DEPTH, max_keys=DEFAULT_MAX_KEYS, allow_aliases=False):
+        super().__init__(stream)
+        self.max_depth = max_depth
+        self.max_keys = max_keys
+        self.allow_aliases = allow_aliases
+        self._depth = 0
+
+    def compose_node(self, parent, index):
+        event = self.peek_event()
+        # Report values against the line of their key; block mappings start on the next line
+        mark = index.start_mark if isinstance(index, yaml.Node) else event.start_mark
+        line = mark.line + 1
+
+        if not self.allow_aliases and (isinstance(event, yaml.AliasEvent) or event.anchor is not None):
+            raise YAMLAliasError(f"YAML anchors and aliases are not allowed in presets (line {line})")
+
+        # Keys are composed with index=None; parent.value holds the pairs completed so far
+        if self.max_keys is not None and isinstance(parent, yaml.MappingNode) and index is None:
+            if len(parent.value) >= self.max_keys:
+                raise TooManyKeysError(f"Mapping has more than {self.max_keys} keys (line {line})")
+
+        is_collection = isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent))
+        if is_collection:
+            self._depth += 1
+            if self.max_depth is not None and self._depth > self.max_depth:
+                raise NestingTooDeepError(f"Nesting depth exceeds the maximum of {self.max_depth} (line {line})")
+        try:
+            return super().compose_node(parent, index)
+        finally:
+            if is_collection:
+                self._depth -= 1
+
+
+def _preprocess_assimil8or_yaml(content):
+    """
+    Preprocess Assimil8or YAML content to quote unquoted values starting with special characters.
+    """
+    return "\n".join(_preprocess_lines(content.splitlines()))
+
+
+def _preprocess_lines(lines):
+    """Apply _preprocess_assimil8or_yaml to a list of lines; returns the processed lines."""
+
+    def needs_quoting(value):
+        # Check if value starts with special characters that need quoting
+        return bool(re.match(r"^[@#:\-\?]", value))
+
+    processed_lines = []
+    for line in lines:
+        # Match lines with 'key : value' pattern
+        match = re.match(r"^(\s*[^:\s][^:]*)\s*:\s*(.+)$", line)
+        if match:
+            key, value = match.groups()
+            value = value.strip()
+            # If value is unquoted and needs quoting, add quotes
+            if value and not (value.startswith('"') or value.startswith("'")) and needs_quoting(value):
+                # Escape existing quotes in value
+                value_escaped = value.replace('"', '\\"')
+                value = f'"{value_escaped}"'
+            processed_lines.append(f"{key} : {value}")
+        else:
+            processed_lines.append(line)
+    return processed_lines
+
+
+class _LineNumberLoader(LimitedPresetLoader):
+    """Limited loader that records the line of every key and the number of pairs in every mapping."""
+
+    def __init__(self, stream, **limits):
+        super().__init__(stream, **limits)
+        self.line_map = {}
+        # key path -> number of key/value pairs in the mapping there, duplicates included
+        self.pairs = {}
+
+    def construct_mapping(self, node, deep=False, path=()):
+        mapping = {}
+        self.pairs[path] = len(node.value)
+        for key_node, value_node in node.value:
+            key = self.construct_object(key_node, deep=deep)
+            # Build the full path for this key
+            current_path = path + (key,)
+            # Recursively construct value
+            if isinstance(value_node, yaml.MappingNode):
+                value = self.construct_mapping(value_node, deep=deep, path=current_path)
             else:
-                processed_lines.append(line)
-        return "\n".join(processed_lines)
-
-    if not os.path.isfile(file_path):
-        raise FileNotFoundError(f"File not found: {file_path}")
-    if os.path.getsize(file_path) == 0:
-        raise PresetParseError(f"Empty file: {file_path}")
+                value = self.construct_object(value_node, deep=deep)
+            mapping[key] = value
+            # Record line number for this key path
+            self.line_map[current_path] = key_node.start_mark.line + 1
+        return mapping
 
-    with open(file_path, "r", encoding="utf-8") as f:
-        raw_content = f.read()
-
-    # Preprocess content to fix unquoted special values
-    preprocessed_content = preprocess_assimil8or_yaml(raw_content)
-
-    class LineNumberLoader(AssimPresetLoader):
-        def __init__(self, stream):
-            super().__init__(stream)
-            self.line_map = {}
-
-        def construct_mapping(self, node, deep=False, path=()):
-            mapping = {}
-            for key_node, value_node in node.value:
-                key = self.construct_object(key_node, deep=deep)
-                # Build the full path for this key
-                current_path = path + (key,)
-                # Recursively construct value
-                if isinstance(value_node, yaml.MappingNode):
-                    value = self.construct_mapping(value_node, deep=deep, path=current_path)
-                else:
-                    value = self.construct_object(value_node, deep=deep)
-                mapping[key] = value
-                # Record line number for this key path
-                self.line_map[current_path] = key_node.start_mark.line + 1
-            return mapping
 
+def _load_with_line_map(text, max_depth, max_keys, allow_aliases):
+    """Load preprocessed YAML text; returns (data, line_map, pairs) (see _LineNumberLoader)."""
     try:
-        loader = LineNumberLoader(preprocessed_content)
+        loader = _LineNumberLoader(text, max_depth=max_depth, max_keys=max_keys, allow_aliases=allow_aliases)
         data = loader.get_single_data()
-        line_map = loader.line_map
+    except PresetParseError:
+        raise
     except yaml.YAMLError as e:
         line_info = ""
         if hasattr(e, "problem_mark"):
@@ -137,6 +217,59 @@ def parse_yaml_file(file_path, return_line_map=False):
             line_info = f" on line {line_match.group(1)}"
             raise YAMLSyntaxError(f"YAML syntax error{line_info}: {str(e)}")
         raise PresetParseError(f"Error parsing file: {str(e)}")
+    return data, loader.line_map, loader.pairs
+
+
+def parse_yaml_file(
+    file_path,
+    return_line_map=False,
+    max_bytes=DEFAULT_MAX_FILE_BYTES,
+    max_depth=DEFAULT_MAX_DEPTH,
+    max_keys=DEFAULT_MAX_KEYS,
+    allow_aliases=False,
+    content=None,
+):
+    """
+    Parse an Assimil8or preset YAML file, optionally returning a mapping of key paths to line numbers.
+
+    Resource limits are enforced while reading and composing the document; pass None for
+    max_bytes, max_depth or max_keys to disable that limit.
+
+    Args:
+        file_path: Path to the preset file
+        return_line_map: If True, return (data, line_map) instead of data
+        max_bytes: Maximum file size in bytes (PresetTooLargeError)
+        max_depth: Maximum nesting depth of mappings/sequences (NestingTooDeepError)
+        max_keys: Maximum number of keys in any single mapping (TooManyKeysError)
+        allow_aliases: If False, reject YAML anchors and aliases (YAMLAliasError)
+        content: The file's bytes if already read (e.g. prefetched by another thread);
+            the file is then not opened and file_path is only used in messages
+    """
+    if content is None:
+        if not os.path.isfile(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+        file_size = os.path.getsize(file_path)
+    else:
+        file_size = len(content)
+    if file_size == 0:
+        raise PresetParseError(f"Empty file: {file_path}")
+    if max_bytes is not None and file_size > max_bytes:
+        raise PresetTooLargeError(f"File size ({file_size} bytes) exceeds the limit of {max_bytes} bytes: {file_path}")
+
+    if content is None:
+        with open(file_path, "rb") as f:
+            # Never read more than max_bytes + 1, even if the file grew since the size check
+            raw_bytes = f.read() if max_bytes is None else f.read(max_bytes + 1)
+    else:
+        raw_bytes = content
+    if max_bytes is not None and len(raw_bytes) > max_bytes:
+        raise PresetTooLargeError(f"File size exceeds the limit of {max_bytes} bytes: {file_path}")
+    raw_content = raw_bytes.decode("utf-8")
+
+    # Preprocess content to fix unquoted special values
+    data, line_map, _ = _load_with_line_map(
+        _preprocess_assimil8or_yaml(raw_content), max_depth=max_depth, max_keys=max_keys, allow_aliases=allow_aliases
+    )
 
     if not data:
         raise InvalidPresetError(f"Empty or invalid preset file: {file_path}")
@@ -147,3 +280,137 @@ def parse_yaml_file(file_path, return_line_map=False):
     if return_line_map:
         return data, line_map
     return data
+
+
+# A preset key line and a channel header line of the layout presets are written in
+_PRESET_HEADER = re.compile(r"^Preset [^:#]*:\s*$")
+_CHANNEL_HEADER = re.compile(r"^( +)Channel \d+\s*:\s*$")
+
+
+def _indentation(line):
+    return len(line) - len(line.lstrip(" "))
+
+
+def _is_content(line):
+    stripped = line.strip()
+    return bool(stripped) and not stripped.startswith("#")
+
+
+class IncrementalPresetParser:
+    """
+    Parser for a document that is re-parsed after every edit, e.g. in an editor.
+
+    The text is split before each channel header at the preset body's indentation
+    ("  Channel 3:"), and each piece is parsed on its own and cached by its text, so an
+    edit re-parses only the channel it touches. parse() returns what parse_yaml_file
+    would: the same data, line map and errors. Documents outside the usual layout (no
+    channel headers, a second preset, flow or multi-line constructs crossing a channel
+    header, more keys than allowed across pieces, ...) and documents with errors go
+    through parse_yaml_file whole.
+    """
+
+    __slots__ = ("max_bytes", "max_depth", "max_keys", "cache_size", "_pieces")
+
+    def __init__(
+        self,
+        max_bytes=DEFAULT_MAX_FILE_BYTES,
+        max_depth=DEFAULT_MAX_DEPTH,
+        max_keys=DEFAULT_MAX_KEYS,
+        cache_size=1024,
+    ):
+        self.max_bytes = max_bytes
+        self.max_depth = max_depth
+        self.max_keys = max_keys
+        self.cache_size = cache_size
+        # (is_head, piece text, last) -> (data, line_map, pairs), or None if the piece does not parse alone
+        self._pieces = {}
+
+    def parse(self, file_path, text):
+        """
+        Parse a document's text; returns (data, line_map) as parse_yaml_file(..., return_line_map=True).
+
+        Raises:
+            PresetParseError: As parse_yaml_file
+        """
+        content = text.encode("utf-8")
+        result = None
+        if content and (self.max_bytes is None or len(content) <= self.max_bytes):
+            result = self._parse_pieces(text.splitlines())
+        if result is None:
+            return parse_yaml_file(
+                file_path,
+                return_line_map=True,
+                max_bytes=self.max_bytes,
+                max_depth=self.max_depth,
+                max_keys=self.max_keys,
+                content=content,
+            )
+        return result
+
+    def _piece(self, lines, is_head, last=False):
+        # Pieces but the last are followed by a line break in the document (which block scalars keep)
+        key = (is_head, "\n".join(lines), last)
+        if key in self._pieces:
+            return self._pieces[key]
+        if len(self._pieces) >= self.cache_size:
+            self._pieces.clear()
+        # A channel piece's top level is the preset body, one level below the document's
+        max_depth = self.max_depth if is_head or self.max_depth is None else self.max_depth - 1
+        indent = _indentation(lines[0])
+        if not is_head and any(_is_content(line) and _indentation(line) < indent for line in lines):
+            # A line left of the channel header belongs to an enclosing level (e.g. a second preset)
+            result = None
+        else:
+            try:
+                text = "\n".join(_preprocess_lines(lines)) + ("" if last else "\n")
+                result = _load_with_line_map(text, max_depth, self.max_keys, False)
+            except PresetParseError:
+                result = None
+        self._pieces[key] = result
+        return result
+
+    def _parse_pieces(self, lines):
+        """Parse the document piece by piece; returns None if it must be parsed whole."""
+        starts = []
+        indent = None
+        for number, line in enumerate(lines):
+            match = _CHANNEL_HEADER.match(line)
+            if match and (indent is None or len(match.group(1)) == indent):
+                indent = len(match.group(1))
+                starts.append(number)
+        if not starts:
+            return None
+        head = [line for line in lines[: starts[0]] if _is_content(line)]
+        if not head or not _PRESET_HEADER.match(head[0]):
+            return None
+        if head[1:] and min(_indentation(line) for line in head[1:]) != indent:
+            return None
+
+        head_result = self._piece(lines[: starts[0]], True)
+        if head_result is None:
+            return None
+        head_data, head_map, head_pairs = head_result
+        if not isinstance(head_data, dict) or len(head_data) != 1:
+            return None
+        preset_key, body = next(iter(head_data.items()))
+        if body is None:
+            body = {}
+        if not isinstance(preset_key, str) or not preset_key.startswith("Preset ") or not isinstance(body, dict):
+            return None
+        preset_data = dict(body)
+        pairs = head_pairs.get((preset_key,), 0)
+        # Keep parse_yaml_file's order: every key after its children, the preset key last
+        line_map = {path: line for path, line in head_map.items() if path != (preset_key,)}
+        for start, end in zip(starts, starts[1:] + [len(lines)]):
+            piece = self._piece(lines[start:end], False, last=end == len(lines))
+            if piece is None or not isinstance(piece[0], dict):
+                return None
+            data, piece_map, piece_pairs = piece
+            pairs += piece_pairs[()]
+            preset_data.update(data)
+            for path, line in piece_map.items():
+                line_map[(preset_key,) + path] = line + start
+        if self.max_keys is not None and pairs > self.max_keys:
+            return None
+        line_map[(preset_key,)] = head_map[(preset_key,)]
+        return {preset_key: preset_data}, line_map
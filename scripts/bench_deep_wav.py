@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Measure the cost of the --deep-wav structure check per GB of samples."""
+
+import argparse
+import os
+import tempfile
+import time
+import wave
+
+from a8_validate.wav_integrity import check_wav_structure
+
+
+def make_samples(directory: str, count: int, seconds: float):
+    """Write count stereo 16-bit 48kHz WAV files of the given length; return their paths."""
+    frames = b"\x00\x00\x00\x00" * int(48000 * seconds)
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"s{i:04d}.wav")
+        with wave.open(path, "wb") as w:
+            w.setnchannels(2)
+            w.setsampwidth(2)
+            w.setframerate(48000)
+            w.writeframes(frames)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=200, help="Number of sample files")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Length of each sample in seconds")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed passes (best is reported)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = make_samples(directory, args.count, args.seconds)
+        total_bytes = sum(os.path.getsize(p) for p in paths)
+        best = None
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            for path in paths:
+                check_wav_structure(path)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+    gigabytes = total_bytes / (1024**3)
+    print(f"{args.count} files, {gigabytes:.2f} GB: {best * 1000:.1f} ms per pass")
+    print(f"{best / gigabytes * 1000:.1f} ms per GB, {best / args.count * 1e6:.1f} us per file")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Compare the serial and parallel recursive preset walks on a synthetic deep tree."""
+
+import argparse
+import os
+import tempfile
+import time
+from unittest import mock
+
+import validate_directory
+
+
+def make_tree(root: str, depth: int, fanout: int, presets: int, samples: int) -> int:
+    """Create a tree of fanout**depth leaf folders, each with presets and samples; return the folder count."""
+    folders = [root]
+    for _ in range(depth):
+        folders = [os.path.join(parent, f"d{i}") for parent in folders for i in range(fanout)]
+    for folder in folders:
+        os.makedirs(folder)
+        for i in range(presets):
+            open(os.path.join(folder, f"prst{i:03d}.yml"), "w").close()
+        for i in range(samples):
+            open(os.path.join(folder, f"s{i}.wav"), "w").close()
+    return len(folders)
+
+
+def timed_walk(root: str, workers: int, latency: float, repeat: int):
+    """Return (best seconds, presets found) for one walk configuration."""
+    real_scandir = os.scandir
+
+    def slow_scandir(path):
+        # Emulates the round trip of a directory listing on network storage
+        time.sleep(latency)
+        return real_scandir(path)
+
+    best = None
+    count = 0
+    with mock.patch.object(validate_directory.os, "scandir", slow_scandir if latency else real_scandir):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            count = sum(1 for _ in validate_directory.iter_preset_files(root, recursive=True, workers=workers))
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+    return best, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--depth", type=int, default=4, help="Directory levels below the root")
+    parser.add_argument("--fanout", type=int, default=5, help="Subdirectories per directory")
+    parser.add_argument("--presets", type=int, default=2, help="Presets per leaf folder")
+    parser.add_argument("--samples", type=int, default=20, help="WAV files per leaf folder")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="Added delay per listing (0 for local disk)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16], help="Thread counts to compare")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes (best is reported)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        leaves = make_tree(os.path.join(directory, "tree"), args.depth, args.fanout, args.presets, args.samples)
+        print(f"{leaves} leaf folders, {args.latency_ms:g} ms per listing")
+        serial = None
+        for workers in args.workers:
+            best, count = timed_walk(os.path.join(directory, "tree"), workers, args.latency_ms / 1000, args.repeat)
+            serial = serial or best
+            print(f"  {workers:3d} workers: {best * 1000:8.1f} ms, {count} presets, {serial / best:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,55 +6,64 @@ This script validates Assimil8or preset files (.yml and .yaml) in a specified di
 """
 
 import argparse
+import itertools
 import json
+import multiprocessing
+import os
 import sys
+import threading
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
-from a8_validate.cross_reference_validator import CrossReferenceError, validate_relationships
 from a8_validate.file_system_validator import (
-    FileSystemValidationError,
-    InvalidPresetFilenameError,
+    SampleCaches,
+    clear_sample_index_cache,
+    collect_sample_paths,
+    probe_samples,
+    referenced_sample_names,
+    sample_identity,
+    sample_reference_key,
+    sample_reference_keys,
+    sample_run,
     validate_preset_filename,
     validate_sample_files,
 )
-from a8_validate.schema_validator import SchemaValidationError, validate_preset
-from a8_validate.yaml_parser import InvalidPresetError, PresetParseError, YAMLSyntaxError, parse_yaml_file
-
-
-def _line_for_path(
-    path: Optional[Tuple[str, ...]],
-    line_map: Dict[Tuple[str, ...], int],
-) -> Optional[int]:
-    """Resolve a validation path to a line number using the YAML line_map. Returns None if not found."""
-    if not path or not line_map:
-        return None
-    if path in line_map:
-        return line_map[path]
-    # Fallback: prefix match (path may be longer than stored keys)
-    for key_path in line_map.keys():
-        if len(key_path) <= len(path) and path[: len(key_path)] == key_path:
-            return line_map[key_path]
-    return None
-
-
-def _should_ignore_preset_file(name: str) -> bool:
-    """Return True if this preset filename should be ignored (system files)."""
-    ignore_names = {
-        "folderprefs.yml",
-        "lastfolder.yml",
-        "lastpreset.yml",
-        "folderprefs.yaml",
-        "lastfolder.yaml",
-        "lastpreset.yaml",
-    }
-    if name in ignore_names:
-        return True
-    if name.startswith("midi") and (name.endswith(".yml") or name.endswith(".yaml")):
-        return True
-    if name.startswith("._"):
-        return True
-    return False
+from a8_validate.lsp import DEFAULT_DEBOUNCE_SECONDS, LanguageServer, PresetDiagnostics
+from a8_validate.pipeline import BoundedQueue, PipelineStopped, StageStats, start_stage
+from a8_validate.preset_checks import (
+    CHECK_OPTIONS,
+    DEFAULT_CACHE_SIZE,
+    check_samples,
+    error_message,
+    folder_arg,
+    load_preset,
+    preset_result,
+)
+from a8_validate.preset_files import (
+    DEFAULT_WALK_WORKERS,
+    iter_preset_files,
+    presets_for_changed_files,
+    read_preset,
+)
+from a8_validate.run_manifest import MANIFEST_FILENAME, RunManifest
+from a8_validate.sample_converter import DEFAULT_TARGET_RATE, SampleConversionError, convert_sample
+from a8_validate.sample_hashing import find_duplicate_groups, hash_samples
+from a8_validate.server import (
+    HTTPClient,
+    UnixClient,
+    ValidationService,
+    default_socket_path,
+    make_http_server,
+    make_unix_server,
+    serve,
+)
+from a8_validate.streaming_validator import UnsupportedSyntaxError, validate_preset_stream
+from a8_validate.watcher import PresetWatch, add_watches, make_watcher, watch_directories
+from a8_validate.waveform_overview import default_overview_dir
+from a8_validate.yaml_parser import parse_yaml_file
 
 
 def find_yml_files(directory: str, recursive: bool = False) -> List[Path]:
@@ -66,7 +75,8 @@ def find_yml_files(directory: str, recursive: bool = False) -> List[Path]:
     - lastfolder.yml / lastfolder.yaml
     - lastpreset.yml / lastpreset.yaml
     - midi*.yml / midi*.yaml
-    - ._* (hidden files)
+    - ._* (macOS resource-fork files)
+    - anything excluded by .a8ignore files
 
     Args:
         directory: Directory to search.
@@ -74,86 +84,926 @@ def find_yml_files(directory: str, recursive: bool = False) -> List[Path]:
             with its containing directory as the sample root.
 
     Returns:
-        Sorted list of paths to preset files.
+        List of paths to preset files, sorted per directory (see iter_preset_files).
     """
-    dir_path = Path(directory)
-    if not dir_path.exists() or not dir_path.is_dir():
-        raise ValueError(f"Directory not found: {directory}")
+    return list(iter_preset_files(directory, recursive=recursive))
 
-    if recursive:
-        all_files = list(dir_path.rglob("*.yml")) + list(dir_path.rglob("*.yaml"))
+
+def read_file_list(source: str) -> List[str]:
+    """
+    Read a list of paths from a file, or from standard input if source is "-".
+
+    Entries are NUL-separated if the input contains a NUL byte (git diff -z, find -print0),
+    otherwise one per line; empty entries are dropped.
+    """
+    if source == "-":
+        data = sys.stdin.buffer.read()
     else:
-        all_files = list(dir_path.glob("*.yml")) + list(dir_path.glob("*.yaml"))
+        with open(source, "rb") as f:
+            data = f.read()
+    entries = data.split(b"\0") if b"\0" in data else data.splitlines()
+    return [os.fsdecode(entry) for entry in entries if entry.strip()]
 
-    filtered = [f for f in all_files if not _should_ignore_preset_file(f.name)]
-    return sorted(filtered)
+
+# Threads reading sample headers and presets queued between stages in --pipeline runs
+PIPELINE_IO_THREADS = 8
+PIPELINE_QUEUE_SIZE = 32
 
 
 def validate_preset_file(
     file_path: Path,
-    sample_dir: Optional[Path],
+    sample_dir: Union[Path, Sequence[Path], None],
     run_crossref: bool = True,
     run_samples: bool = True,
+    report: Optional[Dict[str, Any]] = None,
+    deep_wav: bool = False,
+    analyze_audio: bool = False,
+    analyze_loops: bool = False,
+    find_duplicates: bool = False,
+    overview_dir: Optional[str] = None,
+    fast_memory: bool = False,
 ) -> Tuple[bool, str]:
     """
     Validate a preset file.
 
     Args:
         file_path: Path to the preset YAML file.
-        sample_dir: Directory used to resolve sample paths; can be None if run_samples is False.
+        sample_dir: Directory used to resolve sample paths, or an ordered sequence of
+            directories searched in turn; can be None if run_samples is False.
         run_crossref: If True, run cross-reference validation.
         run_samples: If True and sample_dir is set, validate sample files and memory.
+        report: Optional dict filled with details of the run; "samples" receives the
+            resolved sample references (see validate_sample_files) and, with fast_memory,
+            "memory" the memory check result (see check_memory_budget).
+        deep_wav: If True, also check each sample's RIFF chunk structure.
+        analyze_audio: If True, also analyze each sample's audio for silence, DC offset and clipping.
+        analyze_loops: If True, also warn about loop points and sample boundaries likely to click.
+        find_duplicates: If True, also hash each sample's audio and warn about duplicates in the preset.
+        overview_dir: If set, cache each sample's waveform overview in this directory.
+        fast_memory: If True, replace the sample stage with a first-pass check: samples are
+            resolved from the folder listing and the memory limit is checked from file sizes,
+            reading WAV headers only for presets near or over the limit. Sample formats and
+            positions are not checked, and a passing preset's message says so
+            (FAST_MEMORY_VALID).
 
     Returns:
         Tuple of (success, message)
     """
+    line_map: Dict[Tuple[str, ...], int] = {}
     try:
-        # Validate filename format first
-        validate_preset_filename(file_path.name)
+        # Schema-only runs need just a verdict: stream the file instead of building the preset dict,
+        # falling back to the full parser for YAML the streaming validator does not handle
+        if not run_crossref and not run_samples:
+            validate_preset_filename(file_path.name)
+            try:
+                validate_preset_stream(str(file_path))
+                return True, "Valid"
+            except UnsupportedSyntaxError:
+                pass
 
-        # Parse the YAML file with line number preservation
-        preset_data, line_map = parse_yaml_file(str(file_path), return_line_map=True)
+        preset_data = load_preset(file_path, line_map, run_crossref)
 
-        # Validate schema (mutate=False so we do not modify the parsed data)
-        try:
-            preset_data = validate_preset(preset_data, mutate=False)
-        except SchemaValidationError as e:
-            line_number = _line_for_path(getattr(e, "path", None), line_map)
-            if line_number is not None:
-                raise SchemaValidationError(f"{e} (line {line_number})", path=getattr(e, "path", None)) from e
-            raise
+        message = "Valid"
+        if run_samples and sample_dir:
+            message = check_samples(
+                preset_data,
+                sample_dir,
+                report,
+                deep_wav=deep_wav,
+                analyze_audio=analyze_audio,
+                analyze_loops=analyze_loops,
+                find_duplicates=find_duplicates,
+                overview_dir=overview_dir,
+                fast_memory=fast_memory,
+            )
 
-        if run_crossref:
-            validate_relationships(preset_data)
+        return True, message
 
-        if run_samples and sample_dir:
-            validate_sample_files(preset_data, str(sample_dir))
-
-        return True, "Valid"
-
-    except InvalidPresetFilenameError as e:
-        return False, f"Filename error: {e}"
-    except (YAMLSyntaxError, InvalidPresetError, PresetParseError) as e:
-        return False, f"YAML parsing error: {e}"
-    except SchemaValidationError as e:
-        return False, f"Schema validation error: {e}"
-    except CrossReferenceError as e:
-        line_number = _line_for_path(getattr(e, "path", None), line_map)
-        msg = str(e)
-        if line_number is not None:
-            msg = f"{msg} (line {line_number})"
-        return False, f"Cross-reference error: {msg}"
-    except FileSystemValidationError as e:
-        line_number = _line_for_path(getattr(e, "path", None), line_map)
-        msg = str(e)
-        if line_number is not None:
-            msg = f"{msg} (line {line_number})"
-        return False, f"Sample file error: {msg}"
     except Exception as e:
-        return False, f"Unexpected error: {e}"
+        return False, error_message(e, line_map)
+
+
+def validate_corpus(
+    jobs: Sequence[Tuple[Path, Union[Path, Sequence[Path], None]]],
+    run_crossref: bool = True,
+    deep_wav: bool = False,
+    analyze_audio: bool = False,
+    analyze_loops: bool = False,
+    find_duplicates: bool = False,
+    overview_dir: Optional[str] = None,
+) -> Tuple[List[Tuple[bool, str, List[str], Optional[List[Dict[str, str]]]]], Dict[str, Any]]:
+    """
+    Validate many presets, reading each referenced sample file's header only once.
+
+    Every preset is parsed and checked first while the referenced samples are collected;
+    the unique sample files are then probed in one pass sorted by directory, and the
+    sample, position and memory checks of every preset run against that probe table.
+
+    Args:
+        jobs: Sequence of (preset path, sample directory or directories) pairs.
+        run_crossref: If True, run cross-reference validation.
+        deep_wav: If True, also check each sample's RIFF chunk structure (once per file).
+        analyze_audio: If True, also analyze each sample's audio (once per file).
+        analyze_loops: If True, also warn about loop points and sample boundaries likely to click.
+        find_duplicates: If True, also hash each sample's audio and warn about duplicates in the preset.
+        overview_dir: If set, cache each sample's waveform overview in this directory (once per file).
+
+    Returns:
+        Tuple of (results, stats). results holds one (success, message, warnings, samples)
+        tuple per job, in order. stats reports "references", "unique_files" (distinct files
+        by identity, so links to one file count once), "dedupe_ratio",
+        "header_reads" and "header_reads_saved" (against validating each preset on its own).
+    """
+    loaded: List[Any] = []
+    wanted: List[str] = []
+    references = 0
+    per_preset_unique = 0
+
+    with sample_run():
+        # Phase 1: parse and check every preset, collecting the samples it references
+        for file_path, sample_dir in jobs:
+            line_map: Dict[Tuple[str, ...], int] = {}
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always")
+                try:
+                    preset_data = load_preset(file_path, line_map, run_crossref)
+                    if sample_dir:
+                        paths = collect_sample_paths(preset_data, folder_arg(sample_dir))
+                        wanted.extend(paths)
+                        references += len(paths)
+                        per_preset_unique += len({sample_identity(p) for p in paths})
+                    error = None
+                except Exception as e:
+                    preset_data, error = None, error_message(e, line_map)
+            loaded.append((preset_data, line_map, error, [str(w.message) for w in caught]))
+
+        # Phase 2: read each unique sample header once
+        probes = probe_samples(wanted)
+
+        # Phase 3: sample, position and memory checks against the probe table
+        results = []
+        for (file_path, sample_dir), (preset_data, line_map, error, preset_warnings) in zip(jobs, loaded):
+            samples = None
+            if error is None and sample_dir:
+                with warnings.catch_warnings(record=True) as caught:
+                    warnings.simplefilter("always")
+                    try:
+                        samples = validate_sample_files(
+                            preset_data,
+                            folder_arg(sample_dir),
+                            probes=probes,
+                            deep_wav=deep_wav,
+                            analyze_audio=analyze_audio,
+                            analyze_loops=analyze_loops,
+                            find_duplicates=find_duplicates,
+                            overview_dir=overview_dir,
+                        )
+                    except Exception as e:
+                        error = error_message(e, line_map)
+                preset_warnings = preset_warnings + [str(w.message) for w in caught]
+            if error is None:
+                results.append((True, "Valid", preset_warnings, samples))
+            else:
+                results.append((False, error, preset_warnings, samples))
+
+    # Without a shared table each reference is read twice (format and length) and each
+    # preset reads its unique samples once more for the memory total
+    unique_files = len(probes)
+    default_reads = 2 * references + per_preset_unique
+    stats = {
+        "references": references,
+        "unique_files": unique_files,
+        "dedupe_ratio": round(references / unique_files, 2) if unique_files else 0.0,
+        "header_reads": unique_files,
+        "header_reads_saved": default_reads - unique_files,
+    }
+    return results, stats
+
+
+def iter_validate(
+    directory: str,
+    recursive: bool = False,
+    samples_dirs: Optional[Sequence[Path]] = None,
+    run_crossref: bool = True,
+    run_samples: bool = True,
+    deep_wav: bool = False,
+    analyze_audio: bool = False,
+    analyze_loops: bool = False,
+    find_duplicates: bool = False,
+    overview_dir: Optional[str] = None,
+    fast_memory: bool = False,
+    workers: int = 1,
+    use_ignore_files: bool = True,
+    pipeline: bool = False,
+    jobs: Optional[int] = None,
+    stats: Optional[Dict[str, Any]] = None,
+    manifest: Optional[RunManifest] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Validate the presets under a directory, yielding each result as soon as it is known.
+
+    Presets are validated as the walk finds them and nothing is kept once a result is
+    yielded, so memory does not grow with the number of presets. In recursive runs a
+    folder's sample listing is dropped once the walk moves past it (presets arrive folder
+    by folder), so the sample index stays small too.
+
+    Args:
+        directory: Directory to scan for presets.
+        recursive: If True, scan subdirectories; each preset's folder is its sample root.
+        samples_dirs: Optional ordered sample search path used instead of the preset folders.
+        run_crossref, run_samples, deep_wav, analyze_audio, analyze_loops, find_duplicates,
+            overview_dir, fast_memory: As for validate_preset_file.
+        workers, use_ignore_files: As for iter_preset_files.
+        pipeline: If True, overlap reading, parsing (in jobs worker processes, default one
+            per CPU) and sample header reads; results keep the walk order. stats, if given,
+            then receives per-stage utilization counters once the iterator is exhausted.
+        manifest: Optional RunManifest (see RunManifest.load): presets it holds a current
+            verdict for are not validated again, and every verdict is recorded in it; call
+            manifest.save() once the iterator is exhausted. Takes precedence over pipeline.
+
+    Returns:
+        Iterator of dicts with "file", "valid", "message" and "warnings", plus "samples"
+        (resolved sample references) and "memory" (with fast_memory) when available.
+
+    Raises:
+        ValueError: If the directory does not exist.
+    """
+    preset_files = iter_preset_files(directory, recursive=recursive, workers=workers, use_ignore_files=use_ignore_files)
+    options = dict(
+        run_crossref=run_crossref,
+        run_samples=run_samples,
+        deep_wav=deep_wav,
+        analyze_audio=analyze_audio,
+        analyze_loops=analyze_loops,
+        find_duplicates=find_duplicates,
+        overview_dir=overview_dir,
+        fast_memory=fast_memory,
+    )
+    if pipeline and manifest is None:
+        return _iter_validate_pipelined(
+            preset_files, Path(directory), recursive, samples_dirs, options, jobs, stats=stats
+        )
+    return _iter_validate(preset_files, Path(directory), recursive, samples_dirs, options, manifest)
+
+
+def _iter_validate(
+    preset_files: Iterable[Path],
+    base_dir: Path,
+    recursive: bool,
+    samples_dirs: Optional[Sequence[Path]],
+    options: Dict[str, Any],
+    manifest: Optional[RunManifest] = None,
+) -> Iterator[Dict[str, Any]]:
+    # One run: presets sharing a sample folder share its listing
+    with sample_run():
+        previous_folder: Optional[Path] = None
+        for file_path in preset_files:
+            if samples_dirs:
+                sample_dir: Union[Path, List[Path]] = list(samples_dirs)
+            elif recursive:
+                sample_dir = file_path.parent
+                if previous_folder is not None and previous_folder != sample_dir:
+                    clear_sample_index_cache(str(previous_folder))
+                previous_folder = sample_dir
+            else:
+                sample_dir = base_dir
+
+            if manifest is not None:
+                reused = manifest.lookup(file_path, folder_arg(sample_dir))
+                yield reused if reused is not None else _validate_recorded(file_path, sample_dir, options, manifest)
+                continue
+
+            # Collect non-fatal findings (e.g. samples resolved by case-fold) for this preset
+            report: Dict[str, Any] = {}
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always")
+                success, message = validate_preset_file(file_path, sample_dir, report=report, **options)
+            yield preset_result(file_path, success, message, [str(w.message) for w in caught], report)
+
+
+def _validate_recorded(
+    file_path: Path, sample_dir: Union[Path, List[Path]], options: Dict[str, Any], manifest: RunManifest
+) -> Dict[str, Any]:
+    """Validate one preset as validate_preset_file does and record the verdict and its sample dependencies."""
+    try:
+        # Oversized files are not read (content None) and, like unreadable ones, not recorded:
+        # the parser rejects them from a stat, so the next run redoes that cheaply
+        st: Optional[os.stat_result]
+        st, content = read_preset(file_path)
+    except OSError:
+        # Not recorded: the next run tries again
+        st, content = None, None
+    run_samples = options.get("run_samples", True)
+    line_map: Dict[Tuple[str, ...], int] = {}
+    report: Dict[str, Any] = {}
+    preset_data: Optional[Dict[str, Any]] = None
+    message = "Valid"
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        try:
+            preset_data = load_preset(file_path, line_map, options.get("run_crossref", True), content=content)
+            if run_samples and sample_dir:
+                check_options = {key: options[key] for key in CHECK_OPTIONS if key in options}
+                message = check_samples(preset_data, sample_dir, report, **check_options)
+            error = None
+        except Exception as e:
+            error = error_message(e, line_map)
+    result = preset_result(file_path, error is None, error or message, [str(w.message) for w in caught], report)
+    if st is not None and content is not None:
+        # A verdict reached before the sample stage depends on the preset file alone
+        sample_filenames = referenced_sample_names(preset_data) if preset_data and run_samples and sample_dir else []
+        manifest.record(file_path, st, content, result, sample_filenames, folder_arg(sample_dir))
+    return result
+
+
+def _parse_stage(
+    job: Tuple[Path, Optional[bytes], bool],
+) -> Tuple[Optional[Dict[str, Any]], Dict[Tuple[str, ...], int], Optional[str], List[str], float]:
+    """Pipeline parse stage (runs in a worker process): load one preset from its prefetched bytes."""
+    file_path, content, run_crossref = job
+    start = time.perf_counter()
+    line_map: Dict[Tuple[str, ...], int] = {}
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        try:
+            # Unreadable files arrive without content and are opened (and fail) here, as in validate_preset_file
+            preset_data: Optional[Dict[str, Any]] = load_preset(file_path, line_map, run_crossref, content=content)
+            error = None
+        except Exception as e:
+            preset_data, error = None, error_message(e, line_map)
+    return preset_data, line_map, error, [str(w.message) for w in caught], time.perf_counter() - start
+
+
+def _probe_stage(
+    preset_data: Dict[str, Any], sample_dir: Union[Path, Sequence[Path]], fast_memory: bool, caches: SampleCaches
+) -> Tuple[Optional[Dict[Any, Any]], float]:
+    """Pipeline probe stage (runs on an I/O thread): list the preset's sample folders and read its headers."""
+    start = time.perf_counter()
+    try:
+        with sample_run(caches):
+            paths = collect_sample_paths(preset_data, folder_arg(sample_dir))
+            # --fast-memory reads headers only for presets near the limit, which the reporter decides
+            probes = None if fast_memory else probe_samples(paths)
+    except Exception:
+        # The reporter's checks raise the same error with its context
+        probes = None
+    return probes, time.perf_counter() - start
+
+
+def _worker_context() -> Any:
+    """Return the multiprocessing context for worker pools started while other threads run."""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _iter_validate_pipelined(
+    preset_files: Iterable[Path],
+    base_dir: Path,
+    recursive: bool,
+    samples_dirs: Optional[Sequence[Path]],
+    options: Dict[str, Any],
+    jobs: Optional[int] = None,
+    io_threads: int = PIPELINE_IO_THREADS,
+    queue_size: int = PIPELINE_QUEUE_SIZE,
+    stats: Optional[Dict[str, Any]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    _iter_validate as four overlapping stages connected by bounded queues.
+
+    A reader thread prefetches each preset's bytes; a dispatcher hands them to a pool of
+    jobs worker processes that parse, schema-check and cross-reference them; a second
+    dispatcher resolves each loaded preset's samples and reads their WAV headers on
+    io_threads threads; the caller's thread (the reporter) runs the sample checks against
+    those headers and yields results in walk order. Each queue holds at most queue_size
+    presets, so a slow stage holds back the ones before it instead of buffering the run.
+
+    Worker processes are started with forkserver (spawn where it is not available), never
+    by forking the process while the stage threads hold locks. The probe threads and the
+    reporter share one SampleCaches, passed to each explicitly.
+
+    The checks that emit warnings run only in worker processes and in the reporter, since
+    warnings are captured per thread of control and not safely across threads. Schema-only
+    runs use the full parser on the prefetched bytes rather than the streaming validator.
+
+    stats, if given, is filled when the iterator is exhausted with "elapsed_seconds" and a
+    "stages" dict of StageStats.to_dict() per stage ("read", "parse", "probe", "report").
+    """
+    run_samples = options.get("run_samples", True)
+    run_crossref = options.get("run_crossref", True)
+    fast_memory = options.get("fast_memory", False)
+    jobs = jobs or os.cpu_count() or 1
+    stage_stats = {
+        "read": StageStats("read"),
+        "parse": StageStats("parse", jobs),
+        "probe": StageStats("probe", io_threads),
+        "report": StageStats("report"),
+    }
+    stop = threading.Event()
+    errors: List[BaseException] = []
+    read_queue = BoundedQueue(queue_size, stop)
+    parse_queue = BoundedQueue(queue_size, stop)
+    probe_queue = BoundedQueue(queue_size, stop)
+    # The stage threads are running when the pool starts its workers: forking then could copy a held lock
+    parse_pool = ProcessPoolExecutor(max_workers=jobs, mp_context=_worker_context())
+    probe_pool = ThreadPoolExecutor(max_workers=io_threads, thread_name_prefix="a8-probe")
+    # Shared by the probe threads and the reporter; each thread has its own sample run
+    caches = SampleCaches()
+
+    def sample_dir_for(file_path: Path) -> Union[Path, List[Path], None]:
+        if not run_samples:
+            return None
+        if samples_dirs:
+            return list(samples_dirs)
+        return file_path.parent if recursive else base_dir
+
+    def read() -> None:
+        read_stats = stage_stats["read"]
+        for file_path in preset_files:
+            start = time.perf_counter()
+            try:
+                # Oversized files arrive without content, like unreadable ones, and are rejected by size
+                content: Optional[bytes] = read_preset(file_path)[1]
+            except OSError:
+                content = None
+            read_stats.add(busy=time.perf_counter() - start, items=1)
+            read_queue.put((file_path, content), read_stats)
+        read_queue.put(None)
+
+    def dispatch_parse() -> None:
+        parse_stats = stage_stats["parse"]
+        while True:
+            item = read_queue.get()
+            if item is None:
+                break
+            file_path, content = item
+            future = parse_pool.submit(_parse_stage, (file_path, content, run_crossref))
+            parse_queue.put((file_path, future), parse_stats)
+        parse_queue.put(None)
+
+    def dispatch_probe() -> None:
+        probe_stats = stage_stats["probe"]
+        while True:
+            item = parse_queue.get()
+            if item is None:
+                break
+            file_path, future = item
+            start = time.perf_counter()
+            loaded = future.result()
+            probe_stats.add(starved=time.perf_counter() - start)
+            stage_stats["parse"].add(busy=loaded[4], items=1)
+            sample_dir = sample_dir_for(file_path)
+            probe_future = None
+            if loaded[2] is None and sample_dir:
+                probe_future = probe_pool.submit(_probe_stage, loaded[0], sample_dir, fast_memory, caches)
+            probe_queue.put((file_path, sample_dir, loaded, probe_future), probe_stats)
+        probe_queue.put(None)
+
+    with sample_run(caches):
+        started = time.perf_counter()
+        threads = [
+            start_stage(read, "a8-read", stop, errors),
+            start_stage(dispatch_parse, "a8-parse", stop, errors),
+            start_stage(dispatch_probe, "a8-probe", stop, errors),
+        ]
+        check_options = {key: options[key] for key in CHECK_OPTIONS if key in options}
+        report_stats = stage_stats["report"]
+        previous_folder: Optional[Path] = None
+        try:
+            while True:
+                try:
+                    item = probe_queue.get(report_stats)
+                except PipelineStopped:
+                    break
+                if item is None:
+                    break
+                file_path, sample_dir, (preset_data, line_map, error, preset_warnings, _), probe_future = item
+                probes = None
+                if probe_future is not None:
+                    start = time.perf_counter()
+                    probes, probe_seconds = probe_future.result()
+                    report_stats.add(starved=time.perf_counter() - start)
+                    stage_stats["probe"].add(busy=probe_seconds, items=1)
+                if recursive and not samples_dirs:
+                    if previous_folder is not None and previous_folder != file_path.parent:
+                        caches.clear(str(previous_folder))
+                    previous_folder = file_path.parent
+
+                start = time.perf_counter()
+                report: Dict[str, Any] = {}
+                message = "Valid"
+                if error is None and sample_dir:
+                    with warnings.catch_warnings(record=True) as caught:
+                        warnings.simplefilter("always")
+                        try:
+                            message = check_samples(preset_data, sample_dir, report, probes=probes, **check_options)
+                        except Exception as e:
+                            error = error_message(e, line_map)
+                    preset_warnings = preset_warnings + [str(w.message) for w in caught]
+                result = preset_result(file_path, error is None, error or message, preset_warnings, report)
+                report_stats.add(busy=time.perf_counter() - start, items=1)
+                yield result
+            if errors:
+                raise errors[0]
+        finally:
+            # Cancel queued work first so the dispatchers are not left waiting on it
+            stop.set()
+            probe_pool.shutdown(wait=False, cancel_futures=True)
+            parse_pool.shutdown(wait=False, cancel_futures=True)
+            for thread in threads:
+                thread.join()
+            probe_pool.shutdown()
+            parse_pool.shutdown()
+            if stats is not None:
+                elapsed = time.perf_counter() - started
+                stats["elapsed_seconds"] = round(elapsed, 4)
+                stats["stages"] = {name: stage.to_dict(elapsed) for name, stage in stage_stats.items()}
+
+
+def watch_main(args: argparse.Namespace, output_print: Any) -> int:
+    """Run --watch: validate once, then re-validate what each batch of file changes affects until interrupted."""
+    samples_base = [Path(d) for d in args.samples_dir] if args.samples_dir else None
+    run_samples = not args.schema_only
+    session = PresetWatch(
+        args.directory,
+        recursive=args.recursive,
+        samples_dirs=samples_base,
+        use_ignore_files=not args.no_ignore_files,
+        run_crossref=not args.no_crossref,
+        run_samples=run_samples,
+        deep_wav=args.deep_wav,
+        analyze_audio=args.analyze_audio,
+        analyze_loops=args.analyze_loops,
+        find_duplicates=args.find_duplicates,
+        overview_dir=args.overview_cache,
+        fast_memory=args.fast_memory,
+    )
+    base_dir = Path(args.directory)
+
+    def emit(result: Dict[str, Any], elapsed: Optional[float]) -> None:
+        if args.ndjson:
+            output_print(json.dumps(result, separators=(",", ":")), flush=True)
+            return
+        file_path = Path(result["file"])
+        display_path = file_path.relative_to(base_dir) if args.recursive else file_path.name
+        if result.get("removed"):
+            status = "removed"
+        else:
+            status = "✓ VALID" if result["valid"] else "✗ INVALID"
+        timing = " ({:.1f} ms)".format(elapsed * 1000) if elapsed is not None else ""
+        output_print("[{}] {}: {}{}".format(time.strftime("%H:%M:%S"), display_path, status, timing), flush=True)
+        if not result.get("removed"):
+            if not result["valid"]:
+                output_print("  Error: {}".format(result["message"]))
+            for warning_message in result["warnings"]:
+                output_print("  Warning: {}".format(warning_message))
+
+    if not base_dir.is_dir():
+        raise ValueError(f"Directory not found: {args.directory}")
+    watcher = make_watcher(args.poll_interval)
+
+    def watch(directories: Iterable[str]) -> None:
+        nonlocal watcher
+        replacement = add_watches(watcher, directories)
+        if replacement is not watcher:
+            watcher = replacement
+            print(
+                "Warning: out of inotify watches (raise fs.inotify.max_user_watches); polling for changes instead",
+                file=sys.stderr,
+                flush=True,
+            )
+
+    try:
+        watch(itertools.chain(watch_directories(base_dir, args.recursive), map(str, samples_base or [])))
+
+        results = session.scan()
+        for result in results:
+            if args.ndjson or args.verbose or not result["valid"] or result["warnings"]:
+                emit(result, None)
+        valid = sum(result["valid"] for result in results)
+        if not args.ndjson:
+            output_print(
+                "{}/{} files valid. Watching {} for changes ({}); press Ctrl-C to stop.".format(
+                    valid, len(results), args.directory, watcher.backend
+                ),
+                flush=True,
+            )
+        while True:
+            changed = watcher.changes()
+            start = time.perf_counter()
+            if args.recursive:
+                for path in changed:
+                    if os.path.isdir(path) and not os.path.islink(path):
+                        for directory in watch_directories(path, True):
+                            try:
+                                watch([directory])
+                            except OSError:
+                                pass
+            for result in session.apply(changed):
+                emit(result, time.perf_counter() - start)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+    return 0
+
+
+def library_duplicates(samples_per_preset: Sequence[Optional[List[Dict[str, Any]]]]) -> Dict[str, Any]:
+    """
+    Find identical audio across every sample the presets reference.
+
+    Args:
+        samples_per_preset: Resolved sample lists as returned by validate_sample_files
+            (None for presets whose samples were not checked).
+
+    Returns:
+        Dict with "groups" (see find_duplicate_groups) and "wasted_bytes", the sample
+        memory that would be saved if each group were stored once.
+    """
+    files = [sample["file"] for samples in samples_per_preset if samples for sample in samples]
+    with sample_run():
+        groups = find_duplicate_groups(hash_samples(files), identity=sample_identity)
+    return {"groups": groups, "wasted_bytes": sum(group["wasted_bytes"] for group in groups)}
+
+
+def _fix_sample(
+    job: Tuple[str, int, Optional[int], bool],
+) -> Tuple[str, List[str], Optional[str], Dict[str, Any]]:
+    """Convert one sample for fix_samples_main; runs in a worker process."""
+    file_path, target_rate, bits, dry_run = job
+    report: Dict[str, Any] = {}
+    try:
+        reasons = convert_sample(file_path, target_rate=target_rate, bits=bits, dry_run=dry_run, report=report)
+        return file_path, reasons, None, report
+    except (SampleConversionError, OSError, ValueError) as e:
+        return file_path, [], str(e), report
+
+
+def _presets_using_resampled(
+    resampled: Dict[str, Tuple[int, int]], directory: str, recursive: bool
+) -> List[Tuple[Path, List[Tuple[str, Tuple[int, int]]]]]:
+    """
+    Find the presets that reference resampled samples, whose frame positions no longer match them.
+
+    Args:
+        resampled: Sample path -> (old rate, new rate)
+        directory: Directory fix-samples was run on
+        recursive: Whether subdirectories were converted too
+
+    Returns:
+        (preset path, [(sample name, (old rate, new rate))] of the resampled samples it
+        references) in walk order; the list is empty for a preset that could not be parsed
+    """
+    presets, _ = presets_for_changed_files(list(resampled), directory, recursive=recursive)
+    # Presets resolve samples from their own folder, so only that folder's samples can match
+    by_folder: Dict[str, Dict[str, Tuple[str, Tuple[int, int]]]] = {}
+    for sample_path, rates in resampled.items():
+        folder, name = os.path.split(os.path.abspath(sample_path))
+        by_folder.setdefault(folder, {})[sample_reference_key(name)] = (name, rates)
+    found = []
+    for preset_path in presets:
+        samples = by_folder.get(os.path.dirname(os.path.abspath(preset_path)), {})
+        try:
+            _, content = read_preset(preset_path)
+            keys = sample_reference_keys(parse_yaml_file(str(preset_path), content=content)) if content else set()
+        except Exception:
+            keys = set()
+        found.append((preset_path, sorted(sample for key, sample in samples.items() if key in keys)))
+    return found
+
+
+def fix_samples_main(argv: Optional[Sequence[str]] = None) -> int:
+    """Entry point for `a8-validate fix-samples`: rewrite WAV files the Assimil8or cannot play."""
+    parser = argparse.ArgumentParser(
+        prog="a8-validate fix-samples",
+        description="Rewrite WAV files with unsupported headers, channel counts, bit depths or sample rates",
+    )
+    parser.add_argument("directory", help="Directory containing .wav samples")
+    parser.add_argument("--recursive", "-r", action="store_true", help="Also convert samples in subdirectories")
+    parser.add_argument(
+        "--rate",
+        type=int,
+        default=DEFAULT_TARGET_RATE,
+        help="Sample rate for files whose rate is not supported (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--bits", type=int, choices=[8, 16, 24, 32], help="Output bit depth (default: keep integer depth, float→24)"
+    )
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1, help="Files converted in parallel")
+    parser.add_argument("--dry-run", "-n", action="store_true", help="Only list the files that would be converted")
+    args = parser.parse_args(argv)
+
+    dir_path = Path(args.directory)
+    if not dir_path.is_dir():
+        print("Error: Directory not found: {}".format(args.directory), file=sys.stderr)
+        return 1
+    pattern = "**/*" if args.recursive else "*"
+    samples = sorted(
+        str(p) for p in dir_path.glob(pattern) if p.suffix.lower() == ".wav" and not p.name.startswith("._")
+    )
+    jobs = [(path, args.rate, args.bits, args.dry_run) for path in samples]
+
+    if args.jobs > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            outcomes = list(pool.map(_fix_sample, jobs))
+    else:
+        outcomes = [_fix_sample(job) for job in jobs]
+
+    failed = converted = 0
+    # Sample path -> (old rate, new rate) of the files resampled
+    resampled: Dict[str, Tuple[int, int]] = {}
+    for file_path, reasons, error, report in outcomes:
+        name = os.path.relpath(file_path, args.directory)
+        if error is not None:
+            failed += 1
+            print("  {}: error: {}".format(name, error))
+        elif reasons:
+            converted += 1
+            print("  {}: {}{}".format(name, "would convert " if args.dry_run else "converted ", "; ".join(reasons)))
+            if report.get("dropped_chunks"):
+                print(
+                    "  {}: warning: {} {} chunk(s); loops, markers and tags stored in the file are lost".format(
+                        name, "would drop" if args.dry_run else "dropped", ", ".join(report["dropped_chunks"])
+                    )
+                )
+            if "rate" in report:
+                resampled[file_path] = report["rate"]
+    verb = "need converting" if args.dry_run else "converted"
+    print("{} of {} samples {}, {} failed".format(converted, len(samples), verb, failed))
+
+    if resampled:
+        print(
+            "Warning: resampling {} the length of {} sample(s) in frames. SampleStart, SampleEnd, LoopStart "
+            "and LoopLength in these presets must be multiplied by the ratio shown:".format(
+                "would change" if args.dry_run else "changed", len(resampled)
+            )
+        )
+        found = _presets_using_resampled(resampled, args.directory, args.recursive)
+        for preset_path, names in found:
+            preset_name = os.path.relpath(preset_path, args.directory)
+            if not names:
+                print("  {}: could not be read; check its samples".format(preset_name))
+                continue
+            for sample_name, (old_rate, new_rate) in names:
+                print(
+                    "  {}: {} ({}Hz to {}Hz, x{:.6g})".format(
+                        preset_name, sample_name, old_rate, new_rate, new_rate / old_rate
+                    )
+                )
+        if not found:
+            print("  (no presets in {} reference them)".format(args.directory))
+    return 1 if failed else 0
+
+
+def serve_main(argv: Optional[Sequence[str]] = None) -> int:
+    """Entry point for `a8-validate serve`: a daemon answering validate requests from warm caches."""
+    parser = argparse.ArgumentParser(
+        prog="a8-validate serve",
+        description="Keep parsed presets and sample headers warm and answer validate requests "
+        "over a Unix socket (JSON lines) or localhost HTTP (POST /validate)",
+    )
+    parser.add_argument(
+        "--socket", metavar="PATH", help="Unix socket to listen on (default: {})".format(default_socket_path())
+    )
+    parser.add_argument("--http", type=int, metavar="PORT", help="Listen on localhost:PORT over HTTP instead")
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_CACHE_SIZE,
+        metavar="N",
+        help="Parsed presets and results kept (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--overview-cache",
+        nargs="?",
+        const=default_overview_dir(),
+        metavar="DIR",
+        help="Store a waveform overview of each checked sample in this cache directory (default: %(const)s)",
+    )
+    args = parser.parse_args(argv)
+    if args.cache_size < 1:
+        parser.error("--cache-size must be at least 1")
+
+    service = ValidationService(cache_size=args.cache_size, overview_dir=args.overview_cache)
+    try:
+        if args.http is not None:
+            server = make_http_server(args.http, service.handle)
+            description = "http://127.0.0.1:{}".format(server.server_address[1])
+        else:
+            description = args.socket or default_socket_path()
+            server = make_unix_server(description, service.handle)
+    except OSError as e:
+        print("Error: {}".format(e), file=sys.stderr)
+        return 1
+    serve(server, description)
+    return 0
+
+
+def client_main(argv: Optional[Sequence[str]] = None) -> int:
+    """Entry point for `a8-validate client`: send presets to a running daemon and print the verdicts."""
+    parser = argparse.ArgumentParser(
+        prog="a8-validate client", description="Validate presets through a running `a8-validate serve` daemon"
+    )
+    parser.add_argument("files", nargs="+", help="Preset files; - reads one preset's text from stdin")
+    parser.add_argument(
+        "--name", default="prst001.yml", help="Filename to validate stdin text as (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--socket", metavar="PATH", help="Daemon Unix socket (default: {})".format(default_socket_path())
+    )
+    parser.add_argument("--http", type=int, metavar="PORT", help="Talk to a daemon on localhost:PORT over HTTP")
+    parser.add_argument(
+        "--samples-dir",
+        metavar="PATH",
+        action="append",
+        default=None,
+        help="Resolve samples from this directory instead of the preset's (repeat to search several in order)",
+    )
+    parser.add_argument(
+        "--schema-only", "--no-samples", dest="schema_only", action="store_true", help="Skip the sample checks"
+    )
+    parser.add_argument("--json", action="store_true", help="Print the daemon's responses as JSON lines")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.http is not None:
+            client = HTTPClient(args.http)
+        else:
+            client = UnixClient(args.socket or default_socket_path())
+    except OSError as e:
+        print("Error: cannot reach the daemon: {}".format(e), file=sys.stderr)
+        return 2
+
+    failed = False
+    try:
+        for file_arg in args.files:
+            if file_arg == "-":
+                request: Dict[str, Any] = {"text": sys.stdin.read(), "name": args.name}
+            else:
+                request = {"file": os.path.abspath(file_arg)}
+            if args.samples_dir:
+                request["samples_dir"] = [os.path.abspath(d) for d in args.samples_dir]
+            if args.schema_only:
+                request["options"] = {"run_samples": False}
+            response = client.request(request)
+            if "error" in response:
+                print("Error: {}".format(response["error"]), file=sys.stderr)
+                return 2
+            failed |= not response["valid"]
+            if args.json:
+                print(json.dumps(response, separators=(",", ":")))
+                continue
+            status = "✓ VALID" if response["valid"] else "✗ INVALID"
+            print("{}: {}".format(args.name if file_arg == "-" else file_arg, status))
+            if not response["valid"]:
+                print("  Error: {}".format(response["message"]))
+            for warning_message in response["warnings"]:
+                print("  Warning: {}".format(warning_message))
+    except (OSError, ValueError) as e:
+        print("Error: lost the daemon: {}".format(e), file=sys.stderr)
+        return 2
+    finally:
+        client.close()
+    return 1 if failed else 0
+
+
+def lsp_main(argv: Optional[Sequence[str]] = None) -> int:
+    """Entry point for `a8-validate lsp`: a Language Server Protocol server on stdin/stdout."""
+    parser = argparse.ArgumentParser(
+        prog="a8-validate lsp", description="Publish live diagnostics for open preset documents over LSP (stdio)"
+    )
+    parser.add_argument(
+        "--samples-dir",
+        metavar="PATH",
+        action="append",
+        default=None,
+        help="Resolve samples from this directory instead of the document's (repeat to search several in order)",
+    )
+    parser.add_argument(
+        "--schema-only", "--no-samples", dest="schema_only", action="store_true", help="Skip the sample checks"
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=DEFAULT_DEBOUNCE_SECONDS * 1000,
+        metavar="MS",
+        help="Check a burst of edits once, this long after its last edit (default: %(default)g)",
+    )
+    args = parser.parse_args(argv)
+    checker = PresetDiagnostics(args.samples_dir, run_samples=not args.schema_only)
+    return LanguageServer(checker.check, debounce=args.debounce / 1000).run()
 
 
 def main():
+    # Subcommands share the entry point; plain `a8-validate DIR` validates presets
+    if sys.argv[1:2] == ["fix-samples"]:
+        return fix_samples_main(sys.argv[2:])
+    if sys.argv[1:2] == ["serve"]:
+        return serve_main(sys.argv[2:])
+    if sys.argv[1:2] == ["client"]:
+        return client_main(sys.argv[2:])
+    if sys.argv[1:2] == ["lsp"]:
+        return lsp_main(sys.argv[2:])
+
     parser = argparse.ArgumentParser(description="Validate Assimil8or preset files in a directory")
     parser.add_argument(
         "directory",
@@ -167,11 +1017,32 @@ def main():
         action="store_true",
         help="Scan subdirectories recursively; each preset is validated with its folder as the sample root",
     )
+    parser.add_argument(
+        "--no-ignore-files",
+        action="store_true",
+        help="Do not read .a8ignore files (gitignore-style exclusions) while scanning for presets",
+    )
+    parser.add_argument(
+        "--walk-jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="With --recursive, list directories with N threads and validate presets as they are found "
+        "(for network storage; default: 1, a serial walk; {} is a good start)".format(DEFAULT_WALK_WORKERS),
+    )
+    parser.add_argument(
+        "--files-from",
+        metavar="FILE",
+        help="Validate only the presets in this list of changed preset and WAV files (one per line or "
+        "NUL-separated, - for stdin); a WAV selects the presets that reference it",
+    )
     parser.add_argument(
         "--samples-dir",
         metavar="PATH",
+        action="append",
         default=None,
-        help="Resolve sample files from this directory instead of the preset directory",
+        help="Resolve sample files from this directory instead of the preset directory; "
+        "repeat to search several directories in order (first match wins)",
     )
     parser.add_argument(
         "--schema-only",
@@ -185,17 +1056,97 @@ def main():
         action="store_true",
         help="Skip cross-reference validation (e.g. for quick schema-only checks)",
     )
+    parser.add_argument(
+        "--corpus",
+        action="store_true",
+        help="Parse every preset first, then read each referenced sample file once for all presets",
+    )
+    parser.add_argument(
+        "--fast-memory",
+        action="store_true",
+        help="First-pass check: resolve samples and bound memory from file sizes, "
+        "reading WAV headers only for presets near the 422MB limit",
+    )
+    parser.add_argument(
+        "--deep-wav",
+        action="store_true",
+        help="Also walk each sample's RIFF chunk table to catch truncated or malformed WAV files",
+    )
+    parser.add_argument(
+        "--analyze-audio",
+        action="store_true",
+        help="Stream each sample's audio and warn about silent, DC-offset or clipped samples",
+    )
+    parser.add_argument(
+        "--analyze-loops",
+        action="store_true",
+        help="Warn about loop points and SampleStart/SampleEnd likely to click (reads a few frames per point)",
+    )
+    parser.add_argument(
+        "--find-duplicates",
+        action="store_true",
+        help="Hash sample audio to report identical samples per preset and across the library",
+    )
+    parser.add_argument(
+        "--overview-cache",
+        nargs="?",
+        const=default_overview_dir(),
+        metavar="DIR",
+        help="Store a waveform overview of each sample in this cache directory (default: %(const)s)",
+    )
+    # --incremental re-validates only changed presets one at a time; the pipeline does not consult the manifest
+    run_mode = parser.add_mutually_exclusive_group()
+    run_mode.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Overlap preset reads, parsing in worker processes and sample header reads on I/O threads; "
+        "results keep their order and the summary reports each stage's utilization",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=None,
+        metavar="N",
+        help="With --pipeline, parse presets in N worker processes (default: one per CPU)",
+    )
+    run_mode.add_argument(
+        "--incremental",
+        nargs="?",
+        const="",
+        metavar="FILE",
+        help="Reuse the previous run's verdicts for presets whose file and samples are unchanged, and store this "
+        "run's in FILE (default: {} in the directory)".format(MANIFEST_FILENAME),
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Validate, then keep running and re-validate only the presets affected by each saved preset or sample",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="With --watch, detect changes by rescanning every SECONDS instead of inotify (e.g. on network shares)",
+    )
     parser.add_argument(
         "--json",
         action="store_true",
         help="Emit machine-readable JSON (results + summary) for CI or batch tooling",
     )
+    parser.add_argument(
+        "--ndjson",
+        action="store_true",
+        help="Stream one compact JSON object per preset as it is validated, then a summary record "
+        "(constant memory on very large runs)",
+    )
     args = parser.parse_args()
 
-    if args.samples_dir is not None:
-        sd = Path(args.samples_dir)
+    for samples_dir in args.samples_dir or []:
+        sd = Path(samples_dir)
         if not sd.exists() or not sd.is_dir():
-            print("Error: --samples-dir must be an existing directory: {}".format(args.samples_dir), file=sys.stderr)
+            print("Error: --samples-dir must be an existing directory: {}".format(samples_dir), file=sys.stderr)
             return 1
 
     output_file = None
@@ -218,62 +1169,243 @@ def main():
         output_print = print
 
     try:
-        preset_files = find_yml_files(args.directory, recursive=args.recursive)
+        if args.watch:
+            return watch_main(args, output_print)
         base_dir = Path(args.directory)
-        samples_base = Path(args.samples_dir) if args.samples_dir else None
+        samples_base = [Path(d) for d in args.samples_dir] if args.samples_dir else None
+        run_crossref = not args.no_crossref
+        run_samples = not args.schema_only
 
-        if not preset_files:
+        files_from_stats = None
+        if args.files_from:
+            listed_presets, files_from_stats = presets_for_changed_files(
+                read_file_list(args.files_from),
+                args.directory,
+                recursive=args.recursive,
+                samples_dirs=samples_base,
+                use_ignore_files=not args.no_ignore_files,
+            )
+            preset_iter: Iterator[Path] = iter(listed_presets)
+        else:
+            preset_iter = iter_preset_files(
+                args.directory,
+                recursive=args.recursive,
+                workers=args.walk_jobs,
+                use_ignore_files=not args.no_ignore_files,
+            )
+        # A parallel walk feeds presets straight into validation, and --ndjson never holds the
+        # whole list; corpus mode needs every preset first
+        parallel_walk = args.recursive and args.walk_jobs > 1 and not args.files_from
+        streaming = (parallel_walk or args.ndjson) and not (args.corpus and run_samples and not args.fast_memory)
+        preset_files: Iterable[Path]
+        first_preset = next(preset_iter, None)
+        if first_preset is None:
+            if files_from_stats is not None:
+                output_print("No presets in {} are affected by the listed files".format(args.directory))
+                return
             output_print("No preset files (.yml or .yaml) found in {}".format(args.directory))
             return
+        if streaming:
+            preset_files = itertools.chain([first_preset], preset_iter)
+            if parallel_walk and not args.json and not args.ndjson:
+                output_print("Scanning with {} threads; validating presets as they are found...".format(args.walk_jobs))
+        else:
+            preset_files = [first_preset, *preset_iter]
+            if not args.json and not args.ndjson:
+                output_print("Found {} preset files. Starting validation...".format(len(preset_files)))
 
-        run_crossref = not args.no_crossref
-        run_samples = not args.schema_only
-
-        if not args.json:
-            output_print("Found {} preset files. Starting validation...".format(len(preset_files)))
+        def sample_dir_for(file_path: Path) -> Union[Path, List[Path]]:
+            if samples_base is not None:
+                return samples_base
+            return file_path.parent if args.recursive else base_dir
 
+        # With --ndjson each result is written as it arrives and only counts are kept
         results = []
-        for file_path in preset_files:
-            if samples_base is not None:
-                sample_dir = samples_base
-            else:
-                sample_dir = file_path.parent if args.recursive else base_dir
+        counts = {"total": 0, "valid": 0}
+        sample_lists: List[Optional[List[Dict[str, Any]]]] = []
+        probe_stats = None
+        pipeline_stats: Optional[Dict[str, Any]] = None
+        manifest: Optional[RunManifest] = None
+        memory_reports: List[Dict[str, Optional[int]]] = []
+
+        def handle(result: Dict[str, Any]) -> None:
+            counts["total"] += 1
+            counts["valid"] += result["valid"]
+            if "memory" in result:
+                memory_reports.append(result["memory"])
+            if args.find_duplicates:
+                sample_lists.append(result.get("samples"))
+            if args.ndjson:
+                output_print(json.dumps(result, separators=(",", ":")), flush=True)
+                return
+            file_path = Path(result["file"])
+            results.append((file_path, result["valid"], result["message"], result["warnings"], result.get("samples")))
             if args.verbose and not args.json:
                 display_path = file_path.relative_to(base_dir) if args.recursive else file_path.name
-                output_print("Validating {}... ".format(display_path), end="", flush=True)
+                status = "✓ VALID" if result["valid"] else "✗ INVALID"
+                output_print("Validating {}... {}".format(display_path, status))
+                if not result["valid"]:
+                    output_print("  Error: {}".format(result["message"]))
+                for warning_message in result["warnings"]:
+                    output_print("  Warning: {}".format(warning_message))
 
-            success, message = validate_preset_file(
-                file_path, sample_dir, run_crossref=run_crossref, run_samples=run_samples
+        if args.corpus and run_samples and not args.fast_memory:
+            jobs = [(file_path, sample_dir_for(file_path)) for file_path in preset_files]
+            corpus_results, probe_stats = validate_corpus(
+                jobs,
+                run_crossref=run_crossref,
+                deep_wav=args.deep_wav,
+                analyze_audio=args.analyze_audio,
+                analyze_loops=args.analyze_loops,
+                find_duplicates=args.find_duplicates,
+                overview_dir=args.overview_cache,
+            )
+            for file_path, (success, message, preset_warnings, samples) in zip(preset_files, corpus_results):
+                handle(preset_result(file_path, success, message, preset_warnings, {"samples": samples}))
+        else:
+            options = dict(
+                run_crossref=run_crossref,
+                run_samples=run_samples,
+                deep_wav=args.deep_wav,
+                analyze_audio=args.analyze_audio,
+                analyze_loops=args.analyze_loops,
+                find_duplicates=args.find_duplicates,
+                overview_dir=args.overview_cache,
+                fast_memory=args.fast_memory,
             )
-            results.append((file_path, success, message))
+            if args.incremental is not None:
+                manifest_options = dict(
+                    options,
+                    recursive=args.recursive,
+                    samples_dirs=[os.path.abspath(d) for d in samples_base] if samples_base else None,
+                )
+                manifest = RunManifest.load(
+                    args.incremental or os.path.join(args.directory, MANIFEST_FILENAME), base_dir, manifest_options
+                )
+                validated = _iter_validate(preset_files, base_dir, args.recursive, samples_base, options, manifest)
+            elif args.pipeline:
+                pipeline_stats = {}
+                validated = _iter_validate_pipelined(
+                    preset_files, base_dir, args.recursive, samples_base, options, args.jobs, stats=pipeline_stats
+                )
+            else:
+                validated = _iter_validate(preset_files, base_dir, args.recursive, samples_base, options)
+            for result in validated:
+                handle(result)
+            if manifest is not None:
+                manifest.save()
 
-            if args.verbose and not args.json:
-                status = "✓ VALID" if success else "✗ INVALID"
-                output_print(status)
-                if not success:
-                    output_print("  Error: {}".format(message))
-
-        valid_count = sum(1 for _, success, _ in results if success)
-        invalid_count = len(results) - valid_count
-
-        if args.json:
-            json_results: List[Dict[str, Any]] = [
-                {"file": str(fp), "valid": ok, "message": msg} for fp, ok, msg in results
-            ]
-            payload = {
-                "results": json_results,
-                "summary": {"total": len(results), "valid": valid_count, "invalid": invalid_count},
+        if parallel_walk:
+            # Parallel discovery yields presets in completion order; report them in path order
+            results.sort(key=lambda result: result[0])
+        valid_count = counts["valid"]
+        invalid_count = counts["total"] - valid_count
+        duplicates = library_duplicates(sample_lists) if args.find_duplicates else None
+        memory_stats = None
+        if args.fast_memory and run_samples:
+            decided = sum(1 for memory in memory_reports if memory["exact_bytes"] is None)
+            memory_stats = {"checked": len(memory_reports), "decided_by_size": decided}
+            memory_stats["probed"] = len(memory_reports) - decided
+
+        summary: Dict[str, Any] = {"total": counts["total"], "valid": valid_count, "invalid": invalid_count}
+        if probe_stats is not None:
+            summary["sample_probe"] = probe_stats
+        if duplicates is not None:
+            summary["duplicates"] = duplicates
+        if memory_stats is not None:
+            summary["fast_memory"] = memory_stats
+        if pipeline_stats:
+            summary["pipeline"] = pipeline_stats
+        if files_from_stats is not None:
+            summary["files_from"] = files_from_stats
+        if manifest is not None:
+            summary["incremental"] = {
+                "reused": manifest.reused,
+                "validated": manifest.validated,
+                "manifest": manifest.path,
             }
+
+        if args.ndjson:
+            output_print(json.dumps({"summary": summary}, separators=(",", ":")))
+        elif args.json:
+            json_results: List[Dict[str, Any]] = []
+            for fp, ok, msg, warns, samples in results:
+                json_result: Dict[str, Any] = {"file": str(fp), "valid": ok, "message": msg, "warnings": warns}
+                if samples is not None:
+                    json_result["samples"] = samples
+                json_results.append(json_result)
+            payload = {"results": json_results, "summary": summary}
             out = json.dumps(payload, indent=2)
             output_print(out)
         else:
             output_print("\nValidation complete: {}/{} files valid".format(valid_count, len(results)))
-            invalid_files = [(path, msg) for path, success, msg in results if not success]
+            if probe_stats is not None:
+                output_print(
+                    "Sample headers: {} references to {} unique files (dedupe ratio {:.2f}x), "
+                    "{} header reads saved".format(
+                        probe_stats["references"],
+                        probe_stats["unique_files"],
+                        probe_stats["dedupe_ratio"],
+                        probe_stats["header_reads_saved"],
+                    )
+                )
+            if memory_stats is not None:
+                output_print(
+                    "Memory: {} of {} presets decided from file sizes without opening any sample, "
+                    "{} probed exactly".format(
+                        memory_stats["decided_by_size"], memory_stats["checked"], memory_stats["probed"]
+                    )
+                )
+                output_print(
+                    "Note: --fast-memory checks sample existence and the memory limit only; "
+                    "sample formats and positions were not checked"
+                )
+            if files_from_stats is not None:
+                output_print(
+                    "Files: {} listed, {} presets selected ({} through changed samples), {} skipped".format(
+                        files_from_stats["listed"],
+                        files_from_stats["presets"],
+                        files_from_stats["expanded"],
+                        files_from_stats["skipped"],
+                    )
+                )
+            if manifest is not None:
+                output_print(
+                    "Incremental: {} of {} verdicts reused from {}, {} presets validated".format(
+                        manifest.reused, counts["total"], manifest.path, manifest.validated
+                    )
+                )
+            if pipeline_stats:
+                output_print(
+                    "Pipeline ({:.2f}s): {}".format(
+                        pipeline_stats["elapsed_seconds"],
+                        ", ".join(
+                            "{} {:.0%} busy ({} workers)".format(name, stage["utilization"], stage["workers"])
+                            for name, stage in pipeline_stats["stages"].items()
+                        ),
+                    )
+                )
+            if duplicates is not None:
+                output_print(
+                    "Duplicate samples: {} groups, {:.2f}MB of sample memory wasted across the library".format(
+                        len(duplicates["groups"]), duplicates["wasted_bytes"] / (1024 * 1024)
+                    )
+                )
+                for group in duplicates["groups"]:
+                    output_print("  {}".format(", ".join(group["files"])))
+            invalid_files = [(path, msg) for path, success, msg, _, _ in results if not success]
             if invalid_files:
                 output_print("\nInvalid files:")
                 invalid_files.sort(key=lambda x: x[0].name)
                 for path, message in invalid_files:
                     output_print("  {}: {}".format(path.name, message))
+            warned_files = [(path, warns) for path, _, _, warns, _ in results if warns]
+            if warned_files and not args.verbose:
+                output_print("\nWarnings:")
+                warned_files.sort(key=lambda x: x[0].name)
+                for path, warns in warned_files:
+                    for warning_message in warns:
+                        output_print("  {}: {}".format(path.name, warning_message))
 
     except Exception as e:
         output_print("Error: {}".format(e))